@@ -0,0 +1,42 @@
+"""
+统一命令行入口：python f1.py <子命令> [参数]
+解析出子命令后才导入对应模块，collect、replay（抓包回放）等不需要分析的命令不加载pandas/numpy
+"""
+
+import argparse
+import importlib
+import sys
+
+# 子命令: (模块, 说明)；各模块的main(argv, prog)解析其余参数
+COMMANDS = {
+    'collect': ('f1_collect', "接收F1 25 UDP数据包并写入抓包文件"),
+    'replay': ('f1_replay', "把抓包文件或合成数据包发送到采集端口"),
+    'convert': ('f1_converter', "把一个session的CSV遥测数据转换为INI（--compounds可一次输出多个轮胎来源）"),
+    'batch': ('f1_batch', "批量转换多个session"),
+    'watch': ('f1_watch', "监视数据目录，session结束后自动转换"),
+    'synth': ('f1_synth', "生成合成session（CSV + ground_truth.json）"),
+    'sweep': ('f1_strategy', "在参数网格上重新求解INI中各车手的最优策略，输出切换点"),
+    'mc': ('f1_monte_carlo', "蒙特卡洛评估INI中各车手的候选策略"),
+    'pool': ('f1_tyre_fit', "合并多个session的 .degstats.json，输出整个赛季的tireset_pars"),
+    'bench': ('f1_bench', "转换器与策略优化基准测试"),
+    'bench-ingest': ('f1_ingest_bench', "采集端吞吐、落盘延迟与丢包测试")
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='f1.py', description="F1 25 遥测工具",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="子命令:\n" + "\n".join(f"  {name:<14}{help_text}" for name, (_, help_text) in COMMANDS.items())
+               + "\n\n各子命令的参数见 f1.py <子命令> --help"
+    )
+    parser.add_argument('command', choices=COMMANDS, metavar='<子命令>', help="见下方列表")
+    parser.add_argument('args', nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    module = importlib.import_module(COMMANDS[args.command][0])
+    return module.main(args.args, prog=f"f1.py {args.command}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
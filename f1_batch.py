@@ -0,0 +1,180 @@
+"""
+批量转换：发现根目录下的所有session数据目录（如 f1_telemetry_data_<赛道>/），
+在多个工作进程中并行执行 F1DataConverter.convert，每个session输出一个INI，并写出汇总清单
+"""
+
+import contextlib
+import importlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# 识别session目录所依据的CSV前缀
+SESSION_MARKERS = ('session', 'lap_data')
+
+MANIFEST_FILENAME = 'batch_manifest.json'
+
+
+def discover_sessions(root):
+    """
+    递归查找包含session/lap_data CSV的目录
+
+    :param root: 根目录
+    :return: 排序后的session目录列表
+    """
+    sessions = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        if any(name.endswith('.csv') and name.startswith(SESSION_MARKERS) for name in filenames):
+            sessions.append(dirpath)
+    return sorted(sessions)
+
+
+def session_name(data_dir, root):
+    """session名称：相对根目录的路径，去掉f1_telemetry_data_前缀"""
+    relative = os.path.relpath(data_dir, root)
+    if relative == '.':
+        relative = os.path.basename(os.path.abspath(root))
+    name = relative.replace(os.sep, '_')
+    return name[len('f1_telemetry_data_'):] if name.startswith('f1_telemetry_data_') else name
+
+
+def _limit_worker_memory(memory_limit_mb):
+    """工作进程初始化：限制虚拟内存上限（仅POSIX，其他平台忽略）"""
+    if not memory_limit_mb:
+        return
+    try:
+        import resource
+    except ImportError:
+        return
+    limit = int(memory_limit_mb) * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def convert_session(data_dir, output_filename, module='f1_csv_to_ini', n_bootstrap=1000):
+    """
+    在当前进程中转换单个session，控制台输出写入同名.log文件
+
+    :return: 清单条目dict
+    """
+    log_filename = os.path.splitext(output_filename)[0] + '.log'
+    entry = {
+        'data_dir': data_dir,
+        'output': output_filename,
+        'log': log_filename,
+        'status': 'ok',
+        'error': None
+    }
+
+    start = time.perf_counter()
+    try:
+        converter_module = importlib.import_module(module)
+        # 外层已按session并行，单个转换内不再开进程池
+        converter = converter_module.F1DataConverter(data_dir=data_dir, max_workers=1, n_bootstrap=n_bootstrap)
+        with open(log_filename, 'w', encoding='utf-8') as log, contextlib.redirect_stdout(log):
+            converter.convert(output_filename=output_filename)
+        if not os.path.exists(output_filename):
+            entry['status'] = 'empty'
+    except Exception as e:
+        entry['status'] = 'failed'
+        entry['error'] = f"{type(e).__name__}: {e}"
+    entry['seconds'] = round(time.perf_counter() - start, 3)
+
+    return entry
+
+
+def _executor(max_workers, memory_limit_mb):
+    """每个工作进程只处理一个session后即退出，避免内存在多个session间累积（Python 3.11+）"""
+    options = {'max_workers': max_workers, 'initializer': _limit_worker_memory, 'initargs': (memory_limit_mb,)}
+    if sys.version_info >= (3, 11):
+        options['max_tasks_per_child'] = 1
+    return ProcessPoolExecutor(**options)
+
+
+def convert_tree(root, output_dir=None, max_workers=None, memory_limit_mb=None, module='f1_csv_to_ini',
+                 n_bootstrap=1000):
+    """
+    批量转换根目录下的所有session
+
+    :param root: 包含多个session目录的根目录
+    :param output_dir: INI、日志和清单的输出目录，默认为root
+    :param max_workers: 并行工作进程数，None为CPU核数
+    :param memory_limit_mb: 每个工作进程的内存上限（MB），None表示不限制
+    :param module: 转换器所在模块（f1_csv_to_ini 或 f1_telemetry_collector）
+    :return: 清单dict
+    """
+    output_dir = output_dir or root
+    os.makedirs(output_dir, exist_ok=True)
+
+    sessions = discover_sessions(root)
+    print(f"找到 {len(sessions)} 个session目录")
+
+    jobs = {}
+    for data_dir in sessions:
+        output_filename = os.path.join(output_dir, f"race_pars_{session_name(data_dir, root)}.ini")
+        if output_filename in jobs.values():
+            raise ValueError(f"session输出文件名冲突: {output_filename}")
+        jobs[data_dir] = output_filename
+
+    entries = []
+    start = time.perf_counter()
+    if jobs:
+        with _executor(max_workers, memory_limit_mb) as executor:
+            futures = {
+                executor.submit(convert_session, data_dir, output_filename, module, n_bootstrap): data_dir
+                for data_dir, output_filename in jobs.items()
+            }
+            for future in as_completed(futures):
+                data_dir = futures[future]
+                try:
+                    entry = future.result()
+                except Exception as e:
+                    # 工作进程异常退出（如超出内存上限）
+                    entry = {
+                        'data_dir': data_dir, 'output': jobs[data_dir], 'log': None,
+                        'status': 'failed', 'error': f"{type(e).__name__}: {e}", 'seconds': None
+                    }
+                entry['session'] = session_name(data_dir, root)
+                entries.append(entry)
+                mark = '✓' if entry['status'] == 'ok' else '✗'
+                print(f"  {mark} {entry['session']}: {entry['status']}"
+                      + (f" ({entry['error']})" if entry['error'] else ""))
+
+    manifest = {
+        'root': os.path.abspath(root),
+        'module': module,
+        'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'seconds': round(time.perf_counter() - start, 3),
+        'sessions': sorted(entries, key=lambda entry: entry['session'])
+    }
+    manifest_filename = os.path.join(output_dir, MANIFEST_FILENAME)
+    with open(manifest_filename, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+    n_ok = sum(entry['status'] == 'ok' for entry in entries)
+    print(f"完成 {n_ok}/{len(entries)} 个session，清单: {manifest_filename}")
+
+    return manifest
+
+
+def main(argv=None, prog=None):
+    """命令行入口"""
+    import argparse
+
+    parser = argparse.ArgumentParser(prog=prog, description="批量将多个session的CSV遥测数据转换为INI")
+    parser.add_argument('root', help="包含多个session目录的根目录")
+    parser.add_argument('-o', '--output-dir', default=None, help="输出目录（默认为根目录）")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="并行工作进程数")
+    parser.add_argument('--memory-limit-mb', type=int, default=None, help="每个工作进程的内存上限（MB）")
+    parser.add_argument('--module', default='f1_csv_to_ini', choices=['f1_csv_to_ini', 'f1_telemetry_collector'])
+    parser.add_argument('--bootstrap', type=int, default=1000, metavar='N',
+                        help="轮胎衰减置信区间的bootstrap重采样次数，0表示不计算")
+    args = parser.parse_args(argv)
+
+    convert_tree(args.root, args.output_dir, args.workers, args.memory_limit_mb, args.module, args.bootstrap)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,364 @@
+"""
+转换器与策略优化热点的基准测试
+在样例session（f1_telemetry_data_Shanghai/）和合成的放大session上测量各环节的耗时与tracemalloc内存峰值，
+与JSON基线比较，耗时或内存超出阈值即判为退化（命令行退出码为1）
+"""
+
+import contextlib
+import gc
+import importlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from f1_strategy import StintCostTable, driver_compound_params
+from f1_synth import BASE_SAMPLE_RATE, generate_session, load_ground_truth
+
+SAMPLE_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'f1_telemetry_data_Shanghai')
+
+# 合成session的缓存目录（生成一次后复用）
+SYNTH_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'f1_bench_data')
+
+# 默认阈值：耗时增加50%或内存峰值增加25%判为退化；低于下限的差值视为测量噪声
+TIME_THRESHOLD = 0.5
+MEMORY_THRESHOLD = 0.25
+MIN_TIME_DELTA_S = 0.05
+MIN_MEMORY_DELTA_MB = 1.0
+
+# 各分析方法及其读取的CSV表
+ANALYZE_CASES = [
+    ('analyze_lap_times', ('lap_data',)),
+    ('analyze_pit_stops', ('lap_data',)),
+    ('analyze_fcy_phases', ('session', 'lap_data')),
+    ('analyze_retirements', ('lap_data',)),
+    ('analyze_strategies', ('lap_data', 'car_status')),
+    ('analyze_tyre_degradation', ('lap_data', 'car_status', 'telemetry'))
+]
+
+
+def synthetic_session(scale, seed=0, cache_dir=SYNTH_CACHE_DIR):
+    """
+    scale倍规模的合成session目录，不存在或参数不符时重新生成
+
+    :return: 数据目录
+    """
+    data_dir = os.path.join(cache_dir, f"synthetic_{scale:g}x_seed{seed}")
+    try:
+        truth = load_ground_truth(data_dir)
+        if truth['sample_rate'] == BASE_SAMPLE_RATE * scale and truth['seed'] == seed:
+            return data_dir
+    except (OSError, ValueError, KeyError):
+        pass
+    print(f"  生成合成session: {data_dir}")
+    generate_session(data_dir, sample_rate=BASE_SAMPLE_RATE * scale, seed=seed)
+    return data_dir
+
+
+def _quiet():
+    """屏蔽被测代码的控制台输出（输出本身仍计入耗时）"""
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+def measure(setup, run, repeat=3):
+    """
+    测量run(setup())：耗时取repeat次中的最小值，内存峰值另外单独运行一次（tracemalloc会拖慢执行）
+
+    :param setup: 每次运行前调用（不计时），返回值传给run
+    :return: {'wall_s', 'cpu_s', 'peak_alloc_mb', 'runs'}
+    """
+    walls, cpus = [], []
+    for _ in range(repeat):
+        state = setup()
+        with _quiet():
+            wall, cpu = time.perf_counter(), time.process_time()
+            run(state)
+            walls.append(time.perf_counter() - wall)
+            cpus.append(time.process_time() - cpu)
+
+    state = setup()
+    # 前面运行留下的循环引用垃圾在被测代码中途回收会让峰值忽高忽低
+    gc.collect()
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    try:
+        with _quiet():
+            run(state)
+        peak = tracemalloc.get_traced_memory()[1] - base
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+
+    best = int(np.argmin(walls))
+    return {
+        'wall_s': round(walls[best], 4),
+        'cpu_s': round(cpus[best], 4),
+        'peak_alloc_mb': round(peak / 1024 / 1024, 3),
+        'runs': [round(wall, 4) for wall in walls]
+    }
+
+
+class ConverterBenchmark:
+    """一个数据目录上的全部基准项"""
+
+    def __init__(self, data_dir, module='f1_csv_to_ini', n_bootstrap=1000):
+        self.data_dir = data_dir
+        self.module = importlib.import_module(module)
+        self.n_bootstrap = n_bootstrap
+        self._csv_files = None
+        self._prepared = None
+
+    def _converter(self):
+        # 策略优化在当前进程中求解、分析阶段串行执行：进程池启动时间和阶段并发的交错会让耗时与内存峰值不可重复
+        return self.module.F1DataConverter(data_dir=self.data_dir, max_workers=1, n_bootstrap=self.n_bootstrap,
+                                           stage_workers=1)
+
+    def csv_files(self):
+        """只加载一次的CSV表，各分析项共用"""
+        if self._csv_files is None:
+            with _quiet():
+                self._csv_files = self._converter().load_csv_files()
+        return self._csv_files
+
+    def prepared(self):
+        """完成分析并拟合轮胎参数的转换器（拟合与策略项的输入）"""
+        if self._prepared is None:
+            converter = self._converter()
+            with _quiet():
+                converter.analyze(self.csv_files())
+                self._prepared = (converter, converter._generate_tireset_pars())
+        return self._prepared
+
+    def _analysis_setup(self):
+        """新的转换器，已填好分析方法依赖的赛事信息与参赛者"""
+        converter, _ = self.prepared()
+        fresh = self._converter()
+        fresh.session_data = converter.session_data
+        fresh.participants = converter.participants
+        fresh.progress_index = converter.progress_index
+        return fresh
+
+    def _strategy_inputs(self):
+        converter, tireset_pars = self.prepared()
+        total_laps = converter.session_data.get('total_laps', 50) if converter.session_data else 50
+        drivers = [initials for initials, pars in tireset_pars.items()
+                   if any(key.startswith('A') for key in pars)]
+        return converter, tireset_pars, total_laps, drivers
+
+    def cases(self, output_dir):
+        """
+        可运行的基准项
+
+        :param output_dir: 端到端转换的INI输出目录
+        :return: [(名称, setup, run)]，所需CSV表缺失的项不包含在内
+        """
+        csv_files = self.csv_files()
+        cases = [('load_csv_files', self._converter, lambda converter: converter.load_csv_files())]
+
+        for name, tables in ANALYZE_CASES:
+            # telemetry是可选输入
+            if any(csv_files.get(table) is None for table in tables if table != 'telemetry'):
+                continue
+            args = [csv_files.get(table) for table in tables]
+            cases.append((name, self._analysis_setup,
+                          lambda converter, name=name, args=args: getattr(converter, name)(*args)))
+
+        converter, tireset_pars, total_laps, drivers = self._strategy_inputs()
+        if converter.tyre_degradation_data:
+            cases.append(('fit_tyre_degradation', lambda: converter, self._fit_all))
+
+        if drivers:
+            dry = sorted({key for initials in drivers for key in tireset_pars[initials] if key.startswith('A')})
+            cases.append(('_calculate_strategy_time', lambda: self._strategy_candidates(dry),
+                          self._time_strategies))
+            cases.append(('StintCostTable.score', lambda: self._encoded_candidates(dry), self._score_strategies))
+            cases.append(('_calculate_optimal_strategy', self._converter,
+                          lambda fresh: [fresh._calculate_optimal_strategy(initials, total_laps, dry, tireset_pars)
+                                         for initials in drivers]))
+
+        cases.append(('convert', self._converter,
+                      lambda fresh: fresh.convert(output_filename=os.path.join(output_dir, 'race_pars.ini'))))
+        return cases
+
+    @staticmethod
+    def _fit_all(converter):
+        for compounds in converter.tyre_degradation_data.values():
+            for data in compounds.values():
+                converter.fit_tyre_degradation(data)
+
+    def _strategy_candidates(self, dry):
+        """每位车手所有单停策略（两种不同干胎、任意进站圈）的评估参数"""
+        converter, tireset_pars, total_laps, drivers = self._strategy_inputs()
+        candidates = []
+        for initials in drivers:
+            params = driver_compound_params(tireset_pars[initials], dry)
+            for first in dry:
+                for second in dry:
+                    if first != second:
+                        for pit_lap in range(1, total_laps):
+                            candidates.append(([[0, first, 0, 0.0], [pit_lap, second, 0, 0.0]], params))
+        return converter, total_laps, candidates
+
+    @staticmethod
+    def _time_strategies(state):
+        converter, total_laps, candidates = state
+        for strategy, params in candidates:
+            converter._calculate_strategy_time(strategy, total_laps, params, 20.0)
+
+    def _encoded_candidates(self, dry):
+        """同样的单停候选策略，按车手建表并编码为矩阵"""
+        _, total_laps, candidates = self._strategy_candidates(dry)
+        by_params = {}
+        for strategy, params in candidates:
+            by_params.setdefault(id(params), (params, []))[1].append(strategy)
+        return [(StintCostTable(params, dry, total_laps), strategies) for params, strategies in by_params.values()]
+
+    @staticmethod
+    def _score_strategies(encoded):
+        for table, strategies in encoded:
+            table.score(*table.encode(strategies), 20.0)
+
+    def run(self, repeat=3, only=None):
+        """
+        :param only: 只运行这些名称的项，None表示全部
+        :return: {名称: measure()的结果}
+        """
+        results = {}
+        with tempfile.TemporaryDirectory(prefix='f1_bench_') as output_dir:
+            for name, setup, run in self.cases(output_dir):
+                if only and name not in only:
+                    continue
+                results[name] = measure(setup, run, repeat)
+                print(f"    {name}: {results[name]['wall_s']:.4f}s, 峰值 {results[name]['peak_alloc_mb']:.1f} MB")
+        return results
+
+
+def environment():
+    """基线所在环境，不同机器的基线不可直接比较"""
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__
+    }
+
+
+def run_suite(scales=(1, 10), repeat=3, module='f1_csv_to_ini', only=None, include_sample=True, seed=0):
+    """
+    在样例session和各倍数的合成session上运行全部基准项
+
+    :param scales: 合成session的规模倍数
+    :return: {'environment', 'created', 'results': {'数据集/项': 结果}}
+    """
+    datasets = []
+    if include_sample and os.path.isdir(SAMPLE_DATA_DIR):
+        datasets.append(('shanghai', SAMPLE_DATA_DIR))
+    datasets += [(f"synthetic_{scale:g}x", synthetic_session(scale, seed)) for scale in scales]
+
+    results = {}
+    for dataset, data_dir in datasets:
+        print(f"  [{dataset}] {data_dir}")
+        for name, result in ConverterBenchmark(data_dir, module).run(repeat, only).items():
+            results[f"{dataset}/{name}"] = result
+
+    return {
+        'module': module,
+        'environment': environment(),
+        'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'results': results
+    }
+
+
+def compare(report, baseline, time_threshold=TIME_THRESHOLD, memory_threshold=MEMORY_THRESHOLD):
+    """
+    与基线比较
+
+    :param time_threshold: 允许的耗时相对增加（0.5即+50%）
+    :param memory_threshold: 允许的内存峰值相对增加
+    :return: 退化项列表 [{'case', 'metric', 'baseline', 'current', 'ratio'}]
+    """
+    regressions = []
+    for case, current in report['results'].items():
+        previous = baseline.get('results', {}).get(case)
+        if previous is None:
+            continue
+        for metric, threshold, floor in (('wall_s', time_threshold, MIN_TIME_DELTA_S),
+                                         ('peak_alloc_mb', memory_threshold, MIN_MEMORY_DELTA_MB)):
+            old, new = previous[metric], current[metric]
+            if new > old * (1 + threshold) and new - old > floor:
+                regressions.append({
+                    'case': case, 'metric': metric, 'baseline': old, 'current': new,
+                    'ratio': round(new / old, 2) if old else float('inf')
+                })
+    return regressions
+
+
+def load_baseline(file_path):
+    """读取基线，文件不存在时返回None"""
+    if not os.path.exists(file_path):
+        return None
+    with open(file_path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_report(file_path, report):
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+def main(argv=None, prog=None):
+    """命令行入口"""
+    import argparse
+
+    parser = argparse.ArgumentParser(prog=prog, description="转换器与策略优化基准测试，与JSON基线比较")
+    parser.add_argument('--baseline', default='bench_baseline.json', help="基线文件")
+    parser.add_argument('--update-baseline', action='store_true', help="用本次结果覆盖基线")
+    parser.add_argument('-o', '--output', default=None, help="本次结果的输出文件")
+    parser.add_argument('--scales', type=float, nargs='*', default=[1, 10], help="合成session的规模倍数")
+    parser.add_argument('--no-sample', action='store_true', help="不运行样例session")
+    parser.add_argument('--repeat', type=int, default=3, help="每项重复次数（耗时取最小值）")
+    parser.add_argument('--cases', nargs='+', default=None, help="只运行这些基准项")
+    parser.add_argument('--module', default='f1_csv_to_ini', choices=['f1_csv_to_ini', 'f1_telemetry_collector'])
+    parser.add_argument('--time-threshold', type=float, default=TIME_THRESHOLD, help="允许的耗时相对增加")
+    parser.add_argument('--memory-threshold', type=float, default=MEMORY_THRESHOLD, help="允许的内存峰值相对增加")
+    args = parser.parse_args(argv)
+
+    print("运行基准测试...")
+    report = run_suite(args.scales, args.repeat, args.module, args.cases, not args.no_sample)
+    if args.output:
+        save_report(args.output, report)
+
+    baseline = load_baseline(args.baseline)
+    if args.update_baseline:
+        save_report(args.baseline, report)
+        print(f"\n✓ 基线已更新: {args.baseline}")
+        sys.exit(0)
+    if baseline is None:
+        print(f"\n⚠ 没有基线 {args.baseline}，使用 --update-baseline 创建")
+        sys.exit(0)
+
+    if baseline.get('environment') != report['environment']:
+        print("\n⚠ 基线来自不同的环境，比较结果仅供参考")
+    regressions = compare(report, baseline, args.time_threshold, args.memory_threshold)
+    if regressions:
+        print(f"\n✗ {len(regressions)} 项退化:")
+        for item in regressions:
+            print(f"  {item['case']} {item['metric']}: {item['baseline']} → {item['current']} (×{item['ratio']})")
+        sys.exit(1)
+    print("\n✓ 没有超出阈值的退化")
+
+
+if __name__ == "__main__":
+    main()
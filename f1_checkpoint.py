@@ -0,0 +1,120 @@
+"""
+增量转换检查点
+记录每张CSV表已读取到的位置（字节偏移 + 最后帧号），下次只读取之后追加的行；
+分析器的累积状态与读取位置一起保存在检查点文件中
+"""
+
+import io
+import os
+import pickle
+
+import pandas as pd
+
+CHECKPOINT_VERSION = 2
+
+# 增量模式下读取的表：其余表（telemetry等）不参与分析
+INCREMENTAL_TABLES = ('session', 'participants', 'lap_data', 'car_status')
+
+
+class CheckpointMismatch(Exception):
+    """CSV文件被替换、截断或表头改变，检查点不再适用"""
+
+
+def find_table_file(data_dir, key):
+    """与F1DataConverter.load_csv_files()相同的匹配规则：以表名开头的CSV，多个时取最后一个"""
+    found = None
+    for filename in os.listdir(data_dir):
+        if filename.endswith('.csv') and filename.startswith(key):
+            found = os.path.join(data_dir, filename)
+    return found
+
+
+def read_csv_increment(file_path, mark=None):
+    """
+    读取CSV自上次位置以来追加的完整行
+
+    文件末尾未写完的行留到下一次读取
+    :param mark: 上次返回的读取位置，None表示从头读取
+    :return: (新增行的DataFrame, 新的读取位置)；没有新增行时DataFrame为None，表头尚未写完时为 (None, mark)
+    :raises CheckpointMismatch: 文件被替换、截断或表头改变
+    """
+    size = os.path.getsize(file_path)
+    with open(file_path, 'rb') as f:
+        header = f.readline()
+        if mark is not None and (mark['file'] != file_path or mark['header'] != header or size < mark['offset']):
+            raise CheckpointMismatch(file_path)
+        if not header.endswith(b'\n'):
+            return None, mark
+
+        if mark is None:
+            offset = len(header)
+        else:
+            offset = mark['offset']
+
+        f.seek(offset)
+        data = f.read(size - offset)
+
+    data = data[:data.rfind(b'\n') + 1]
+    new_mark = {
+        'file': file_path,
+        'header': header,
+        'offset': offset + len(data),
+        'last_frame': mark['last_frame'] if mark else None
+    }
+    if not data:
+        # 只有表头的DataFrame各列为object类型，与暂存的行拼接会改变列类型
+        return None, new_mark
+
+    # 拼接表头后按与整表读取相同的方式解析
+    df = pd.read_csv(io.BytesIO(header + data), index_col=False)
+    if 'frame' in df.columns and len(df):
+        new_mark['last_frame'] = int(df['frame'].max())
+    return df, new_mark
+
+
+def read_increments(data_dir, marks):
+    """
+    读取所有增量表的新增行
+
+    :param marks: {表名: 读取位置}，新session时为空dict
+    :return: (csv_files, 新的marks)
+    :raises CheckpointMismatch: 任一表被删除、替换或截断，需要完整重建
+    """
+    csv_files = {key: None for key in INCREMENTAL_TABLES}
+    new_marks = {}
+
+    for key in INCREMENTAL_TABLES:
+        file_path = find_table_file(data_dir, key)
+        if file_path is None:
+            if key in marks:
+                raise CheckpointMismatch(key)
+            continue
+
+        df, mark = read_csv_increment(file_path, marks.get(key))
+        csv_files[key] = df
+        if mark is not None:
+            new_marks[key] = mark
+
+    return csv_files, new_marks
+
+
+def save_checkpoint(file_path, state):
+    """原子写入检查点（先写临时文件再替换）"""
+    temp_path = file_path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        pickle.dump({'version': CHECKPOINT_VERSION, 'state': state}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_path, file_path)
+
+
+def load_checkpoint(file_path):
+    """读取检查点，不存在或版本不符时返回None"""
+    if not os.path.exists(file_path):
+        return None
+    try:
+        with open(file_path, 'rb') as f:
+            checkpoint = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+    if checkpoint.get('version') != CHECKPOINT_VERSION:
+        return None
+    return checkpoint['state']
@@ -0,0 +1,178 @@
+"""
+UDP采集：接收游戏发送的F1 25数据包，按到达顺序原样写入抓包文件
+每条记录为 (接收时刻perf_counter_ns, 长度) 加数据包本身；写入经缓冲后按固定间隔刷新，
+刷新记录（已写入的记录数, 刷新完成时刻）用于计算数据包从到达到落盘的延迟
+"""
+
+import os
+import socket
+import struct
+import time
+
+from f1_packets import PACKET_ID_OFFSET, PACKET_SIZES
+
+DEFAULT_PORT = 20777
+
+# 抓包记录头：接收时刻（perf_counter_ns）、数据包长度
+RECORD = struct.Struct('<qI')
+MAX_DATAGRAM = 2048
+
+FLUSH_INTERVAL = 0.05
+WRITE_BUFFER = 1 << 20
+
+
+def iter_capture(file_path):
+    """逐条读取抓包文件，每项为 (接收时刻ns, 数据包bytes)"""
+    with open(file_path, 'rb') as f:
+        while True:
+            head = f.read(RECORD.size)
+            if len(head) < RECORD.size:
+                return
+            recv_ns, length = RECORD.unpack(head)
+            yield recv_ns, f.read(length)
+
+
+class PacketCollector:
+    """绑定UDP端口，把收到的数据包写入抓包文件"""
+
+    def __init__(self, output_file, host='0.0.0.0', port=DEFAULT_PORT, flush_interval=FLUSH_INTERVAL,
+                 recv_buffer=None, fsync=False):
+        """
+        :param output_file: 抓包文件路径
+        :param port: 监听端口，0表示由系统分配（绑定后见self.port）
+        :param flush_interval: 写入缓冲的刷新间隔（秒）
+        :param recv_buffer: 套接字接收缓冲区大小（字节），None为系统默认
+        :param fsync: 每次刷新后是否fsync到磁盘
+        """
+        self.output_file = output_file
+        self.host = host
+        self.port = port
+        self.flush_interval = flush_interval
+        self.recv_buffer = recv_buffer
+        self.fsync = fsync
+        self.stats = {}
+        self._sock = None
+
+    def open(self):
+        """绑定端口，返回实际端口号"""
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        if self.recv_buffer:
+            self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.recv_buffer)
+        self._sock.bind((self.host, self.port))
+        self.port = self._sock.getsockname()[1]
+        return self.port
+
+    def close(self):
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def serve(self, stop=None, duration=None, max_packets=None, poll_interval=0.1):
+        """
+        接收并写入数据包，直到stop被设置、超过duration秒、收满max_packets个或Ctrl+C
+
+        :param stop: threading/multiprocessing的Event
+        :return: 统计信息dict（packets、bytes、invalid、by_id、flushes、cpu_s、wall_s等）
+        """
+        if self._sock is None:
+            self.open()
+        self._sock.settimeout(poll_interval)
+        buffer = bytearray(MAX_DATAGRAM)
+        view = memoryview(buffer)
+        by_id = dict.fromkeys(PACKET_SIZES, 0)
+        flushes = []
+        packets = total_bytes = invalid = 0
+        first_ns = last_ns = None
+
+        start_wall, start_cpu = time.perf_counter(), time.process_time()
+        deadline = None if duration is None else start_wall + duration
+        flush_ns = int(self.flush_interval * 1e9)
+        next_flush = time.perf_counter_ns() + flush_ns
+
+        with open(self.output_file, 'wb', buffering=WRITE_BUFFER) as f:
+            def flush():
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+                flushes.append((packets, time.perf_counter_ns()))
+
+            try:
+                while not (stop is not None and stop.is_set()):
+                    if deadline is not None and time.perf_counter() >= deadline:
+                        break
+                    if max_packets is not None and packets >= max_packets:
+                        break
+                    try:
+                        length = self._sock.recv_into(buffer)
+                    except socket.timeout:
+                        if flushes and flushes[-1][0] == packets:
+                            continue
+                        flush()
+                        next_flush = time.perf_counter_ns() + flush_ns
+                        continue
+
+                    now = time.perf_counter_ns()
+                    f.write(RECORD.pack(now, length))
+                    f.write(view[:length])
+                    packets += 1
+                    total_bytes += length
+                    if first_ns is None:
+                        first_ns = now
+                    last_ns = now
+
+                    packet_id = buffer[PACKET_ID_OFFSET] if length > PACKET_ID_OFFSET else None
+                    if packet_id in by_id and PACKET_SIZES[packet_id] == length:
+                        by_id[packet_id] += 1
+                    else:
+                        invalid += 1
+
+                    if now >= next_flush:
+                        flush()
+                        next_flush = now + flush_ns
+            except KeyboardInterrupt:
+                print("\n停止采集")
+
+            if not flushes or flushes[-1][0] != packets:
+                flush()
+
+        self.stats = {
+            'packets': packets,
+            'bytes': total_bytes,
+            'invalid': invalid,
+            'by_id': by_id,
+            'flushes': flushes,
+            'first_ns': first_ns,
+            'last_ns': last_ns,
+            'cpu_s': time.process_time() - start_cpu,
+            'wall_s': time.perf_counter() - start_wall
+        }
+        return self.stats
+
+
+def main(argv=None, prog=None):
+    """命令行入口"""
+    import argparse
+
+    parser = argparse.ArgumentParser(prog=prog, description="接收F1 25 UDP数据包并写入抓包文件")
+    parser.add_argument('-o', '--output', default=None, help="抓包文件（默认为 capture_时间.bin）")
+    parser.add_argument('--host', default='0.0.0.0', help="监听地址")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="监听端口")
+    parser.add_argument('--duration', type=float, default=None, help="采集多少秒后停止（默认直到Ctrl+C）")
+    parser.add_argument('--flush-interval', type=float, default=FLUSH_INTERVAL, help="写入刷新间隔（秒）")
+    parser.add_argument('--fsync', action='store_true', help="每次刷新后fsync到磁盘")
+    args = parser.parse_args(argv)
+
+    output = args.output or time.strftime('capture_%Y%m%d_%H%M%S.bin')
+    collector = PacketCollector(output, args.host, args.port, args.flush_interval, fsync=args.fsync)
+    collector.open()
+    print(f"监听 {args.host}:{collector.port}，写入 {output}（Ctrl+C 停止）")
+    try:
+        collector.serve(duration=args.duration)
+    finally:
+        collector.close()
+    print(f"✓ 收到 {collector.stats['packets']} 个数据包（{collector.stats['bytes'] / 1024 / 1024:.1f} MB），"
+          f"无效 {collector.stats['invalid']} 个")
+
+
+if __name__ == "__main__":
+    main()
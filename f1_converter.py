@@ -0,0 +1,1679 @@
+"""
+F1 25 CSV Telemetry Data to INI Converter (Enhanced with Optimal Strategy)
+将F1 25游戏收集的CSV遥测数据转换为race simulation所需的.ini格式
+包含完整的track_pars, MONTE_CARLO_PARS, EVENT_PARS和VSE_PARS
+新增：理论最优换胎策略计算
+
+转换引擎：轮胎化合物来源（actual_tyre_compound或visual_tyre_compound）是参数，
+多个来源共用一次CSV加载与分析，只有依赖化合物字段的阶段按来源分别执行，每个来源输出一份INI；
+f1_csv_to_ini.py与f1_telemetry_collector.py是分别以两个来源为默认值的入口
+"""
+
+import pandas as pd
+import numpy as np
+import os
+import json
+import contextlib
+import copy
+import inspect
+from collections import defaultdict
+from datetime import datetime
+
+from f1_checkpoint import (
+    INCREMENTAL_TABLES, CheckpointMismatch, find_table_file, load_checkpoint, read_increments, save_checkpoint
+)
+from f1_progress import RaceProgressIndex
+from f1_stages import Stage, StageProfiler, count_rows, run_stages
+from f1_stream import iter_session_batches
+from f1_transitions import label_runs, merge_runs, run_length_encode
+from f1_tyre_fit import (
+    TIRESET_DEFAULTS, TIRESET_FIT_PARAMS, degradation_samples, degradation_stats, fit_degradation_batch,
+    save_degradation_stats
+)
+from f1_strategy import (
+    DEFAULT_COMPOUND_PARAMS, PIT_STOP_TIME_LOSS, driver_compound_params, solve_strategy_problems, stint_cost,
+    strategy_problem_key
+)
+
+# 自定义JSON编码器，处理numpy/pandas类型
+class NumpyEncoder(json.JSONEncoder):
+    def default(self, obj):
+        if isinstance(obj, (np.integer, np.int64, np.int32)):
+            return int(obj)
+        elif isinstance(obj, (np.floating, np.float64, np.float32)):
+            return float(obj)
+        elif isinstance(obj, np.ndarray):
+            return obj.tolist()
+        return super().default(obj)
+
+# 轮胎化合物映射 (根据F1 25 UDP规范)
+TYRE_COMPOUND_MAP = {
+    16: "C5", 17: "C4", 18: "C3", 19: "C2", 20: "C1",
+    21: "C0", 22: "C6", 7: "I", 8: "W"
+}
+
+# 轮胎化合物映射 (使用 visual_tyre_compound - 根据F1 25 UDP规范)
+VISUAL_TYRE_COMPOUND_MAP = {
+    16: "A3",  # Soft
+    17: "A4",  # Medium
+    18: "A6",  # Hard
+    7: "I",    # Intermediate
+    8: "W"     # Wet
+}
+
+# lap_data与car_status逐帧对齐的连接键（来自数据包头）
+FRAME_JOIN_KEYS = ['session_uid', 'frame', 'car_index']
+
+# 车队ID映射
+TEAM_ID_MAP = {
+    0: "Mercedes", 1: "Ferrari", 2: "RedBull", 3: "Williams",
+    4: "AstonMartin", 5: "Alpine", 6: "RB", 7: "Haas",
+    8: "McLaren", 9: "Sauber"
+}
+
+# 赛道ID映射
+TRACK_ID_MAP = {
+    0: "Melbourne", 2: "Shanghai", 3: "Bahrain", 4: "Catalunya",
+    5: "Monaco", 6: "Montreal", 7: "Silverstone", 9: "Hungaroring",
+    10: "Spa", 11: "Monza", 12: "Singapore", 13: "Suzuka",
+    14: "AbuDhabi", 15: "Texas", 16: "Brazil", 17: "Austria",
+    19: "Mexico", 20: "Baku", 26: "Zandvoort", 27: "Imola",
+    29: "Jeddah", 30: "Miami", 31: "LasVegas", 32: "Losail"
+}
+
+# Driver ID映射表
+DRIVER_ID_MAP = {
+    0: "Carlos Sainz", 2: "Daniel Ricciardo", 3: "Fernando Alonso",
+    4: "Felipe Massa", 7: "Lewis Hamilton", 9: "Max Verstappen",
+    10: "Nico Hülkenburg", 11: "Kevin Magnussen", 14: "Sergio Pérez",
+    15: "Valtteri Bottas", 17: "Esteban Ocon", 19: "Lance Stroll",
+    20: "Arron Barnes", 21: "Martin Giles", 22: "Alex Murray",
+    23: "Lucas Roth", 24: "Igor Correia", 25: "Sophie Levasseur",
+    26: "Jonas Schiffer", 27: "Alain Forest", 28: "Jay Letourneau",
+    29: "Esto Saari", 30: "Yasar Atiyeh", 31: "Callisto Calabresi",
+    32: "Naota Izumi", 33: "Howard Clarke", 34: "Lars Kaufmann",
+    35: "Marie Laursen", 36: "Flavio Nieves", 38: "Klimek Michalski",
+    39: "Santiago Moreno", 40: "Benjamin Coppens", 41: "Noah Visser",
+    50: "George Russell", 54: "Lando Norris", 58: "Charles Leclerc",
+    59: "Pierre Gasly", 62: "Alexander Albon", 70: "Rashid Nair",
+    71: "Jack Tremblay", 77: "Ayrton Senna", 80: "Guanyu Zhou",
+    83: "Juan Manuel Correa", 90: "Michael Schumacher", 94: "Yuki Tsunoda",
+    102: "Aidan Jackson", 109: "Jenson Button", 110: "David Coulthard",
+    112: "Oscar Piastri", 113: "Liam Lawson", 116: "Richard Verschoor",
+    123: "Enzo Fittipaldi", 125: "Mark Webber", 126: "Jacques Villeneuve",
+    127: "Callie Mayer", 132: "Logan Sargeant", 136: "Jack Doohan",
+    137: "Amaury Cordeel", 138: "Dennis Hauger", 145: "Zane Maloney",
+    146: "Victor Martins", 147: "Oliver Bearman", 148: "Jak Crawford",
+    149: "Isack Hadjar", 152: "Roman Stanek", 153: "Kush Maini",
+    156: "Brendon Leigh", 157: "David Tonizza", 158: "Jarno Opmeer",
+    159: "Lucas Blakeley", 160: "Paul Aron", 161: "Gabriel Bortoleto",
+    162: "Franco Colapinto", 163: "Taylor Barnard", 164: "Joshua Dürksen",
+    165: "Andrea-Kimi Antonelli", 166: "Ritomo Miyata", 167: "Rafael Villagómez",
+    168: "Zak O'Sullivan", 169: "Pepe Marti", 170: "Sonny Hayes",
+    171: "Joshua Pearce", 172: "Callum Voisin", 173: "Matias Zagazeta",
+    174: "Nikola Tsolov", 175: "Tim Tramnitz", 185: "Luca Cortez"
+}
+
+
+class CompoundSource:
+    """轮胎化合物来源：car_status中的化合物字段，以及化合物编号到INI中轮胎名称的换算"""
+
+    def __init__(self, name, column, compound_map, a_series, default_dry, legend, ini_comment=None):
+        """
+        :param column: 用于策略/降解分析的化合物字段
+        :param compound_map: 化合物编号 → 名称
+        :param a_series: 名称为C系列，写入INI时转换为A系列命名，只保留C系列与雨胎
+        :param default_dry: 没有降解数据时使用的三种干胎
+        :param legend: 日志中的编号说明
+        :param ini_comment: 写在INI文件头的注释行
+        """
+        self.name = name
+        self.column = column
+        self.compound_map = compound_map
+        self.a_series = a_series
+        self.default_dry = default_dry
+        self.legend = legend
+        self.ini_comment = ini_comment
+
+    def strategy_compound(self, compound_id):
+        """stint的化合物编号 → 策略中的轮胎名称"""
+        if not self.a_series:
+            return self.compound_map.get(compound_id, f"Unknown_{compound_id}")
+
+        compound = self.compound_map.get(compound_id, f"C{compound_id}")
+        # 转换为A系列命名
+        if compound.startswith('C') and len(compound) == 2:
+            compound = f"A{compound[1]}"
+        return compound
+
+    def sample_compound(self, compound_id):
+        """降解样本按化合物名称分组"""
+        return self.compound_map.get(compound_id, f"Unknown_{compound_id}")
+
+    def tireset_compound(self, compound):
+        """降解样本的化合物名称 → TIRESET_PARS中的轮胎名称，None表示不拟合"""
+        if not self.a_series:
+            return compound
+        if compound.startswith('C'):
+            return f"A{compound[1]}"
+        return compound if compound in ['I', 'W'] else None
+
+    def available_compound(self, compound):
+        """降解样本的化合物名称 → VSE_PARS中的可用干胎，None表示不计入"""
+        if not self.a_series:
+            return compound
+        return f"A{compound[1]}" if compound.startswith('C') else None
+
+
+ACTUAL_COMPOUNDS = CompoundSource(
+    'actual', 'actual_tyre_compound', TYRE_COMPOUND_MAP, a_series=True, default_dry=("A3", "A4", "A5"),
+    legend="16-22=C5-C0/C6 → A系列, 7=I, 8=W"
+)
+VISUAL_COMPOUNDS = CompoundSource(
+    'visual', 'visual_tyre_compound', VISUAL_TYRE_COMPOUND_MAP, a_series=False, default_dry=("A3", "A4", "A6"),
+    legend="16=Soft/A3, 17=Medium/A4, 18=Hard/A6, 7=Inter/I, 8=Wet/W",
+    ini_comment="# Using visual_tyre_compound for strategy analysis"
+)
+
+# 可选的轮胎化合物来源
+COMPOUND_SOURCES = {source.name: source for source in (ACTUAL_COMPOUNDS, VISUAL_COMPOUNDS)}
+
+
+class F1DataConverter:
+    # 默认的轮胎化合物来源（COMPOUND_SOURCES的键）
+    COMPOUND_SOURCE = 'actual'
+
+    # 增量转换时写入检查点的分析状态，其余结果（进站、FCY、退赛、策略、降解样本）都由这些状态重建
+    CHECKPOINT_ATTRS = (
+        'session_data', 'session_key', 'progress_index', 'driver_lap_times', '_participant_rows',
+        '_pit_runs', '_normal_lap_counts', '_sc_runs', '_status_runs', '_stint_runs',
+        '_closed_degradation', '_open_stint_rows', '_pending_tyre_rows', '_marks'
+    )
+
+    # 分析阶段写入、INI生成阶段读取的实例属性
+    ANALYSIS_RESULTS = (
+        'session_data', 'session_key', 'participants', 'progress_index', 'driver_lap_times', 'pit_stop_data',
+        'fcy_phases', 'retirements', 'driver_strategies', 'tyre_degradation_data'
+    )
+
+    # 依赖轮胎化合物来源的状态，每个来源各一份；其余状态所有来源共用
+    COMPOUND_STATE = (
+        'driver_strategies', 'tyre_degradation_data', 'degradation_stats', '_stint_runs', '_closed_degradation',
+        '_open_stint_rows'
+    )
+
+    # 依赖轮胎化合物来源的分析阶段与参数段，多个来源时按来源分别执行，其余阶段只执行一次
+    COMPOUND_STAGES = ('analyze_strategies', 'analyze_tyre_degradation', 'tireset_pars', 'driver_pars', 'vse_pars')
+    # 会创建进程池的阶段，不与其他阶段并发执行
+    PROCESS_POOL_STAGES = ('vse_pars',)
+
+    def __init__(self, data_dir="f1_telemetry_data", max_workers=None, n_bootstrap=1000, stage_workers=None,
+                 compound_sources=None):
+        """
+        :param max_workers: 策略优化的进程数
+        :param stage_workers: 并发执行独立分析阶段的线程数，1表示串行
+        :param compound_sources: 轮胎化合物来源（COMPOUND_SOURCES的键）或来源列表，默认为COMPOUND_SOURCE；
+                                 多个来源时共用一次加载与分析，convert()为每个来源输出一份INI
+        """
+        names = compound_sources or self.COMPOUND_SOURCE
+        names = list(dict.fromkeys([names] if isinstance(names, str) else names))
+        unknown = [name for name in names if name not in COMPOUND_SOURCES]
+        if unknown:
+            raise ValueError(f"未知的轮胎化合物来源: {', '.join(unknown)}")
+
+        self.compound_source = COMPOUND_SOURCES[names[0]]
+        self.data_dir = data_dir
+        self.max_workers = max_workers
+        self.n_bootstrap = n_bootstrap
+        self.stage_workers = stage_workers
+        self.session_data = {}
+        self.participants = {}
+        self.driver_lap_times = defaultdict(list)
+        self.pit_stop_data = defaultdict(list)
+        self.fcy_phases = []
+        self.retirements = []
+        self.progress_index = None
+        self.session_key = None
+        # 所有来源的化合物字段在同一次合并中取出
+        self._compound_columns = [COMPOUND_SOURCES[name].column for name in names]
+        self._lap_tyre_cache = {}
+        self._strategy_memo = {}
+        self.stage_timings = {}
+        # 性能分析模式（convert(profile_file=...)）下的逐阶段记录器
+        self.profiler = None
+
+        # 可跨数据批次累积的分析状态（区间表、计数、未结束stint的行）
+        self._participant_rows = None
+        self._pit_runs = None
+        self._normal_lap_counts = None
+        self._sc_runs = None
+        self._status_runs = None
+        self._pending_tyre_rows = {'lap_data': None, 'car_status': None}
+        self._marks = {}
+        self._reset_compound_state()
+
+        # 其余来源各一个副本：共用本实例的来源无关状态，只执行COMPOUND_STAGES
+        self._variants = [self._variant(COMPOUND_SOURCES[name]) for name in names[1:]]
+
+    def _reset_compound_state(self):
+        """初始化依赖轮胎化合物来源的状态（COMPOUND_STATE）"""
+        self.driver_strategies = defaultdict(list)
+        self.tyre_degradation_data = defaultdict(lambda: defaultdict(list))
+        self.degradation_stats = []
+        self._stint_runs = None
+        self._closed_degradation = {}
+        self._open_stint_rows = None
+
+    def _variant(self, compound_source):
+        """按另一个轮胎化合物来源分析的副本"""
+        variant = copy.copy(self)
+        variant.compound_source = compound_source
+        variant._variants = []
+        variant._reset_compound_state()
+        return variant
+
+    def _sync_variant(self, variant):
+        """把来源无关的状态同步到副本（分析过程中这些属性可能被重新赋值）"""
+        for attr, value in vars(self).items():
+            if attr not in self.COMPOUND_STATE and attr not in ('compound_source', '_variants'):
+                setattr(variant, attr, value)
+
+    @property
+    def compound_source_names(self):
+        """本实例及各副本的轮胎化合物来源，第一个为本实例的"""
+        return [self.compound_source.name] + [variant.compound_source.name for variant in self._variants]
+
+    @property
+    def stint_columns(self):
+        """未结束stint需要保留的列"""
+        return ['car_index', self.compound_source.column, 'tyres_age_laps', 'current_lap_num', 'last_lap_time_ms',
+                'current_lap_invalid']
+
+    def _measure(self, name, rows_in=0):
+        """性能分析模式下测量一段代码（计入报告的name项），否则不做任何事"""
+        if self.profiler is None:
+            return contextlib.nullcontext({'rows_out': 0})
+        return self.profiler.measure(name, rows_in)
+
+    def load_csv_files(self):
+        """加载所有CSV文件"""
+        print("正在加载CSV文件...")
+
+        csv_files = {
+            'session': None, 'participants': None, 'lap_data': None,
+            'telemetry': None, 'car_status': None, 'car_damage': None,
+            'car_setups': None, 'final_classification': None
+        }
+
+        for filename in os.listdir(self.data_dir):
+            if not filename.endswith('.csv'):
+                continue
+
+            for key in csv_files.keys():
+                if filename.startswith(key):
+                    filepath = os.path.join(self.data_dir, filename)
+                    try:
+                        df = pd.read_csv(filepath, index_col=False)
+                        csv_files[key] = df
+                        print(f"  ✓ 加载 {filename}: {len(df)} 行")
+                    except Exception as e:
+                        print(f"  ✗ 加载 {filename} 失败: {e}")
+
+        return csv_files
+
+    def extract_session_info(self, session_df):
+        """提取赛事基本信息"""
+        if session_df is None or len(session_df) == 0:
+            return None
+
+        row = session_df.iloc[0]
+
+        return {
+            'track_id': int(row.get('track_id', -1)),
+            'track_name': TRACK_ID_MAP.get(int(row.get('track_id', -1)), "Unknown"),
+            'total_laps': int(row.get('total_laps', 0)),
+            'track_length': int(row.get('track_length', 0)),
+            'session_type': int(row.get('session_type', 0)),
+            'formula': int(row.get('formula', 0)),
+            'pit_speed_limit': int(row.get('pit_speed_limit', 0))
+        }
+
+    def _session_key(self, csv_files):
+        """session标识：优先使用session_uid，缺失时使用数据目录名"""
+        for key in ('session', 'lap_data'):
+            df = csv_files.get(key)
+            if df is not None and len(df) > 0 and 'session_uid' in df.columns:
+                return str(df['session_uid'].iloc[0])
+        return os.path.basename(os.path.normpath(self.data_dir))
+
+    def extract_participants_info(self, participants_df, out=None):
+        """提取参赛者信息 - 使用driver_id映射姓名"""
+        if participants_df is None or len(participants_df) == 0:
+            return {}
+
+        print("\n提取参赛者信息...", file=out)
+        participants = {}
+
+        # 获取每个car_index的最新记录
+        for car_idx in participants_df['car_index'].unique():
+            car_data = participants_df[participants_df['car_index'] == car_idx].iloc[-1]
+
+            team_id = int(car_data.get('team_id', 255))
+            driver_id = int(car_data.get('driver_id', 255))
+
+            # 跳过无效的车辆索引
+            if team_id == 255 or driver_id == 255:
+                continue
+
+            driver_name = DRIVER_ID_MAP.get(driver_id, f'Driver_{car_idx}')
+
+            participants[int(car_idx)] = {
+                'name': driver_name,
+                'driver_id': driver_id,
+                'team_id': team_id,
+                'team': TEAM_ID_MAP.get(team_id, f"Team_{team_id}"),
+                'race_number': int(car_data.get('race_number', 0)),
+                'ai_controlled': int(car_data.get('ai_controlled', 1))
+            }
+
+        print(f"  找到 {len(participants)} 位参赛者", file=out)
+        for idx, info in participants.items():
+            print(f"    车辆{idx}: {info['name']} ({info['team']}) [Driver ID: {info['driver_id']}]", file=out)
+
+        return participants
+
+    def analyze_lap_times(self, lap_data_df, summarize=True, out=None):
+        """
+        分析圈速数据
+
+        同一圈内各采样行的圈速相同，连续相同的 (圈数, 圈速) 合并为一条记录，'samples'为合并的行数
+        """
+        if lap_data_df is None or len(lap_data_df) == 0:
+            return
+
+        if summarize:
+            print("\n分析圈速数据...", file=out)
+
+        # 提取有效圈速，按车辆稳定排序后与同车上一行不同处开始新记录
+        valid_laps = lap_data_df.loc[
+            (lap_data_df['last_lap_time_ms'] > 0) & (lap_data_df['current_lap_invalid'] == 0),
+            ['car_index', 'current_lap_num', 'last_lap_time_ms']
+        ].sort_values('car_index', kind='stable')
+        values = valid_laps.to_numpy()
+        is_start = np.ones(len(values), dtype=bool)
+        is_start[1:] = (values[1:] != values[:-1]).any(axis=1)
+        starts = np.flatnonzero(is_start)
+        counts = np.diff(np.append(starts, len(values)))
+        records = values[starts]
+
+        for car_idx in lap_data_df['car_index'].unique():
+            left = np.searchsorted(records[:, 0], car_idx, side='left')
+            right = np.searchsorted(records[:, 0], car_idx, side='right')
+            if left == right:
+                continue
+
+            laps = self.driver_lap_times[car_idx]
+            for (_, lap_num, lap_ms), n in zip(records[left:right], counts[left:right]):
+                # 上一批次最后一条记录的同一圈延续到本批次
+                if laps and laps[-1]['lap_num'] == lap_num and laps[-1]['lap_time_ms'] == lap_ms:
+                    laps[-1]['samples'] += int(n)
+                    continue
+                laps.append({
+                    'lap_num': int(lap_num),
+                    'lap_time_ms': int(lap_ms),
+                    'lap_time_s': lap_ms / 1000.0,
+                    'samples': int(n)
+                })
+
+    def analyze_pit_stops(self, lap_data_df, summarize=True, out=None):
+        """分析进站数据 - 用于计算进出站时间损失"""
+        if lap_data_df is not None and len(lap_data_df) > 0:
+            # 检测进站：pit_status从0变为非0即进站，回到0即出站
+            pit_runs = run_length_encode(
+                lap_data_df, lap_data_df['pit_status'] > 0,
+                order_col='current_lap_num', carry=['last_lap_time_ms']
+            )
+            self._pit_runs = merge_runs(self._pit_runs, pit_runs)
+
+            # 正常圈速按 (车辆, 圈速) 计数累积，中位数可由计数精确求出
+            normal_laps = lap_data_df[
+                (lap_data_df['last_lap_time_ms'] > 0) &
+                (lap_data_df['pit_status'] == 0) &
+                (lap_data_df['current_lap_invalid'] == 0)
+            ]
+            counts = normal_laps.groupby(['car_index', 'last_lap_time_ms']).size()
+            if self._normal_lap_counts is not None:
+                counts = counts.add(self._normal_lap_counts, fill_value=0).astype(int)
+            self._normal_lap_counts = counts
+
+        if self._pit_runs is None or not summarize:
+            return
+
+        print("\n分析进站数据...", file=out)
+
+        self.pit_stop_data = defaultdict(list)
+        pit_runs = self._pit_runs[~self._pit_runs['is_first']]
+        pit_entries = pit_runs[pit_runs['value']]
+        pit_exits = pit_runs[~pit_runs['value']]
+
+        # 每辆车的正常圈速中位数只计算一次
+        baseline = self._median_by_car(self._normal_lap_counts) / 1000.0
+
+        # 区间表已按(车辆, 圈数)排序，组合键后一次searchsorted为每次进站找到同车第一个出站
+        key_scale = float(max(pit_runs['start'].max(), 0) + 1) if len(pit_runs) else 1.0
+        entry_cars = pit_entries['car_index'].to_numpy()
+        exit_cars = pit_exits['car_index'].to_numpy()
+        exit_keys = exit_cars * key_scale + pit_exits['start'].to_numpy()
+        entry_keys = entry_cars * key_scale + pit_entries['start'].to_numpy()
+        exit_pos = np.searchsorted(exit_keys, entry_keys, side='left')
+
+        matched = exit_pos < len(exit_keys)
+        matched[matched] = exit_cars[exit_pos[matched]] == entry_cars[matched]
+        avg_normal_lap = baseline.reindex(entry_cars).to_numpy()
+        matched &= ~np.isnan(avg_normal_lap)
+
+        entry_ms = pit_entries['last_lap_time_ms'].to_numpy()[matched]
+        exit_ms = pit_exits['last_lap_time_ms'].to_numpy()[exit_pos[matched]]
+        avg_normal_lap = avg_normal_lap[matched]
+
+        inlap_time = np.where(entry_ms > 0, entry_ms / 1000.0, avg_normal_lap)
+        outlap_time = np.where(exit_ms > 0, exit_ms / 1000.0, avg_normal_lap)
+        inlap_loss = np.maximum(0, inlap_time - avg_normal_lap)
+        outlap_loss = np.maximum(0, outlap_time - avg_normal_lap)
+
+        for car_idx, lap_num, in_loss, out_loss in zip(
+            entry_cars[matched], pit_entries['start'].to_numpy()[matched], inlap_loss, outlap_loss
+        ):
+            self.pit_stop_data[car_idx].append({
+                'lap_num': int(lap_num),
+                'inlap_loss': in_loss,
+                'outlap_loss': out_loss
+            })
+
+        # 打印统计
+        total_stops = sum(len(stops) for stops in self.pit_stop_data.values())
+        print(f"  找到 {total_stops} 次进站", file=out)
+
+    @staticmethod
+    def _median_by_car(counts):
+        """由 (车辆, 圈速) → 次数 的计数求每辆车的中位数（偶数个时取中间两个的均值）"""
+        if counts is None or len(counts) == 0:
+            return pd.Series(dtype=float)
+
+        table = counts.sort_index().rename('count').reset_index()
+        cars = table['car_index']
+        upper = table.groupby(cars)['count'].cumsum()
+        lower = upper - table['count']
+        total = table.groupby(cars)['count'].transform('sum')
+
+        middle = []
+        for rank in ((total - 1) // 2, total // 2):
+            holds = (lower <= rank) & (rank < upper)
+            middle.append(table[holds].set_index('car_index')['last_lap_time_ms'])
+        return (middle[0] + middle[1]) / 2
+
+    def analyze_fcy_phases(self, session_df, lap_data_df, summarize=True, out=None):
+        """分析FCY（安全车/VSC）阶段"""
+        if session_df is not None and len(session_df) > 0:
+            # 安全车状态游程 (0=无, 1=全场, 2=虚拟, 3=编队圈)
+            sc_runs = run_length_encode(
+                session_df, 'safety_car_status', group_col=None, order_col='timestamp'
+            )
+            self._sc_runs = merge_runs(self._sc_runs, sc_runs, group_col=None)
+
+        if self._sc_runs is None or not summarize:
+            return
+
+        print("\n分析FCY阶段...", file=out)
+
+        self.fcy_phases = []
+        fcy_start = None
+        fcy_type = None
+
+        for run in self._sc_runs.itertuples(index=False):
+            sc_status = int(run.value)
+
+            if sc_status in [1, 2] and fcy_start is None:  # FCY开始
+                fcy_start = run.start
+                fcy_type = "SC" if sc_status == 1 else "VSC"
+
+            elif sc_status == 0 and fcy_start is not None:  # FCY结束
+                self.fcy_phases.append({
+                    'start_time': fcy_start,
+                    'end_time': run.start,
+                    'type': fcy_type,
+                    'duration': run.start - fcy_start
+                })
+                fcy_start = None
+                fcy_type = None
+
+        print(f"  找到 {len(self.fcy_phases)} 个FCY阶段", file=out)
+        for phase in self.fcy_phases:
+            print(f"    {phase['type']}: {phase['start_time']:.1f}s - {phase['end_time']:.1f}s", file=out)
+
+    def analyze_retirements(self, lap_data_df, summarize=True, out=None):
+        """分析车手退赛"""
+        if lap_data_df is not None and len(lap_data_df) > 0:
+            # 检测退赛：result_status变为7或4 (7=retired, 4=dnf)，取每辆车的第一次
+            status_runs = run_length_encode(
+                lap_data_df, lap_data_df['result_status'].isin([4, 7]),
+                order_col='current_lap_num', carry=['timestamp']
+            )
+            self._status_runs = merge_runs(self._status_runs, status_runs)
+
+        if self._status_runs is None or not summarize:
+            return
+
+        print("\n分析退赛情况...", file=out)
+
+        self.retirements = []
+        first_retirements = self._status_runs[self._status_runs['value']].drop_duplicates('car_index')
+
+        for retirement in first_retirements.itertuples(index=False):
+            self.retirements.append({
+                'car_index': retirement.car_index,
+                'lap_num': float(retirement.start),
+                'timestamp': retirement.timestamp
+            })
+
+        print(f"  找到 {len(self.retirements)} 次退赛", file=out)
+        for ret in self.retirements:
+            initials = self._get_driver_initials(ret['car_index'])
+            print(f"    {initials}: 第{ret['lap_num']:.1f}圈", file=out)
+
+    def _merge_lap_tyre_data(self, lap_data_df, car_status_df):
+        """合并lap_data与car_status的轮胎字段 - 同一次转换中各来源的策略与降解分析共用一份结果"""
+        status_cols = self._compound_columns + ['tyres_age_laps']
+        cache_key = tuple(status_cols)
+
+        cached = self._lap_tyre_cache.get(cache_key)
+        if cached is not None and cached[0] is lap_data_df and cached[1] is car_status_df:
+            return cached[2]
+
+        if all(key in lap_data_df.columns and key in car_status_df.columns for key in FRAME_JOIN_KEYS):
+            # 同一帧的LapData与CarStatus包共享帧号，按(session_uid, frame, car_index)精确哈希连接
+            status_df = car_status_df[FRAME_JOIN_KEYS + status_cols].drop_duplicates(
+                subset=FRAME_JOIN_KEYS, keep='last'
+            )
+            merged = lap_data_df.merge(status_df, on=FRAME_JOIN_KEYS, how='left', sort=False)
+            merged['car_index'] = merged['car_index'].astype(int)
+        else:
+            # 旧版CSV没有帧号，退回按时间戳就近对齐
+            lap_df = lap_data_df.copy()
+            status_df = car_status_df[['timestamp', 'car_index'] + status_cols].copy()
+
+            lap_df['timestamp'] = lap_df['timestamp'].astype(float).round(3)
+            status_df['timestamp'] = status_df['timestamp'].astype(float).round(3)
+            lap_df['car_index'] = lap_df['car_index'].astype(int)
+            status_df['car_index'] = status_df['car_index'].astype(int)
+
+            merged = pd.merge_asof(
+                lap_df,
+                status_df,
+                on='timestamp',
+                by='car_index',
+                direction='nearest',
+                tolerance=1
+            )
+
+        # 缓存时保留原始DataFrame的引用，以身份判断命中
+        self._lap_tyre_cache[cache_key] = (lap_data_df, car_status_df, merged)
+        return merged
+
+    def analyze_strategies(self, lap_data_df, car_status_df, summarize=True, out=None):
+        """分析车手策略（轮胎选择和进站圈数）"""
+        if lap_data_df is not None and car_status_df is not None:
+            merged = self._merge_lap_tyre_data(lap_data_df, car_status_df)
+            tyre_data = merged[merged[self.compound_source.column].notna()]
+
+            # 检测轮胎更换：化合物变化或胎龄回落即开始新stint
+            stints = run_length_encode(
+                tyre_data, self.compound_source.column, order_col='current_lap_num',
+                reset_col='tyres_age_laps', carry=['tyres_age_laps'], carry_end=['tyres_age_laps']
+            )
+            self._stint_runs = merge_runs(self._stint_runs, stints, reset_col='tyres_age_laps')
+
+        if self._stint_runs is None or not summarize:
+            return
+
+        print("\n分析比赛策略...", file=out)
+        print(f"  使用 {self.compound_source.column} 字段 ({self.compound_source.legend})", file=out)
+
+        self.driver_strategies = defaultdict(list)
+        for car_idx, car_stints in self._stint_runs.groupby('car_index', sort=False):
+            strategy = []
+            for stint in car_stints.itertuples(index=False):
+                compound = self.compound_source.strategy_compound(int(stint.value))
+                lap_num = int(stint.start) - 1 if stint.start > 0 else 0
+                tyre_age = int(stint.tyres_age_laps)
+
+                strategy.append([lap_num, compound, tyre_age, 0.0])
+
+            if strategy:
+                self.driver_strategies[car_idx] = strategy
+                initials = self._get_driver_initials(car_idx)
+                compounds_used = ' -> '.join([s[1] for s in strategy])
+                print(f"    {initials}: {compounds_used}", file=out)
+
+        print(f"  分析了 {len(self.driver_strategies)} 位车手的策略", file=out)
+
+    def analyze_tyre_degradation(self, lap_data_df, car_status_df, telemetry_df, summarize=True, out=None):
+        """分析轮胎降解数据"""
+        if lap_data_df is not None and car_status_df is not None:
+            merged = self._merge_lap_tyre_data(lap_data_df, car_status_df)
+
+            if summarize:
+                print("\n分析轮胎降解数据...", file=out)
+                print(f"  使用 {self.compound_source.column} 字段", file=out)
+                print(f"  合并后数据: {len(merged)} 行", file=out)
+                print(f"  包含轮胎数据的行: {merged[self.compound_source.column].notna().sum()}", file=out)
+
+            # 上一批次未结束的stint与新数据一起重新划分
+            tyre_data = merged.loc[merged[self.compound_source.column].notna(), self.stint_columns].assign(rows=1)
+            if self._open_stint_rows is not None:
+                tyre_data = pd.concat([self._open_stint_rows, tyre_data], ignore_index=True)
+
+            stint_ids = label_runs(
+                tyre_data, self.compound_source.column, order_col='current_lap_num', reset_col='tyres_age_laps'
+            )
+            tyre_data = self._compress_stint_rows(
+                tyre_data.loc[stint_ids.index].assign(tyre_stint=stint_ids.to_numpy())
+            )
+
+            # 每辆车的最后一个stint可能仍在继续，行保留到下一批次；其余stint已完整，样本直接累积
+            last_stint = tyre_data.groupby('car_index')['tyre_stint'].transform('max')
+            is_open = tyre_data['tyre_stint'] == last_stint
+            self._open_stint_rows = tyre_data.loc[is_open, self.stint_columns + ['rows']]
+            self._add_degradation_samples(self._closed_degradation, tyre_data[~is_open])
+        elif self._open_stint_rows is None:
+            return
+
+        if not summarize:
+            return
+
+        # 已完成stint的样本 + 未结束stint的当前样本，按车辆顺序汇总
+        samples = {car_idx: {name: list(data) for name, data in compounds.items()}
+                   for car_idx, compounds in self._closed_degradation.items()}
+        self._add_degradation_samples(samples, self._open_stint_rows.assign(
+            tyre_stint=self._open_stint_rows['car_index'].to_numpy()
+        ))
+        self.tyre_degradation_data = defaultdict(lambda: defaultdict(list))
+        for car_idx in sorted(samples):
+            for compound_name, data in samples[car_idx].items():
+                self.tyre_degradation_data[car_idx][compound_name] = data
+
+        total_stints = sum(len(compounds) for compounds in self.tyre_degradation_data.values())
+        print(f"  找到 {total_stints} 个轮胎stint用于分析", file=out)
+        for car_idx, compounds in self.tyre_degradation_data.items():
+            if compounds:
+                initials = self._get_driver_initials(car_idx)
+                print(f"    {initials}: {', '.join(compounds.keys())}", file=out)
+
+    @staticmethod
+    def _compress_stint_rows(tyre_data):
+        """已按 (车辆, 圈数) 排序的stint行中，连续完全相同的行合并为一行，'rows'累加合并的行数"""
+        if len(tyre_data) == 0:
+            return tyre_data
+
+        values = tyre_data.drop(columns='rows').to_numpy()
+        is_start = np.ones(len(values), dtype=bool)
+        is_start[1:] = (values[1:] != values[:-1]).any(axis=1)
+        starts = np.flatnonzero(is_start)
+        return tyre_data.iloc[starts].assign(rows=np.add.reduceat(tyre_data['rows'].to_numpy(), starts))
+
+    def _add_degradation_samples(self, target, tyre_data):
+        """把已标注tyre_stint的行中符合条件的stint样本追加到 {车辆: {轮胎: [样本]}}"""
+        # 每个stint至少3行，且其中至少3行有效圈速（按合并前的行数计）
+        rows = tyre_data['rows']
+        valid = (tyre_data['last_lap_time_ms'] > 0) & (tyre_data['current_lap_invalid'] == 0)
+        stint_size = rows.groupby(tyre_data['tyre_stint']).transform('sum')
+        stint_valid = (rows * valid).groupby(tyre_data['tyre_stint']).transform('sum')
+        stint_rows = tyre_data[valid & (stint_size >= 3) & (stint_valid >= 3)]
+
+        for (car_idx, _), stint_data in stint_rows.groupby(['car_index', 'tyre_stint'], sort=False):
+            compound_name = self.compound_source.sample_compound(int(stint_data[self.compound_source.column].iloc[0]))
+
+            target.setdefault(car_idx, {}).setdefault(compound_name, []).extend(
+                {'tyre_age': int(age), 'lap_time_s': lap_ms / 1000.0, 'lap_num': int(lap), 'samples': int(n)}
+                for age, lap_ms, lap, n in zip(
+                    stint_data['tyres_age_laps'].to_numpy(),
+                    stint_data['last_lap_time_ms'].to_numpy(),
+                    stint_data['current_lap_num'].to_numpy(),
+                    stint_data['rows'].to_numpy()
+                )
+            )
+
+    def fit_tyre_degradation(self, tyre_data):
+        """拟合轮胎降解曲线 - 线性模型"""
+        return fit_degradation_batch([degradation_samples(tyre_data)], n_bootstrap=self.n_bootstrap)[0]
+
+    def calculate_track_parameters(self, out=None):
+        """计算赛道参数 - 基于analyze_lap_times()累积的有效圈速"""
+        if not self.driver_lap_times:
+            return {}
+
+        print("\n计算赛道参数...", file=out)
+
+        laps = [lap for car_laps in self.driver_lap_times.values() for lap in car_laps]
+        if not laps:
+            return {}
+
+        lap_ms = np.array([lap['lap_time_ms'] for lap in laps], dtype=float)
+        samples = np.array([lap['samples'] for lap in laps])
+        t_q = lap_ms.min() / 1000.0
+
+        # 最快10%采样行的平均圈速：按圈速排序后依次取各记录的采样数，直到取满
+        n_fastest = max(1, samples.sum() // 10)
+        order = np.argsort(lap_ms, kind='stable')
+        lap_ms, samples = lap_ms[order], samples[order]
+        taken = np.clip(n_fastest - (np.cumsum(samples) - samples), 0, samples)
+        t_race = (lap_ms * taken).sum() / n_fastest / 1000.0
+        t_gap_racepace = t_race - t_q
+
+        # 计算进出站时间损失
+        pit_stats = self._calculate_pit_drive_times()
+
+        track_params = {
+            't_q': round(t_q, 3),
+            't_gap_racepace': round(max(0.5, t_gap_racepace), 3),
+            't_lap_sens_mass': 0.03,
+            't_pit_tirechange_min': 2.0,
+            **pit_stats,  # 添加进出站时间
+            'pits_aft_finishline': True,
+            't_loss_pergridpos': round(t_q * 0.0015, 3),
+            't_loss_firstlap': round(t_q * 0.025, 3),
+            't_gap_overtake': 1.2,
+            't_gap_overtake_vel': -0.035,
+            't_drseffect': -0.5,
+            'mult_t_lap_sc': 1.6,
+            'mult_t_lap_fcy': 1.4
+        }
+
+        return track_params
+
+    def _calculate_pit_drive_times(self):
+        """计算进出站时间损失"""
+        if not self.pit_stop_data:
+            # 使用默认值
+            return {
+                't_pitdrive_inlap': 5.0,
+                't_pitdrive_outlap': 15.0,
+                't_pitdrive_inlap_fcy': 2.5,
+                't_pitdrive_outlap_fcy': 12.0,
+                't_pitdrive_inlap_sc': 0.5,
+                't_pitdrive_outlap_sc': 11.0
+            }
+
+        # 计算平均进出站时间损失
+        all_inlap = []
+        all_outlap = []
+
+        for stops in self.pit_stop_data.values():
+            for stop in stops:
+                all_inlap.append(stop['inlap_loss'])
+                all_outlap.append(stop['outlap_loss'])
+
+        avg_inlap = np.median(all_inlap) if all_inlap else 5.0
+        avg_outlap = np.median(all_outlap) if all_outlap else 15.0
+
+        return {
+            't_pitdrive_inlap': round(avg_inlap, 3),
+            't_pitdrive_outlap': round(avg_outlap, 3),
+            't_pitdrive_inlap_fcy': round(avg_inlap * 0.5, 3),
+            't_pitdrive_outlap_fcy': round(avg_outlap * 0.8, 3),
+            't_pitdrive_inlap_sc': round(avg_inlap * 0.1, 3),
+            't_pitdrive_outlap_sc': round(avg_outlap * 0.73, 3)
+        }
+
+    def _calculate_optimal_strategy(self, initials, total_laps, available_compounds, tireset_pars):
+        """计算理论最优换胎策略（最小化总比赛时间）"""
+        problem, fallback = self._strategy_problem(initials, total_laps, available_compounds, tireset_pars)
+        if problem is None:
+            return fallback
+
+        solve_strategy_problems([problem], memo=self._strategy_memo, max_workers=1)
+        return self._solved_strategy(problem)
+
+    def _strategy_problem(self, initials, total_laps, available_compounds, tireset_pars):
+        """构造规范化的策略优化问题，无法优化时返回 (None, 默认策略)"""
+        if initials not in tireset_pars or not available_compounds:
+            # 返回默认2停策略
+            return None, [[0, 'A4', 0, 0.0], [int(total_laps * 0.35), 'A3', 0, 0.0], [int(total_laps * 0.7), 'A4', 0, 0.0]]
+
+        driver_tyre_pars = tireset_pars[initials]
+        dry_compounds = [c for c in available_compounds if c.startswith('A')]
+
+        if not dry_compounds:
+            return None, [[0, 'A4', 0, 0.0]]
+
+        # 获取每种轮胎的降解参数
+        compound_params = driver_compound_params(driver_tyre_pars, dry_compounds)
+
+        if not compound_params:
+            return None, [[0, 'A4', 0, 0.0]]
+
+        # 交给动态规划求解：覆盖任意停站次数和进站圈，且至少使用两种不同干胎
+        problem = strategy_problem_key(
+            compound_params, dry_compounds, total_laps, PIT_STOP_TIME_LOSS,
+            model=driver_tyre_pars.get('tire_deg_model', 'lin')
+        )
+        return problem, None
+
+    def _solved_strategy(self, problem):
+        """从缓存中取出已求解问题的最优策略"""
+        _, best_strategy = self._strategy_memo[problem]
+        return [list(stint) for stint in best_strategy] if best_strategy else [[0, 'A4', 0, 0.0]]
+
+    def _calculate_strategy_time(self, strategy, total_laps, compound_params, pit_stop_loss, model='lin'):
+        """计算策略的总时间（考虑轮胎降解和进站损失）"""
+        total_time = 0.0
+        pit_stops = len(strategy) - 1
+
+        for i in range(len(strategy)):
+            stint_start_lap = strategy[i][0]
+            compound = strategy[i][1]
+
+            # 计算stint结束圈
+            if i < len(strategy) - 1:
+                stint_end_lap = strategy[i + 1][0]
+            else:
+                stint_end_lap = total_laps
+
+            stint_laps = stint_end_lap - stint_start_lap
+
+            # 缺失的化合物使用平均值，stint损失为闭式求和
+            params = compound_params.get(compound, DEFAULT_COMPOUND_PARAMS)
+            total_time += float(stint_cost(params, stint_laps, model))
+
+        # 加上进站时间损失
+        total_time += pit_stops * pit_stop_loss
+
+        return total_time
+
+    def analyze(self, csv_files, incremental=False, summarize=True):
+        """
+        分析一批CSV数据，结果累积在实例状态中
+
+        :param csv_files: 完整数据，或增量模式下自上次检查点以来新增的行
+        :param incremental: 数据可能仍在写入（session未结束），lap_data与car_status只合并两表都已完整写入的帧
+        :param summarize: 是否由累积状态重建进站、FCY、策略等结果并输出；流式处理的中间块只累积状态
+        """
+        results = {}
+        available = [f'csv.{key}' for key in csv_files]
+        self._run_stages(self._analysis_stages(csv_files, results, incremental, summarize),
+                         results, available, csv_files)
+
+        # 其余来源复用合并结果与来源无关的状态，只执行依赖化合物字段的阶段
+        for variant in self._variants:
+            self._sync_variant(variant)
+            if summarize:
+                print(f"\n按 {variant.compound_source.column} 分析轮胎...")
+            variant_results = dict(results)
+            variant._run_stages(variant._analysis_stages(csv_files, variant_results, incremental, summarize),
+                                variant_results, available, csv_files, only=self.COMPOUND_STAGES)
+
+    def _analysis_stages(self, csv_files, results, incremental, summarize):
+        """analyze()的阶段图，阶段结果写入results"""
+        lap_data_df = csv_files['lap_data']
+
+        # 各阶段声明读取的CSV表（csv.*）、其他阶段的结果和写入的实例属性，互不依赖的阶段并发执行；
+        # 阶段函数的参数out是本阶段控制台输出写入的流
+        stages = [
+            Stage('extract_session', lambda out: self._update_session_info(csv_files),
+                  ('csv.session', 'csv.lap_data'), ('session_data', 'session_key')),
+            Stage('extract_participants',
+                  lambda out: self._update_participants(csv_files['participants'], summarize, out),
+                  ('csv.participants',), ('_participant_rows', 'participants')),
+            Stage('build_progress_index', lambda out: self._update_progress_index(lap_data_df),
+                  ('csv.lap_data', 'session_data'), ('progress_index',)),
+            Stage('complete_tyre_frames',
+                  lambda out: self._complete_tyre_frames(lap_data_df, csv_files['car_status'], incremental),
+                  ('csv.lap_data', 'csv.car_status'), ('_pending_tyre_rows',)),
+            Stage('merge_lap_tyre', lambda out: self._prepare_lap_tyre_data(*results['complete_tyre_frames']),
+                  ('complete_tyre_frames',), ('_lap_tyre_cache',)),
+            Stage('analyze_lap_times', lambda out: self.analyze_lap_times(lap_data_df, summarize, out),
+                  ('csv.lap_data',), ('driver_lap_times',)),
+            Stage('analyze_pit_stops', lambda out: self.analyze_pit_stops(lap_data_df, summarize, out),
+                  ('csv.lap_data',), ('_pit_runs', '_normal_lap_counts', 'pit_stop_data')),
+            Stage('analyze_fcy_phases',
+                  lambda out: self.analyze_fcy_phases(csv_files['session'], lap_data_df, summarize, out),
+                  ('csv.session',), ('_sc_runs', 'fcy_phases')),
+            Stage('analyze_retirements', lambda out: self.analyze_retirements(lap_data_df, summarize, out),
+                  ('csv.lap_data', 'participants'), ('_status_runs', 'retirements')),
+            Stage('analyze_strategies',
+                  lambda out: self.analyze_strategies(*results['complete_tyre_frames'], summarize, out),
+                  ('complete_tyre_frames', 'merge_lap_tyre', 'participants'), ('_stint_runs', 'driver_strategies')),
+            Stage('analyze_tyre_degradation',
+                  lambda out: self.analyze_tyre_degradation(
+                      *results['complete_tyre_frames'], csv_files.get('telemetry'), summarize, out
+                  ),
+                  ('complete_tyre_frames', 'merge_lap_tyre', 'participants'),
+                  ('_closed_degradation', '_open_stint_rows', 'tyre_degradation_data'))
+        ]
+        return stages
+
+    def _run_stages(self, stages, results, available=(), csv_files=None, only=None):
+        """
+        执行阶段图，各阶段耗时累加到stage_timings（流式处理时为所有数据块之和）
+
+        性能分析模式下串行执行，并记录各阶段的CPU时间、内存分配峰值与输入/输出行数
+
+        :param only: 只执行这些阶段，其余阶段的名称与输出视为已就绪
+        """
+        if only is not None:
+            available = list(available) + [name for stage in stages if stage.name not in only
+                                           for name in (stage.name,) + tuple(stage.outputs)]
+            stages = [stage for stage in stages if stage.name in only]
+
+        if self.profiler is not None:
+            timings = self.profiler.run(stages, available, results,
+                                        lambda name: self._row_count(name, results, csv_files))
+        else:
+            timings = run_stages(stages, available, results, max_workers=self.stage_workers)
+        for name, seconds in timings.items():
+            self.stage_timings[name] = self.stage_timings.get(name, 0.0) + seconds
+
+    def _row_count(self, name, results, csv_files=None):
+        """阶段输入/输出名称对应的行数：csv.* 为CSV表，其余为阶段结果或实例属性"""
+        if name.startswith('csv.'):
+            return count_rows((csv_files or {}).get(name[len('csv.'):]))
+        if name in results:
+            return count_rows(results[name])
+        return count_rows(getattr(self, name, None))
+
+    def _update_session_info(self, csv_files):
+        """提取赛事基本信息与session标识（只取第一次读到的）"""
+        if not self.session_data:
+            self.session_data = self.extract_session_info(csv_files['session'])
+        if self.session_key is None:
+            self.session_key = self._session_key(csv_files)
+
+    def _update_participants(self, participants_df, summarize=True, out=None):
+        """累积每辆车的最新参赛者记录"""
+        if participants_df is not None and len(participants_df) > 0:
+            # 只需保留每辆车的最新记录（按首次出现的顺序）
+            rows = participants_df if self._participant_rows is None else pd.concat(
+                [self._participant_rows, participants_df], ignore_index=True
+            )
+            latest = rows.drop_duplicates('car_index', keep='last').set_index('car_index', drop=False)
+            self._participant_rows = latest.loc[pd.unique(rows['car_index'])].reset_index(drop=True)
+        if summarize:
+            self.participants = self.extract_participants_info(self._participant_rows, out)
+
+    def _update_progress_index(self, lap_data_df):
+        """时间戳→比赛进度索引，FCY、退赛等事件换算共用"""
+        track_length = self.session_data.get('track_length', 0) if self.session_data else 0
+        if self.progress_index is None:
+            self.progress_index = RaceProgressIndex.from_lap_data(lap_data_df, track_length)
+        else:
+            self.progress_index = self.progress_index.extend(lap_data_df, track_length)
+
+    def _prepare_lap_tyre_data(self, lap_data_df, car_status_df):
+        """预先合并轮胎字段，策略与降解两个阶段并发执行时都直接命中缓存"""
+        if lap_data_df is not None and car_status_df is not None:
+            self._merge_lap_tyre_data(lap_data_df, car_status_df)
+
+    def analyze_stream(self, memory_limit_mb):
+        """
+        流式分析：按内存上限分块读取，每块只累积状态，全部读完后统一汇总
+
+        :param memory_limit_mb: 内存上限（MB）
+        :return: 是否读到了数据
+        """
+        print(f"正在流式读取CSV文件（内存上限 {memory_limit_mb} MB）...")
+
+        rows = defaultdict(int)
+        n_chunks = 0
+        batches = iter_session_batches(self.data_dir, memory_limit_mb)
+        while True:
+            with self._measure('load') as counts:
+                batch = next(batches, None)
+                counts['rows_out'] = count_rows(batch)
+            if batch is None:
+                break
+            self.analyze(batch, summarize=False)
+            n_chunks += 1
+            for key, df in batch.items():
+                if df is not None:
+                    rows[key] += len(df)
+
+        if not n_chunks:
+            return False
+
+        for key, n in rows.items():
+            print(f"  ✓ {key}: {n} 行")
+        print(f"  共 {n_chunks} 块")
+
+        self.analyze(dict.fromkeys(INCREMENTAL_TABLES))
+        return True
+
+    def _complete_tyre_frames(self, lap_data_df, car_status_df, incremental):
+        """
+        lap_data与car_status按帧连接前，接上次暂存的行，并只保留两表都已完整写入的帧
+
+        两表中较小的最后帧号可能只写了一部分车辆，该帧及之后的行暂存，与下一批数据一起处理；
+        非增量模式（数据已写完）下全部处理
+        """
+        tables = {}
+        for key, df in (('lap_data', lap_data_df), ('car_status', car_status_df)):
+            pending = self._pending_tyre_rows.get(key)
+            if pending is not None and len(pending) > 0:
+                df = pending if df is None else pd.concat([pending, df], ignore_index=True)
+            tables[key] = df
+
+        if not incremental or any(df is not None and 'frame' not in df.columns for df in tables.values()):
+            self._pending_tyre_rows = {'lap_data': None, 'car_status': None}
+            return tables['lap_data'], tables['car_status']
+
+        # 一张表既没有新增行也没有暂存的行时，另一张表的行还无法对齐，全部暂存
+        if any(df is None for df in tables.values()):
+            self._pending_tyre_rows = tables
+            return None, None
+
+        last_frames = [self._marks.get(key, {}).get('last_frame') for key in tables]
+        cutoff = min(frame if frame is not None else 0 for frame in last_frames) - 1
+
+        ready = {}
+        for key, df in tables.items():
+            complete = df['frame'] <= cutoff
+            ready[key] = df[complete]
+            self._pending_tyre_rows[key] = df[~complete]
+        return ready['lap_data'], ready['car_status']
+
+    def generate_ini_content(self, csv_files=None, incremental=False):
+        """生成完整的INI文件内容，csv_files为None时使用已累积的分析结果（如analyze_stream()之后）"""
+        return self.generate_ini_contents(csv_files, incremental)[self.compound_source.name]
+
+    def generate_ini_contents(self, csv_files=None, incremental=False):
+        """
+        为每个轮胎化合物来源生成INI文件内容，与来源无关的参数段只生成一次
+
+        :return: {来源: INI文件内容}，第一项为本实例的来源
+        """
+        if csv_files is not None:
+            self.analyze(csv_files, incremental)
+
+        results = {}
+        self._run_ini_stages(results)
+        contents = {self.compound_source.name: self._serialize_ini(results)}
+
+        for variant in self._variants:
+            self._sync_variant(variant)
+            # car_pars含随机项，各来源使用同一份
+            variant_results = {name: value for name, value in results.items() if name not in self.COMPOUND_STAGES}
+            variant._run_ini_stages(variant_results, only=self.COMPOUND_STAGES)
+            contents[variant.compound_source.name] = variant._serialize_ini(variant_results)
+        return contents
+
+    def _run_ini_stages(self, results, only=None):
+        """
+        执行generate_ini_contents()的阶段图
+
+        策略优化会fork进程池：其余参数段的线程池结束后，再在主线程中单独执行，fork时不存在其他线程
+        :param only: 只执行这些阶段，其余阶段的结果视为已在results中
+        """
+        stages = self._ini_stages(results)
+        names = [stage.name for stage in stages] if only is None else list(only)
+        for forks in (False, True):
+            self._run_stages(stages, results, self.ANALYSIS_RESULTS,
+                             only=[name for name in names if (name in self.PROCESS_POOL_STAGES) == forks])
+
+    def _ini_stages(self, results):
+        """generate_ini_contents()的阶段图，各参数段写入results"""
+        # 各参数段由已累积的分析结果独立生成，互不依赖的并发执行
+        return [
+            Stage('track_params', self.calculate_track_parameters, ('driver_lap_times', 'pit_stop_data')),
+            Stage('car_pars', lambda out: self._generate_car_pars(), ('participants',)),
+            Stage('tireset_pars', self._generate_tireset_pars,
+                  ('participants', 'session_key', 'tyre_degradation_data'), ('degradation_stats',)),
+            Stage('driver_pars', lambda out: self._generate_driver_pars(),
+                  ('participants', 'driver_lap_times', 'driver_strategies')),
+            Stage('monte_carlo_pars', lambda out: self._generate_monte_carlo_pars(),
+                  ('participants', 'driver_lap_times')),
+            Stage('event_pars', lambda out: self._generate_event_pars(),
+                  ('fcy_phases', 'retirements', 'progress_index')),
+            Stage('vse_pars', lambda out: self._generate_vse_pars_with_optimization(results['tireset_pars'], out),
+                  ('tireset_pars', 'session_data', 'participants', 'driver_strategies', 'tyre_degradation_data',
+                   'track_params', 'car_pars', 'driver_pars', 'monte_carlo_pars', 'event_pars'))
+        ]
+
+    def _serialize_ini(self, results):
+        """拼接INI文本并计入性能报告的serialization项"""
+        with self._measure('serialization', count_rows(results)) as counts:
+            ini_content = self._format_ini_content(results)
+            counts['rows_out'] = ini_content.count('\n') + 1
+        return ini_content
+
+    def _format_ini_content(self, results):
+        """由各参数段的生成结果拼接INI文本"""
+        track_params = results['track_params']
+
+        # 生成INI内容
+        ini_content = []
+        ini_content.append("# encoding UTF-8")
+        ini_content.append(f"# Generated from F1 25 telemetry data on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        if self.compound_source.ini_comment:
+            ini_content.append(self.compound_source.ini_comment)
+        ini_content.append("")
+
+        # [RACE_PARS]
+        ini_content.append("[RACE_PARS]")
+        participant_initials = [self._get_driver_initials(idx)
+                               for idx in sorted(self.participants.keys())]
+
+        race_pars = {
+            'season': 2025,
+            'tot_no_laps': self.session_data.get('total_laps', 50) if self.session_data else 50,
+            'min_t_dist': 0.5,
+            'min_t_dist_sc': 0.8,
+            't_duel': 0.3,
+            't_overtake_loser': 0.3,
+            'use_drs': True,
+            'drs_window': 1.0,
+            'drs_allow_lap': 3,
+            'drs_sc_delay': 2,
+            'participants': participant_initials
+        }
+
+        ini_content.append(f'race_pars = {json.dumps(race_pars, indent=4, cls=NumpyEncoder, ensure_ascii=False)}')
+        ini_content.append("")
+
+        # [TRACK_PARS]
+        ini_content.append("[TRACK_PARS]")
+        track_name = self.session_data.get('track_name', 'Unknown') if self.session_data else 'Unknown'
+        track_pars = {
+            'name': track_name,
+            **track_params
+        }
+        ini_content.append(f'track_pars = {json.dumps(track_pars, indent=4, cls=NumpyEncoder, ensure_ascii=False)}')
+        ini_content.append("")
+
+        # [CAR_PARS]
+        ini_content.append("[CAR_PARS]")
+        car_pars = results['car_pars']
+        ini_content.append(f'car_pars = {json.dumps(car_pars, indent=4, cls=NumpyEncoder, ensure_ascii=False)}')
+        ini_content.append("")
+
+        # [TIRESET_PARS] - 必须在VSE_PARS之前生成
+        ini_content.append("[TIRESET_PARS]")
+        tireset_pars = results['tireset_pars']
+        ini_content.append(f'tireset_pars = {json.dumps(tireset_pars, indent=4, cls=NumpyEncoder, ensure_ascii=False)}')
+        ini_content.append("")
+
+        # [DRIVER_PARS]
+        ini_content.append("[DRIVER_PARS]")
+        driver_pars = results['driver_pars']
+        ini_content.append(f'driver_pars = {json.dumps(driver_pars, indent=4, cls=NumpyEncoder, ensure_ascii=False)}')
+        ini_content.append("")
+
+        # [MONTE_CARLO_PARS]
+        ini_content.append("[MONTE_CARLO_PARS]")
+        monte_carlo_pars = results['monte_carlo_pars']
+        ini_content.append(f'monte_carlo_pars = {json.dumps(monte_carlo_pars, indent=4, cls=NumpyEncoder, ensure_ascii=False)}')
+        ini_content.append("")
+
+        # [EVENT_PARS]
+        ini_content.append("[EVENT_PARS]")
+        event_pars = results['event_pars']
+        ini_content.append(f'event_pars = {json.dumps(event_pars, indent=4, cls=NumpyEncoder, ensure_ascii=False)}')
+        ini_content.append("")
+
+        # [VSE_PARS] - 使用tireset_pars来计算最优策略
+        ini_content.append("[VSE_PARS]")
+        vse_pars = results['vse_pars']
+        ini_content.append(f'vse_pars = {json.dumps(vse_pars, indent=4, cls=NumpyEncoder, ensure_ascii=False)}')
+        ini_content.append("")
+
+        return '\n'.join(ini_content)
+
+    def _get_driver_initials(self, car_idx):
+        """生成车手缩写"""
+        if car_idx not in self.participants:
+            return f"DR{car_idx}"
+
+        name = self.participants[car_idx]['name']
+        parts = name.upper().split()
+
+        if len(parts) >= 2:
+            return parts[-1][:3]
+        else:
+            return parts[0][:3] if parts else f"DR{car_idx}"
+
+    def _generate_car_pars(self):
+        """生成车辆参数"""
+        teams = {}
+        team_colors = {
+            'Mercedes': '#00D2BE', 'Ferrari': '#DC0000', 'RedBull': '#1E41FF',
+            'Williams': '#005AFF', 'AstonMartin': '#006F62', 'Alpine': '#0090FF',
+            'RB': '#2B4562', 'Haas': '#B6BABD', 'McLaren': '#FF8700',
+            'Sauber': '#00E701'
+        }
+
+        for car_idx, participant in self.participants.items():
+            team = participant['team']
+            if team not in teams:
+                teams[team] = {
+                    'drivetype': 'combustion',
+                    'manufacturer': team,
+                    't_car': 0.0,
+                    'm_fuel': 110.0,
+                    'b_fuel_perlap': 1.6,
+                    'energy': None,
+                    'energy_perlap': None,
+                    'mult_consumption_sc': 0.25,
+                    'mult_consumption_fcy': 0.5,
+                    'auto_consumption_adjust': True,
+                    't_pit_tirechange_add': round(np.random.uniform(0.4, 1.2), 3),
+                    't_pit_refuel_perkg': None,
+                    't_pit_charge_perkwh': None,
+                    'color': team_colors.get(team, '#FFFFFF')
+                }
+
+        return teams
+
+    def _generate_tireset_pars(self, out=None):
+        """生成轮胎参数"""
+        print("\n拟合轮胎降解参数...", file=out)
+        tireset_pars = {}
+
+        if not self.tyre_degradation_data:
+            print("  ⚠ 警告: 没有找到轮胎降解数据，使用默认参数", file=out)
+            soft, medium, hard = self.compound_source.default_dry
+            for car_idx in self.participants.keys():
+                initials = self._get_driver_initials(car_idx)
+                tireset_pars[initials] = {
+                    **TIRESET_DEFAULTS,
+                    soft: {'k_0': 0.0, 'k_1_lin': 0.08, 'k_1_quad': 0.078, 'k_2_quad': 0.0001},
+                    medium: {'k_0': 0.2, 'k_1_lin': 0.10, 'k_1_quad': 0.095, 'k_2_quad': 0.0005},
+                    hard: {'k_0': 0.5, 'k_1_lin': 0.06, 'k_1_quad': 0.055, 'k_2_quad': 0.0003}
+                }
+            return tireset_pars
+
+        # 先收集所有车手/轮胎组合，再一次性批量拟合
+        fit_jobs = []
+        for car_idx, compounds in self.tyre_degradation_data.items():
+            initials = self._get_driver_initials(car_idx)
+            tireset_pars[initials] = dict(TIRESET_DEFAULTS)
+
+            for compound, data in compounds.items():
+                compound_key = self.compound_source.tireset_compound(compound)
+                if compound_key is not None:
+                    fit_jobs.append((initials, compound_key, degradation_samples(data)))
+
+        fit_results = fit_degradation_batch([samples for _, _, samples in fit_jobs], n_bootstrap=self.n_bootstrap)
+
+        # 保留可合并的充分统计量，多session汇总拟合时无需重新加载lap_data
+        job_stats = degradation_stats([samples for _, _, samples in fit_jobs])
+        self.degradation_stats = [
+            {'session': self.session_key, 'driver': initials, 'compound': compound_key, 'stats': stats}
+            for (initials, compound_key, _), stats in zip(fit_jobs, job_stats) if stats
+        ]
+
+        for (initials, compound_key, _), fit_result in zip(fit_jobs, fit_results):
+            if fit_result:
+                tireset_pars[initials][compound_key] = {param: fit_result[param] for param in TIRESET_FIT_PARAMS}
+                print(f"  ✓ {initials} - {compound_key}: "
+                      f"k_1_lin={fit_result['k_1_lin']:.4f}, "
+                      f"R²={fit_result['r_squared']:.3f}, "
+                      f"n={fit_result['n_samples']}"
+                      + self._format_fit_ci(fit_result), file=out)
+
+        return tireset_pars
+
+    def _format_fit_ci(self, fit_result):
+        """拟合报告中的k_1_lin bootstrap置信区间，未计算时为空"""
+        ci = fit_result.get('ci')
+        if not ci:
+            return ""
+        low, high = ci['k_1_lin']
+        return f", k_1_lin 95%CI=[{low:.4f}, {high:.4f}]"
+
+    def _generate_driver_pars(self):
+        """生成车手参数"""
+        driver_pars = {}
+
+        for car_idx, participant in self.participants.items():
+            initials = self._get_driver_initials(car_idx)
+
+            lap_times = self.driver_lap_times.get(car_idx, [])
+            if lap_times:
+                avg_lap_time = np.average(
+                    [lt['lap_time_s'] for lt in lap_times], weights=[lt['samples'] for lt in lap_times]
+                )
+                fastest_lap = min([lt['lap_time_s'] for lt in lap_times])
+                t_driver = avg_lap_time - fastest_lap
+            else:
+                t_driver = 0.0
+
+            # 使用分析得到的策略或默认策略
+            strategy = self.driver_strategies.get(car_idx, [[0, 'A4', 0, 0.0]])
+
+            driver_pars[initials] = {
+                'carno': participant['race_number'],
+                'name': participant['name'],
+                'initials': initials,
+                'team': participant['team'],
+                't_driver': round(max(0, t_driver), 3),
+                'strategy_info': strategy,
+                'p_grid': car_idx + 1,
+                't_teamorder': 0.0,
+                'vel_max': 330.0
+            }
+
+        return driver_pars
+
+    def _generate_monte_carlo_pars(self):
+        """生成蒙特卡洛参数"""
+        # 找到最快的车手作为参考
+        fastest_driver = None
+        fastest_time = float('inf')
+
+        for car_idx, lap_times in self.driver_lap_times.items():
+            if lap_times:
+                best_time = min([lt['lap_time_s'] for lt in lap_times])
+                if best_time < fastest_time:
+                    fastest_time = best_time
+                    fastest_driver = car_idx
+
+        ref_driver = self._get_driver_initials(fastest_driver) if fastest_driver else "HAM"
+
+        return {
+            'min_dist_sc': 1.5,
+            'min_dist_vsc': 1.5,
+            'ref_driver': ref_driver
+        }
+
+    def _generate_event_pars(self):
+        """生成事件参数（FCY和退赛）"""
+        # 转换FCY阶段为进度（圈数）：起止时间戳一次性插值
+        fcy_phases = []
+        if self.fcy_phases:
+            if self.progress_index is not None:
+                starts = self.progress_index.to_progress([phase['start_time'] for phase in self.fcy_phases])
+                ends = self.progress_index.to_progress([phase['end_time'] for phase in self.fcy_phases])
+            else:
+                starts = ends = np.zeros(len(self.fcy_phases))
+
+            for phase, start, end in zip(self.fcy_phases, starts, ends):
+                fcy_phases.append([
+                    round(float(start), 3),  # start progress
+                    round(float(end), 3),  # end progress
+                    phase['type'],
+                    None,
+                    None
+                ])
+
+        # 转换退赛为进度 - 设置为[]（允许模拟器随机生成）
+        retirements = []  # 设置为[]，让race simulation随机决定
+
+        return {
+            'fcy_data': {
+                'phases': fcy_phases if fcy_phases else [],
+                'domain': 'progress'
+            },
+            'retire_data': {
+                'retirements': retirements,
+                'domain': 'progress'
+            }
+        }
+
+    def _generate_vse_pars_with_optimization(self, tireset_pars, out=None):
+        """生成虚拟策略工程师参数（使用优化的base_strategy）"""
+        # 收集所有使用过的轮胎配方
+        all_compounds = set()
+        for compounds in self.tyre_degradation_data.values():
+            for compound in compounds.keys():
+                available_compound = self.compound_source.available_compound(compound)
+                if available_compound is not None:
+                    all_compounds.add(available_compound)
+
+        available = sorted(list(all_compounds)) if all_compounds else list(self.compound_source.default_dry)
+        available.extend(["I", "W"])  # 添加雨胎
+        dry_compounds = [c for c in available if c.startswith('A')]
+
+        # 获取总圈数
+        total_laps = self.session_data.get('total_laps', 50) if self.session_data else 50
+
+        # 生成基础策略和实际策略
+        base_strategy = {}
+        real_strategy = {}
+
+        print("\n计算理论最优策略...", file=out)
+
+        # 参数相同的车手共享同一个问题，去重后并行求解
+        problems = {}
+        for car_idx in self.participants.keys():
+            initials = self._get_driver_initials(car_idx)
+            problems[initials] = self._strategy_problem(initials, total_laps, dry_compounds, tireset_pars)
+
+        solve_strategy_problems(
+            [problem for problem, _ in problems.values() if problem is not None],
+            memo=self._strategy_memo, max_workers=self.max_workers
+        )
+
+        for car_idx in self.participants.keys():
+            initials = self._get_driver_initials(car_idx)
+
+            # 实际策略：使用分析得到的策略
+            if car_idx in self.driver_strategies:
+                real_strategy[initials] = self.driver_strategies[car_idx]
+            else:
+                # 默认策略
+                default_strat = [[0, 'A4', 0, 0.0], [int(total_laps * 0.5), 'A3', 0, 0.0]]
+                real_strategy[initials] = default_strat
+
+            # 基础策略：计算理论最优策略
+            problem, optimal_strategy = problems[initials]
+            if problem is not None:
+                optimal_strategy = self._solved_strategy(problem)
+            base_strategy[initials] = optimal_strategy
+
+            # 打印对比
+            print(f"  {initials}:", file=out)
+            print(f"    理论最优: {len(optimal_strategy)-1}停 - {' -> '.join([s[1] for s in optimal_strategy])}",
+                  file=out)
+            if initials in real_strategy:
+                print(f"    实际策略: {len(real_strategy[initials])-1}停 - "
+                      f"{' -> '.join([s[1] for s in real_strategy[initials]])}", file=out)
+
+        # VSE类型（全部使用supervised）
+        vse_type = {initials: 'supervised' for initials in base_strategy.keys()}
+
+        return {
+            'available_compounds': available,
+            'param_dry_compounds': dry_compounds,
+            'location_cat': 2,
+            'base_strategy': base_strategy,
+            'real_strategy': real_strategy,
+            'vse_type': vse_type
+        }
+
+    def _checkpoint_state(self):
+        """检查点中保存的分析状态，依赖轮胎化合物来源的部分每个副本另存一份"""
+        state = {attr: getattr(self, attr) for attr in self.CHECKPOINT_ATTRS}
+        state['compound_sources'] = self.compound_source_names
+        state['variants'] = [
+            {attr: getattr(variant, attr) for attr in self.CHECKPOINT_ATTRS if attr in self.COMPOUND_STATE}
+            for variant in self._variants
+        ]
+        return state
+
+    def _restore_checkpoint(self, state):
+        """从检查点恢复分析状态"""
+        for attr in self.CHECKPOINT_ATTRS:
+            setattr(self, attr, state[attr])
+        for variant, variant_state in zip(self._variants, state.get('variants', [])):
+            for attr, value in variant_state.items():
+                setattr(variant, attr, value)
+
+    def load_incremental_csv_files(self, checkpoint_file):
+        """
+        恢复检查点并只读取之后新增的CSV行
+
+        CSV被替换或截断、或检查点的轮胎化合物来源不同时丢弃检查点，从头读取
+        """
+        state = load_checkpoint(checkpoint_file)
+        # 早期的检查点没有记录来源，视为只有本实例的来源
+        names = self.compound_source_names
+        if state is not None and state.get('compound_sources', names[:1]) != names:
+            print(f"  ⚠ 检查点的轮胎化合物来源（{', '.join(state['compound_sources'])}）不同，重新完整分析")
+            state = None
+        if state is not None:
+            self._restore_checkpoint(state)
+            print(f"从检查点继续: {checkpoint_file}")
+
+        try:
+            csv_files, marks = read_increments(self.data_dir, self._marks)
+        except CheckpointMismatch as e:
+            print(f"  ⚠ CSV文件已变化（{e}），检查点失效，重新完整分析")
+            profiler = self.profiler
+            self.__init__(self.data_dir, self.max_workers, self.n_bootstrap, self.stage_workers,
+                          self.compound_source_names)
+            self.profiler = profiler
+            csv_files, marks = read_increments(self.data_dir, {})
+
+        self._marks = marks
+        for key, df in csv_files.items():
+            if df is not None:
+                print(f"  ✓ {key}: 新增 {len(df)} 行")
+
+        # 其余表不参与分析，增量模式下不读取
+        for key in ('telemetry', 'car_damage', 'car_setups', 'final_classification'):
+            csv_files[key] = None
+        return csv_files
+
+    def convert(self, output_filename=None, checkpoint_file=None, memory_limit_mb=None, profile_file=None):
+        """
+        执行转换
+
+        :param output_filename: 第一个轮胎化合物来源的输出文件，其余来源的文件名加 _<来源> 后缀
+        :param checkpoint_file: 检查点文件路径；指定时只分析上次转换之后新增的行，并在结束后更新检查点
+        :param memory_limit_mb: 内存上限（MB）；指定时分块流式读取CSV，不与checkpoint_file同时使用
+        :param profile_file: 性能报告（JSON）路径；指定时各阶段串行执行，逐阶段记录耗时、CPU时间、
+                             tracemalloc内存分配峰值与输入/输出行数
+        """
+        if not profile_file:
+            return self._convert(output_filename, checkpoint_file, memory_limit_mb)
+
+        profiler = self.profiler = StageProfiler()
+        try:
+            self._convert(output_filename, checkpoint_file, memory_limit_mb)
+        finally:
+            profiler.stop()
+            mode = 'incremental' if checkpoint_file else 'stream' if memory_limit_mb else 'full'
+            profiler.save(profile_file, data_dir=self.data_dir,
+                          module=os.path.splitext(os.path.basename(inspect.getfile(type(self))))[0], mode=mode,
+                          compound_sources=self.compound_source_names)
+            self.profiler = None
+        print(f"  性能报告: {profile_file}")
+
+    def _convert(self, output_filename, checkpoint_file, memory_limit_mb):
+        print("=" * 70)
+        print("F1 25 遥测数据转换为INI格式（增强版）")
+        print(f"使用 {', '.join(COMPOUND_SOURCES[name].column for name in self.compound_source_names)} 进行轮胎分析")
+        print("=" * 70)
+
+        if memory_limit_mb and not checkpoint_file:
+            if not self.analyze_stream(memory_limit_mb):
+                print("\n错误: 未找到有效的CSV文件!")
+                return
+            ini_contents = self.generate_ini_contents()
+        else:
+            with self._measure('load') as counts:
+                if checkpoint_file:
+                    csv_files = self.load_incremental_csv_files(checkpoint_file)
+                else:
+                    csv_files = self.load_csv_files()
+                counts['rows_out'] = count_rows(csv_files)
+
+            # 增量模式下各表都没有新增行时（如session结束后只新写了final_classification）仍由检查点状态重新生成
+            if not any(df is not None for df in csv_files.values()) and not self._marks:
+                print("\n错误: 未找到有效的CSV文件!")
+                return
+
+            # 出现final_classification表示session已结束，暂存的行全部处理
+            session_open = find_table_file(self.data_dir, 'final_classification') is None
+            ini_contents = self.generate_ini_contents(csv_files, incremental=bool(checkpoint_file) and session_open)
+
+        if output_filename is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            output_filename = f"race_pars_{timestamp}.ini"
+
+        outputs = []
+        for converter in [self] + self._variants:
+            filename = self._output_filename(output_filename, converter.compound_source)
+            with self._measure('serialization'):
+                with open(filename, 'w', encoding='utf-8') as f:
+                    f.write(ini_contents[converter.compound_source.name])
+
+            # 轮胎降解充分统计量与INI并列保存（<输出文件名>.degstats.json）
+            stats_filename = None
+            if converter.degradation_stats:
+                stats_filename = os.path.splitext(filename)[0] + '.degstats.json'
+                save_degradation_stats(stats_filename, converter.degradation_stats)
+            outputs.append((converter.compound_source, filename, stats_filename))
+
+        if checkpoint_file:
+            save_checkpoint(checkpoint_file, self._checkpoint_state())
+
+        print(f"\n{'=' * 70}")
+        for _, filename, stats_filename in outputs:
+            print(f"✓ 转换完成! 输出文件: {filename}")
+            if stats_filename:
+                print(f"  轮胎降解统计量: {stats_filename}")
+        print(f"{'=' * 70}")
+        print(f"\n已包含的参数:")
+        print(f"  ✓ RACE_PARS (比赛基本参数)")
+        print(f"  ✓ TRACK_PARS (赛道参数，包含进出站时间)")
+        print(f"  ✓ CAR_PARS (车辆参数)")
+        print(f"  ✓ TIRESET_PARS (轮胎降解参数)")
+        print(f"  ✓ DRIVER_PARS (车手参数和策略)")
+        print(f"  ✓ MONTE_CARLO_PARS (蒙特卡洛参数)")
+        print(f"  ✓ EVENT_PARS (FCY阶段和退赛)")
+        print(f"  ✓ VSE_PARS (虚拟策略工程师)")
+        print(f"\n新增功能:")
+        print(f"  ✓ base_strategy: 基于轮胎降解模型的理论最优策略")
+        print(f"  ✓ real_strategy: 从遥测数据分析的实际比赛策略")
+        for compound_source, filename, _ in outputs:
+            print(f"  ✓ 使用 {compound_source.column} ({compound_source.legend}): {filename}")
+
+    def _output_filename(self, output_filename, compound_source):
+        """第一个来源写入output_filename，其余来源的文件名加 _<来源> 后缀"""
+        if compound_source is self.compound_source:
+            return output_filename
+        stem, ext = os.path.splitext(output_filename)
+        return f"{stem}_{compound_source.name}{ext or '.ini'}"
+
+
+def main(argv=None, prog=None, converter_class=F1DataConverter, data_dir="f1_telemetry_data"):
+    """
+    命令行入口
+
+    :param converter_class: 转换器类，其COMPOUND_SOURCE为默认的轮胎化合物来源
+    :param data_dir: 默认数据目录
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(prog=prog, description="F1 25 遥测数据转换为INI格式")
+    parser.add_argument('data_dir', nargs='?', default=data_dir, help="数据目录")
+    parser.add_argument('-o', '--output', default=None, help="输出INI文件名（默认按时间戳命名）")
+    parser.add_argument('--checkpoint', default=None, help="检查点文件，只分析上次转换之后新增的行")
+    parser.add_argument('--memory-limit-mb', type=float, default=None, help="内存上限（MB），分块流式读取CSV")
+    parser.add_argument('--profile', nargs='?', const='profile.json', default=None, metavar='PATH',
+                        help="逐阶段记录耗时、CPU时间、内存分配峰值与行数，写出JSON报告（默认 profile.json）")
+    parser.add_argument('--compounds', nargs='+', choices=list(COMPOUND_SOURCES), default=None, metavar='SOURCE',
+                        help=f"轮胎化合物来源（{'/'.join(COMPOUND_SOURCES)}，默认 {converter_class.COMPOUND_SOURCE}）；"
+                             "多个来源时一次分析输出多份INI，第一个之后的文件名加 _<来源> 后缀")
+    parser.add_argument('--bootstrap', type=int, default=1000, metavar='N',
+                        help="轮胎衰减置信区间的bootstrap重采样次数，0表示不计算（默认 1000）")
+    args = parser.parse_args(argv)
+
+    # 创建转换器实例
+    converter = converter_class(data_dir=args.data_dir, n_bootstrap=args.bootstrap, compound_sources=args.compounds)
+
+    # 执行转换
+    converter.convert(args.output, args.checkpoint, args.memory_limit_mb, args.profile)
+
+
+if __name__ == "__main__":
+    main()
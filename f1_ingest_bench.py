@@ -0,0 +1,206 @@
+"""
+采集吞吐基准测试
+PacketSynthesizer生成的数据包经本机回环按给定帧率（或不限速）发送给子进程中的PacketCollector，
+测量持续吞吐（包/秒）、采集进程每包CPU时间、从发送到写入抓包文件的延迟与丢包率，
+用于估算一台主机可承载的模拟器数量、验证采集端的优化
+"""
+
+import multiprocessing
+import os
+import socket
+import tempfile
+import time
+
+import numpy as np
+
+from f1_bench import environment, save_report
+from f1_collect import FLUSH_INTERVAL, PacketCollector, iter_capture
+from f1_packets import PACKET_ID_OFFSET, PacketSynthesizer, packet_key, restamp
+
+# 默认测试的帧率（每秒帧数），None表示不限速
+DEFAULT_RATES = (60, 120, 240, None)
+
+# 发送结束后等待采集进程处理完缓冲区中数据包的时间（秒）
+DRAIN_S = 0.5
+
+# 数据包键 = 帧号 * KEY_STRIDE + packetId
+KEY_STRIDE = 16
+
+
+def _collector_process(output_file, flush_interval, recv_buffer, fsync, ports, stop, results):
+    """子进程：在系统分配的回环端口上采集，结束后把统计信息放入results"""
+    collector = PacketCollector(output_file, '127.0.0.1', 0, flush_interval, recv_buffer, fsync)
+    ports.put(collector.open())
+    try:
+        results.put(collector.serve(stop=stop, poll_interval=0.01))
+    finally:
+        collector.close()
+
+
+def send_frames(synth, address, rate, duration):
+    """
+    循环发送synth一个周期的数据包（逐包改写帧号与sessionTime），持续duration秒
+
+    :param rate: 每秒帧数，None表示不限速
+    :return: (各数据包的键数组, 发送时刻perf_counter_ns数组, 发送的帧数)
+    """
+    pool = synth.frames(synth.cycle_frames)
+    keys, sent_ns = [], []
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    start = time.perf_counter()
+    frame = 0
+    try:
+        while True:
+            now = time.perf_counter()
+            if now - start >= duration:
+                break
+            if rate is not None:
+                delay = start + frame / rate - now
+                if delay > 0:
+                    time.sleep(delay)
+            for packet in pool[frame % len(pool)]:
+                restamp(packet, frame / synth.rate, frame)
+                keys.append(frame * KEY_STRIDE + packet[PACKET_ID_OFFSET])
+                sent_ns.append(time.perf_counter_ns())
+                sock.sendto(packet, address)
+            frame += 1
+    finally:
+        sock.close()
+    return np.array(keys, dtype=np.int64), np.array(sent_ns, dtype=np.int64), frame
+
+
+def storage_latencies(capture_file, flushes, keys, sent_ns):
+    """
+    每个收到的数据包从发送到所在写入块刷新完成的延迟
+
+    :param flushes: PacketCollector统计中的 [(已写入记录数, 刷新时刻ns)]
+    :param keys: 发送的数据包键（递增）
+    :return: 延迟数组（ns）
+    """
+    received = []
+    for _, data in iter_capture(capture_file):
+        frame, packet_id = packet_key(data)
+        received.append(frame * KEY_STRIDE + packet_id)
+    received = np.array(received, dtype=np.int64)
+    if len(received) == 0 or not flushes:
+        return np.array([], dtype=np.int64)
+
+    counts = np.array([count for count, _ in flushes])
+    flush_ns = np.array([ns for _, ns in flushes], dtype=np.int64)
+    stored_ns = flush_ns[np.minimum(np.searchsorted(counts, np.arange(len(received)), side='right'),
+                                    len(flushes) - 1)]
+
+    index = np.minimum(np.searchsorted(keys, received), len(keys) - 1)
+    matched = keys[index] == received
+    return stored_ns[matched] - sent_ns[index[matched]]
+
+
+def run_loopback(rate=60, duration=10.0, n_cars=20, flush_interval=FLUSH_INTERVAL, recv_buffer=None, fsync=False,
+                 seed=0):
+    """
+    以一个帧率运行一次回环测试
+
+    :param rate: 发送帧率，None表示不限速（数据包种类和比例与60 Hz相同）
+    :param duration: 发送时长（秒）
+    :return: 结果dict
+    """
+    synth = PacketSynthesizer(n_cars, rate or 60, seed=seed)
+    context = multiprocessing.get_context()
+    ports, results, stop = context.Queue(), context.Queue(), context.Event()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        capture_file = os.path.join(tmp, 'capture.bin')
+        process = context.Process(target=_collector_process, args=(
+            capture_file, flush_interval, recv_buffer, fsync, ports, stop, results
+        ))
+        process.start()
+        try:
+            port = ports.get(timeout=30)
+            keys, sent_ns, frames = send_frames(synth, ('127.0.0.1', port), rate, duration)
+            time.sleep(DRAIN_S + flush_interval)
+            stop.set()
+            stats = results.get(timeout=30)
+        finally:
+            stop.set()
+            process.join(timeout=30)
+        latencies = storage_latencies(capture_file, stats['flushes'], keys, sent_ns) / 1e6
+
+    sent, received = len(keys), stats['packets']
+    active_s = (stats['last_ns'] - stats['first_ns']) / 1e9 if received > 1 else 0.0
+    return {
+        'rate': 'max' if rate is None else rate,
+        'duration_s': duration,
+        'n_cars': n_cars,
+        'frames': frames,
+        'sent': sent,
+        'received': received,
+        'lost': sent - received,
+        'loss_rate': round((sent - received) / sent, 6) if sent else 0.0,
+        'invalid': stats['invalid'],
+        'send_pps': round(sent / duration, 1),
+        'sustained_pps': round(received / active_s, 1) if active_s else 0.0,
+        'mb_per_s': round(stats['bytes'] / 1024 / 1024 / active_s, 2) if active_s else 0.0,
+        'collector_cpu_s': round(stats['cpu_s'], 4),
+        'cpu_us_per_packet': round(stats['cpu_s'] / received * 1e6, 2) if received else None,
+        'latency_ms': {
+            name: round(float(np.percentile(latencies, q)), 3) if len(latencies) else None
+            for name, q in (('p50', 50), ('p95', 95), ('p99', 99), ('max', 100))
+        }
+    }
+
+
+def run_ingest_suite(rates=DEFAULT_RATES, duration=10.0, n_cars=20, flush_interval=FLUSH_INTERVAL, recv_buffer=None,
+                     fsync=False, seed=0):
+    """
+    依次以各帧率运行回环测试
+
+    :return: {'environment', 'created', 'flush_interval', 'results': [各帧率的结果]}
+    """
+    results = []
+    for rate in rates:
+        result = run_loopback(rate, duration, n_cars, flush_interval, recv_buffer, fsync, seed)
+        latency = result['latency_ms']
+        label = 'max' if rate is None else f"{rate:g}"
+        print(f"  {label:>5} Hz: 发送 {result['send_pps']:.0f} 包/秒，接收 {result['sustained_pps']:.0f} 包/秒，"
+              f"丢包 {result['loss_rate']:.2%}，CPU {result['cpu_us_per_packet']} µs/包，"
+              f"延迟 p50 {latency['p50']} ms / p99 {latency['p99']} ms")
+        results.append(result)
+
+    return {
+        'environment': environment(),
+        'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'flush_interval': flush_interval,
+        'recv_buffer': recv_buffer,
+        'fsync': fsync,
+        'results': results
+    }
+
+
+def _rate(value):
+    return None if value == 'max' else float(value)
+
+
+def main(argv=None, prog=None):
+    """命令行入口"""
+    import argparse
+
+    parser = argparse.ArgumentParser(prog=prog, description="经本机回环测试采集端的吞吐、CPU、落盘延迟与丢包")
+    parser.add_argument('--rates', type=_rate, nargs='+', default=list(DEFAULT_RATES),
+                        help="发送帧率（每秒帧数），max表示不限速")
+    parser.add_argument('--duration', type=float, default=10.0, help="每个帧率的发送时长（秒）")
+    parser.add_argument('--cars', type=int, default=20, help="车辆数")
+    parser.add_argument('--flush-interval', type=float, default=FLUSH_INTERVAL, help="采集端写入刷新间隔（秒）")
+    parser.add_argument('--recv-buffer', type=int, default=None, help="采集端套接字接收缓冲区（字节）")
+    parser.add_argument('--fsync', action='store_true', help="采集端每次刷新后fsync")
+    parser.add_argument('-o', '--output', default=None, help="结果的JSON输出文件")
+    args = parser.parse_args(argv)
+
+    print("运行采集吞吐测试...")
+    report = run_ingest_suite(args.rates, args.duration, args.cars, args.flush_interval, args.recv_buffer, args.fsync)
+    if args.output:
+        save_report(args.output, report)
+        print(f"\n✓ 结果已保存: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
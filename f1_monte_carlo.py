@@ -0,0 +1,285 @@
+"""
+换胎策略的向量化蒙特卡洛评估
+对每个候选策略一次性模拟数千场随机比赛（SC/VSC出现、FCY圈速倍率、FCY下的进站损失和轮胎降解倍率），
+输出总时间的期望与分布，用于选择考虑风险的base_strategy
+命令行读取转换器生成的INI，为每位车手重新排序DP候选策略与INI中的base_strategy
+"""
+
+import json
+
+import numpy as np
+
+from f1_strategy import DEFAULT_COMPOUND_PARAMS, driver_compound_params, solve_strategy_problems, strategy_problem_key
+
+GREEN, SC, VSC = 0, 1, 2
+
+# 单次向量化计算的 (策略 × 比赛 × 圈) 元素上限，超出时按策略分块以限制内存
+MAX_BLOCK_ELEMENTS = 4_000_000
+
+
+def sample_fcy_laps(total_laps, n_races, rng, p_sc=0.4, p_vsc=0.3, sc_laps=(3, 6), vsc_laps=(1, 3),
+                    fixed_phases=()):
+    """
+    生成每场比赛每圈的赛道状态
+
+    :param fixed_phases: 已知的FCY阶段 [[起始进度, 结束进度, 'SC'/'VSC', ...], ...]（progress域，单位为圈），所有比赛都包含
+    :return: (n_races, total_laps) 的状态矩阵，取值 GREEN/SC/VSC
+    """
+    status = np.full((n_races, total_laps), GREEN, dtype=np.int8)
+    laps = np.arange(total_laps)[None, :]
+
+    for phase in fixed_phases:
+        start, end, phase_type = phase[0], phase[1], phase[2]
+        in_phase = (laps + 1 > start) & (laps < end)
+        status[:, in_phase[0]] = SC if phase_type == 'SC' else VSC
+
+    # 先生成VSC再生成SC，重叠时SC优先
+    for code, probability, (min_laps, max_laps) in ((VSC, p_vsc, vsc_laps), (SC, p_sc, sc_laps)):
+        occurs = rng.random(n_races) < probability
+        start = rng.integers(1, max(2, total_laps - 1), size=n_races)
+        duration = rng.integers(min_laps, max_laps + 1, size=n_races)
+        in_phase = occurs[:, None] & (laps >= start[:, None]) & (laps < (start + duration)[:, None])
+        status[in_phase] = code
+
+    return status
+
+
+def _strategy_lap_layout(strategies, total_laps, driver_tyre_pars, model):
+    """把策略展开为逐圈的降解参数、stint起点和进站圈掩码"""
+    n = len(strategies)
+    k_0 = np.empty((n, total_laps))
+    k_1 = np.empty((n, total_laps))
+    k_2 = np.zeros((n, total_laps))
+    stint_start = np.empty((n, total_laps), dtype=int)
+    pit_in = np.zeros((n, total_laps), dtype=bool)
+
+    for row, strategy in enumerate(strategies):
+        for i, stint in enumerate(strategy):
+            start = int(stint[0])
+            end = int(strategy[i + 1][0]) if i < len(strategy) - 1 else total_laps
+            params = driver_tyre_pars.get(stint[1], DEFAULT_COMPOUND_PARAMS)
+            k_0[row, start:end] = params.get('k_0', DEFAULT_COMPOUND_PARAMS['k_0'])
+            if model == 'quad':
+                k_1[row, start:end] = params.get('k_1_quad', DEFAULT_COMPOUND_PARAMS['k_1_quad'])
+                k_2[row, start:end] = params.get('k_2_quad', DEFAULT_COMPOUND_PARAMS['k_2_quad'])
+            else:
+                k_1[row, start:end] = params.get('k_1_lin', DEFAULT_COMPOUND_PARAMS['k_1_lin'])
+            stint_start[row, start:end] = start
+            if start > 0:
+                pit_in[row, start - 1] = True
+
+    return k_0, k_1, k_2, stint_start, pit_in
+
+
+def simulate_race_times(strategies, driver_tyre_pars, track_pars, total_laps, status):
+    """
+    在给定的赛道状态矩阵上计算每个策略在每场比赛中的总时间
+
+    :param strategies: [[[进站圈, 轮胎, ...], ...], ...]
+    :param driver_tyre_pars: 单个车手的tireset_pars条目
+    :param track_pars: 赛道参数（t_q, t_gap_racepace, t_pitdrive_*, mult_t_lap_*）
+    :param status: sample_fcy_laps() 生成的 (n_races, total_laps) 状态矩阵
+    :return: (策略数, 比赛数) 的总时间矩阵（秒）
+    """
+    total_laps = int(total_laps)
+    model = driver_tyre_pars.get('tire_deg_model', 'lin')
+    k_0, k_1, k_2, stint_start, pit_in = _strategy_lap_layout(strategies, total_laps, driver_tyre_pars, model)
+
+    # FCY下轮胎按倍率老化：有效胎龄为stint内此前各圈老化增量之和
+    age_step = np.select(
+        [status == SC, status == VSC],
+        [driver_tyre_pars.get('mult_tiredeg_sc', 1.0), driver_tyre_pars.get('mult_tiredeg_fcy', 1.0)],
+        1.0
+    )
+    aged = np.concatenate([np.zeros((len(status), 1)), np.cumsum(age_step, axis=1)], axis=1)
+    age = aged[None, :, :total_laps] - aged[:, stint_start].transpose(1, 0, 2)
+
+    t_base = track_pars.get('t_q', 0.0) + track_pars.get('t_gap_racepace', 0.0)
+    lap_time = t_base + k_0[:, None, :] + k_1[:, None, :] * age + k_2[:, None, :] * age**2
+
+    # 新胎出站圈的冷胎损失（起步胎除外）
+    cold = (stint_start > 0) & (stint_start == np.arange(total_laps)[None, :])
+    lap_time += driver_tyre_pars.get('t_add_coldtires', 0.0) * cold[:, None, :]
+
+    lap_mult = np.select(
+        [status == SC, status == VSC],
+        [track_pars.get('mult_t_lap_sc', 1.0), track_pars.get('mult_t_lap_fcy', 1.0)],
+        1.0
+    )
+    race_time = (lap_time * lap_mult[None, :, :]).sum(axis=2)
+
+    # 进站损失按进站圈/出站圈的状态选择 green / fcy / sc 数值
+    inlap_loss = np.select(
+        [status == SC, status == VSC],
+        [track_pars.get('t_pitdrive_inlap_sc', 0.0), track_pars.get('t_pitdrive_inlap_fcy', 0.0)],
+        track_pars.get('t_pitdrive_inlap', 0.0)
+    )
+    outlap_loss = np.select(
+        [status == SC, status == VSC],
+        [track_pars.get('t_pitdrive_outlap_sc', 0.0), track_pars.get('t_pitdrive_outlap_fcy', 0.0)],
+        track_pars.get('t_pitdrive_outlap', 0.0)
+    )
+    outlap_loss = np.concatenate([outlap_loss[:, 1:], np.zeros((len(status), 1))], axis=1)
+    pit_loss = inlap_loss + outlap_loss + track_pars.get('t_pit_tirechange_min', 0.0)
+    race_time += pit_in.astype(float) @ pit_loss.T
+
+    return race_time
+
+
+def evaluate_strategies(strategies, driver_tyre_pars, track_pars, total_laps, event_pars=None,
+                        n_races=2000, seed=None, sort_by='mean', **fcy_options):
+    """
+    蒙特卡洛评估一组候选策略
+
+    :param event_pars: 可选，其中fcy_data.phases（progress域）作为每场比赛都出现的已知FCY阶段
+    :param sort_by: 排序依据，'mean'（期望）或 'p95' 等结果字段
+    :param fcy_options: 传给sample_fcy_laps()的随机FCY参数（p_sc, p_vsc, sc_laps, vsc_laps）
+    :return: 按sort_by升序的结果列表，每项包含策略、期望、标准差、分位数和在所有场次中最快的比例
+    """
+    rng = np.random.default_rng(seed)
+    fixed_phases = ()
+    if event_pars and event_pars.get('fcy_data', {}).get('domain') == 'progress':
+        fixed_phases = event_pars['fcy_data'].get('phases', ())
+
+    status = sample_fcy_laps(int(total_laps), n_races, rng, fixed_phases=fixed_phases, **fcy_options)
+    block = max(1, MAX_BLOCK_ELEMENTS // (n_races * int(total_laps)))
+    race_times = np.concatenate([
+        simulate_race_times(strategies[i:i + block], driver_tyre_pars, track_pars, total_laps, status)
+        for i in range(0, len(strategies), block)
+    ])
+    winner = np.bincount(race_times.argmin(axis=0), minlength=len(strategies)) / n_races
+    p5, p50, p95 = np.percentile(race_times, [5, 50, 95], axis=1)
+
+    results = [{
+        'strategy': strategy,
+        'mean': round(float(race_times[i].mean()), 3),
+        'std': round(float(race_times[i].std()), 3),
+        'p5': round(float(p5[i]), 3),
+        'p50': round(float(p50[i]), 3),
+        'p95': round(float(p95[i]), 3),
+        'p_best': round(float(winner[i]), 4)
+    } for i, strategy in enumerate(strategies)]
+
+    return sorted(results, key=lambda result: result[sort_by])
+
+
+def pit_losses(track_pars):
+    """绿旗、VSC、SC下一次进站的总损失（进站圈 + 出站圈 + 换胎）"""
+    change = track_pars.get('t_pit_tirechange_min', 0.0)
+    return {
+        phase: track_pars.get(f't_pitdrive_inlap{suffix}', 0.0) + track_pars.get(f't_pitdrive_outlap{suffix}', 0.0)
+        + change
+        for phase, suffix in (('green', ''), ('fcy', '_fcy'), ('sc', '_sc'))
+    }
+
+
+def candidate_strategies(driver_tyre_pars, compounds, total_laps, losses, memo=None, max_workers=None):
+    """
+    候选策略：各进站损失下的DP最优策略（去重）
+
+    FCY下进站损失更小，对应的最优策略停站更多；绿旗损失下的最优即确定性的base_strategy
+    :param losses: 进站损失列表（秒）
+    """
+    compound_params = driver_compound_params(driver_tyre_pars, compounds)
+    if not compound_params:
+        return []
+    model = driver_tyre_pars.get('tire_deg_model', 'lin')
+    keys = [strategy_problem_key(compound_params, compounds, total_laps, loss, model) for loss in losses]
+    memo = solve_strategy_problems(keys, memo=memo, max_workers=max_workers)
+    strategies = {}
+    for key in keys:
+        _, strategy = memo[key]
+        if strategy:
+            strategies.setdefault(json.dumps(strategy), strategy)
+    return list(strategies.values())
+
+
+def rank_ini_strategies(ini_pars, drivers=None, n_races=2000, seed=0, sort_by='mean', n_losses=5,
+                        known_fcy=False, max_workers=None, **fcy_options):
+    """
+    对INI中每位车手的候选策略做蒙特卡洛评估
+
+    候选为SC到绿旗进站损失之间n_losses个取值下的DP最优策略，以及INI中的base_strategy和real_strategy
+    :param ini_pars: ini_tools.read_ini_pars() 的结果
+    :param known_fcy: 是否让每场比赛都包含INI中event_pars记录的FCY阶段
+    :return: {车手: evaluate_strategies()的结果}，每项的'source'标明候选来源
+    """
+    track_pars, tireset_pars = ini_pars['track_pars'], ini_pars['tireset_pars']
+    vse_pars = ini_pars.get('vse_pars', {})
+    total_laps = int(ini_pars['race_pars']['tot_no_laps'])
+    compounds = vse_pars.get('param_dry_compounds') or sorted(
+        {key for pars in tireset_pars.values() for key in pars if key.startswith('A')})
+    loss = pit_losses(track_pars)
+    losses = np.linspace(min(loss.values()), loss['green'], max(n_losses, 1))
+
+    memo = {}
+    ranking = {}
+    for initials in drivers or list(tireset_pars):
+        if initials not in tireset_pars:
+            continue
+        sources = {}
+        for strategy in candidate_strategies(tireset_pars[initials], compounds, total_laps, losses, memo,
+                                             max_workers):
+            sources.setdefault(json.dumps(strategy), ('dp', strategy))
+        for source in ('base_strategy', 'real_strategy'):
+            strategy = vse_pars.get(source, {}).get(initials)
+            if strategy:
+                sources[json.dumps(strategy)] = (source, strategy)
+        if not sources:
+            continue
+
+        strategies = [strategy for _, strategy in sources.values()]
+        results = evaluate_strategies(strategies, tireset_pars[initials], track_pars, total_laps,
+                                      ini_pars.get('event_pars') if known_fcy else None, n_races, seed, sort_by,
+                                      **fcy_options)
+        for result in results:
+            result['source'] = sources[json.dumps(result['strategy'])][0]
+        ranking[initials] = results
+    return ranking
+
+
+def _describe(strategy):
+    pit_laps = ','.join(str(stint[0]) for stint in strategy[1:])
+    return f"{len(strategy) - 1}停 {'-'.join(stint[1] for stint in strategy)}" + (f" [{pit_laps}]" if pit_laps else "")
+
+
+def main(argv=None, prog=None):
+    """命令行入口"""
+    import argparse
+
+    from ini_tools import read_ini_pars
+
+    parser = argparse.ArgumentParser(prog=prog, description="蒙特卡洛评估INI中各车手的候选策略（SC/VSC随机出现）")
+    parser.add_argument('ini', help="转换器生成的INI文件")
+    parser.add_argument('--drivers', nargs='+', default=None, help="只评估这些车手（缩写）")
+    parser.add_argument('--races', type=int, default=2000, help="每个策略模拟的比赛场数")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--rank', default='mean', choices=['mean', 'p50', 'p95'], help="排序依据")
+    parser.add_argument('--p-sc', type=float, default=0.4, help="每场比赛出现SC的概率")
+    parser.add_argument('--p-vsc', type=float, default=0.3, help="每场比赛出现VSC的概率")
+    parser.add_argument('--losses', type=int, default=5, help="生成DP候选的进站损失取值个数（SC到绿旗之间）")
+    parser.add_argument('--known-fcy', action='store_true', help="每场比赛都包含INI中记录的FCY阶段")
+    parser.add_argument('--top', type=int, default=3, help="每位车手显示的策略数")
+    parser.add_argument('-o', '--output', default=None, help="把完整结果写入JSON文件")
+    args = parser.parse_args(argv)
+
+    ranking = rank_ini_strategies(
+        read_ini_pars(args.ini), args.drivers, args.races, args.seed, args.rank, args.losses, args.known_fcy,
+        p_sc=args.p_sc, p_vsc=args.p_vsc
+    )
+    for initials, results in ranking.items():
+        best = results[0]
+        note = "" if best['source'] == 'base_strategy' else "（与INI的base_strategy不同）"
+        print(f"  {initials}: {_describe(best['strategy'])}{note}")
+        for result in results[:args.top]:
+            print(f"    {_describe(result['strategy']):<28} 期望 {result['mean']:.3f}s  p95 {result['p95']:.3f}s  "
+                  f"最快 {result['p_best']:.1%}  [{result['source']}]")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(ranking, f, indent=2, ensure_ascii=False)
+        print(f"✓ 结果已写入: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""
+F1 25 UDP数据包的二进制布局与合成
+各数据包的struct格式逐字段对应DataStructure/F1 25 Telemetry Output Structures.txt（小端、无填充），
+模块加载时核对长度与规范中标注的字节数；PacketSynthesizer按游戏的发送频率逐帧生成全部16种数据包，
+lap_data、car_status、session、participants等转换器用到的字段填入随时间推进的数值，其余字段为0
+"""
+
+import random
+import struct
+from collections import namedtuple
+
+PACKET_FORMAT = 2025
+GAME_YEAR = 25
+GAME_MAJOR_VERSION = 1
+GAME_MINOR_VERSION = 0
+PACKET_VERSION = 1
+
+# 数据包中的车辆槽位数（cs_maxNumCarsInUDPData）
+MAX_CARS = 22
+
+PACKET_NAMES = {
+    0: 'motion', 1: 'session', 2: 'lap_data', 3: 'event', 4: 'participants', 5: 'car_setups',
+    6: 'car_telemetry', 7: 'car_status', 8: 'final_classification', 9: 'lobby_info', 10: 'car_damage',
+    11: 'session_history', 12: 'tyre_sets', 13: 'motion_ex', 14: 'time_trial', 15: 'lap_positions'
+}
+
+# 规范中标注的数据包长度（字节，含29字节的包头）
+PACKET_SIZES = {
+    0: 1349, 1: 753, 2: 1285, 3: 45, 4: 1284, 5: 1133, 6: 1352, 7: 1239,
+    8: 1042, 9: 954, 10: 1041, 11: 1460, 12: 231, 13: 273, 14: 101, 15: 1131
+}
+
+# PacketHeader：packetFormat, gameYear, 主/次版本, packetVersion, packetId, sessionUID, sessionTime,
+# frameIdentifier, overallFrameIdentifier, playerCarIndex, secondaryPlayerCarIndex
+HEADER = struct.Struct('<HBBBBBQfIIBB')
+PacketHeader = namedtuple('PacketHeader', [
+    'packet_format', 'game_year', 'game_major_version', 'game_minor_version', 'packet_version', 'packet_id',
+    'session_uid', 'session_time', 'frame_identifier', 'overall_frame_identifier', 'player_car_index',
+    'secondary_player_car_index'
+])
+# 包头中 packetId 与 sessionTime、frameIdentifier、overallFrameIdentifier 的偏移
+PACKET_ID_OFFSET = 6
+FRAME_FIELDS = struct.Struct('<fII')
+FRAME_FIELDS_OFFSET = 15
+
+# 数组元素的格式
+CAR_MOTION_DATA = '6f6h6f'
+MARSHAL_ZONE = 'fb'
+WEATHER_FORECAST_SAMPLE = 'BBBbbbbB'
+LAP_DATA = 'IIHBHBHBHBfff15BHHBfB'
+PARTICIPANT_DATA = 'BBBBBBB32sBBHBB12B'
+CAR_SETUP_DATA = 'BBBB4f9B4fBf'
+CAR_TELEMETRY_DATA = 'HfffBbHBBH4H4B4BH4f4B'
+CAR_STATUS_DATA = 'BBBBBfffHHBBHBBBbfffBfffB'
+FINAL_CLASSIFICATION_DATA = 'BBBBBBBIdBBB8B8B8B'
+LOBBY_INFO_DATA = 'BBBB32sBBBHB'
+CAR_DAMAGE_DATA = '4f4B4B4B18B'
+LAP_HISTORY_DATA = 'IHBHBHBB'
+TYRE_STINT_HISTORY_DATA = 'BBB'
+TYRE_SET_DATA = 'BBBBBBBhB'
+TIME_TRIAL_DATA_SET = 'BBIIIIBBBBBB'
+
+# 各数据包包头之后的部分（EventDataDetails为union，按最大成员SpeedTrap的12字节计）
+PACKET_BODY_FORMATS = {
+    0: CAR_MOTION_DATA * MAX_CARS,
+    1: 'BbbBHBbBHHBBBBBB' + MARSHAL_ZONE * 21 + 'BBB' + WEATHER_FORECAST_SAMPLE * 64 + 'BBIIIBBB9BBBI33B12Bff',
+    2: LAP_DATA * MAX_CARS + 'BB',
+    3: '4s12s',
+    4: 'B' + PARTICIPANT_DATA * MAX_CARS,
+    5: CAR_SETUP_DATA * MAX_CARS + 'f',
+    6: CAR_TELEMETRY_DATA * MAX_CARS + 'BBb',
+    7: CAR_STATUS_DATA * MAX_CARS,
+    8: 'B' + FINAL_CLASSIFICATION_DATA * MAX_CARS,
+    9: 'B' + LOBBY_INFO_DATA * MAX_CARS,
+    10: CAR_DAMAGE_DATA * MAX_CARS,
+    11: '7B' + LAP_HISTORY_DATA * 100 + TYRE_STINT_HISTORY_DATA * 8,
+    12: 'B' + TYRE_SET_DATA * 20 + 'B',
+    13: '61f',
+    14: TIME_TRIAL_DATA_SET * 3,
+    15: 'BB' + '1100B'
+}
+
+for _packet_id, _body in PACKET_BODY_FORMATS.items():
+    if HEADER.size + struct.calcsize('<' + _body) != PACKET_SIZES[_packet_id]:
+        raise ValueError(f"数据包 {_packet_id} 的格式与规范长度不符: "
+                         f"{HEADER.size + struct.calcsize('<' + _body)} != {PACKET_SIZES[_packet_id]}")
+
+# 发送间隔（秒），0表示每帧发送；final_classification、lobby_info、time_trial在游戏中只在特定场景发送，
+# 这里按固定间隔发送以覆盖全部数据包
+SEND_INTERVALS = {
+    0: 0, 1: 0.5, 2: 0, 3: 1.0, 4: 5.0, 5: 0.5, 6: 0, 7: 0,
+    8: 5.0, 9: 0.5, 10: 0.1, 11: 0.05, 12: 0.05, 13: 0, 14: 1.0, 15: 1.0
+}
+
+_LAP_DATA = struct.Struct('<' + LAP_DATA)
+_CAR_STATUS = struct.Struct('<' + CAR_STATUS_DATA)
+_PARTICIPANT = struct.Struct('<' + PARTICIPANT_DATA)
+_FINAL_CLASSIFICATION = struct.Struct('<' + FINAL_CLASSIFICATION_DATA)
+_SESSION = struct.Struct('<BbbBHBbBHHBBBBBB')
+_EVENT = struct.Struct('<4sI')
+
+# 合成数据使用的轮胎（C3 / 中性胎）、油耗（kg/圈）与赛道（上海）
+SYNTH_COMPOUND = (18, 17)
+FUEL_PER_LAP = 1.6
+RACE_SESSION_TYPE = 15
+
+
+def parse_header(data):
+    """解析数据包的包头，返回PacketHeader"""
+    return PacketHeader(*HEADER.unpack_from(data))
+
+
+def packet_key(data):
+    """(overallFrameIdentifier, packetId)：合成数据包每帧每种最多一个，可唯一标识一个数据包"""
+    return struct.unpack_from('<I', data, FRAME_FIELDS_OFFSET + 8)[0], data[PACKET_ID_OFFSET]
+
+
+def restamp(packet, session_time, frame):
+    """改写bytearray数据包的sessionTime与两个帧号，用于循环发送预先生成的数据包"""
+    FRAME_FIELDS.pack_into(packet, FRAME_FIELDS_OFFSET, session_time, frame, frame)
+
+
+class PacketSynthesizer:
+    """逐帧生成与游戏相同长度和包头的数据包"""
+
+    def __init__(self, n_cars=20, rate=60, track_length=5441, total_laps=56, track_id=2,
+                 base_lap_time=96.0, seed=0):
+        """
+        :param n_cars: 车辆数（不超过ROSTER的20人）
+        :param rate: 每秒帧数（游戏设置中的UDP发送频率），决定各数据包的发送间隔（帧）
+        :param base_lap_time: 最快车的圈速（秒），其余车依次慢0.2%
+        """
+        # f1_synth依赖pandas，只在生成数据包时导入，采集端导入本模块不受影响
+        from f1_synth import ROSTER
+
+        if n_cars > len(ROSTER):
+            raise ValueError(f"最多 {len(ROSTER)} 辆车: {n_cars}")
+        self.roster = ROSTER[:n_cars]
+        self.n_cars = n_cars
+        self.rate = rate
+        self.track_length = track_length
+        self.total_laps = total_laps
+        self.track_id = track_id
+        self.lap_times = [base_lap_time * (1 + 0.002 * c) for c in range(n_cars)]
+        self.session_uid = random.Random(seed).getrandbits(64)
+        self.intervals = {packet_id: max(1, round(seconds * rate)) for packet_id, seconds in SEND_INTERVALS.items()}
+        self.cycle_frames = max(self.intervals.values())
+
+    def _header(self, packet_id, frame):
+        return HEADER.pack(PACKET_FORMAT, GAME_YEAR, GAME_MAJOR_VERSION, GAME_MINOR_VERSION, PACKET_VERSION,
+                           packet_id, self.session_uid, frame / self.rate, frame, frame, 0, 255)
+
+    def _race_state(self, session_time):
+        """各车的 (总距离, 圈号, 圈内距离, 本圈用时)"""
+        state = []
+        for lap_time in self.lap_times:
+            laps = min(session_time / lap_time, self.total_laps)
+            lap_num = min(int(laps) + 1, self.total_laps)
+            state.append((laps * self.track_length, lap_num, (laps - lap_num + 1) * self.track_length,
+                          (laps - lap_num + 1) * lap_time))
+        return state
+
+    def _positions(self, state):
+        order = sorted(range(self.n_cars), key=lambda c: -state[c][0])
+        return {car: position + 1 for position, car in enumerate(order)}
+
+    def _fill(self, packet_id, packet, frame):
+        """写入包头之后的字段"""
+        offset = HEADER.size
+        session_time = frame / self.rate
+
+        if packet_id == 1:
+            _SESSION.pack_into(packet, offset, 0, 30, 22, self.total_laps, self.track_length, RACE_SESSION_TYPE,
+                               self.track_id, 0, 0, 0, 80, 0, 0, 255, 0, 0)
+        elif packet_id == 2:
+            state = self._race_state(session_time)
+            positions = self._positions(state)
+            for c, (total, lap_num, lap_distance, current) in enumerate(state):
+                last = round(self.lap_times[c] * 1000) if lap_num > 1 else 0
+                sector = min(int(lap_distance / self.track_length * 3), 2)
+                _LAP_DATA.pack_into(
+                    packet, offset + c * _LAP_DATA.size, last, round(current * 1000), 0, 0, 0, 0, 0, 0, 0, 0,
+                    lap_distance, total, 0.0, positions[c], lap_num, 0, 0, sector, 0, 0, 0, 0, 0, 0, c + 1, 4, 2,
+                    0, 0, 0, 0, 0.0, 255
+                )
+            struct.pack_into('<BB', packet, offset + MAX_CARS * _LAP_DATA.size, 255, 255)
+        elif packet_id == 3:
+            code = b'SSTA' if frame == 0 else b'BUTN'
+            _EVENT.pack_into(packet, offset, code, 0)
+        elif packet_id == 4:
+            packet[offset] = self.n_cars
+            for c in range(self.n_cars):
+                driver_id, team_id, race_number, nationality, name = self.roster[c]
+                _PARTICIPANT.pack_into(
+                    packet, offset + 1 + c * _PARTICIPANT.size, 1, driver_id, 255, team_id, 0, race_number,
+                    nationality, name.encode('utf-8'), 1, 1, 0, 255, 0, *([0] * 12)
+                )
+        elif packet_id == 7:
+            state = self._race_state(session_time)
+            for c, (total, lap_num, _, _) in enumerate(state):
+                fuel = 110.0 - FUEL_PER_LAP * total / self.track_length
+                _CAR_STATUS.pack_into(
+                    packet, offset + c * _CAR_STATUS.size, 1, 1, 1, 56, 0, fuel, 110.0, fuel / FUEL_PER_LAP,
+                    13000, 4000, 8, 0, 0, *SYNTH_COMPOUND, lap_num - 1, 0, 0.0, 0.0, 4.0e6, 1, 0.0, 0.0, 0.0, 0
+                )
+        elif packet_id == 8:
+            state = self._race_state(session_time)
+            positions = self._positions(state)
+            packet[offset] = self.n_cars
+            for c, (_, lap_num, _, _) in enumerate(state):
+                _FINAL_CLASSIFICATION.pack_into(
+                    packet, offset + 1 + c * _FINAL_CLASSIFICATION.size, positions[c], lap_num - 1, c + 1, 0, 0,
+                    2, 0, round(self.lap_times[c] * 1000), session_time, 0, 0, 1,
+                    SYNTH_COMPOUND[0], *([0] * 7), SYNTH_COMPOUND[1], *([0] * 7), self.total_laps, *([0] * 7)
+                )
+        elif packet_id in (11, 12):
+            # session_history、tyre_sets每次发送一辆车，轮流发送
+            packet[offset] = (frame // self.intervals[packet_id]) % self.n_cars
+
+    def packet(self, packet_id, frame):
+        """第frame帧的packet_id数据包（bytearray）"""
+        packet = bytearray(PACKET_SIZES[packet_id])
+        packet[:HEADER.size] = self._header(packet_id, frame)
+        self._fill(packet_id, packet, frame)
+        return packet
+
+    def frame(self, frame):
+        """第frame帧应发送的数据包，按packetId排序"""
+        return [self.packet(packet_id, frame) for packet_id in sorted(PACKET_SIZES)
+                if frame % self.intervals[packet_id] == 0]
+
+    def frames(self, n_frames):
+        """前n_frames帧的数据包，每项为一帧的列表"""
+        return [self.frame(frame) for frame in range(n_frames)]
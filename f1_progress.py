@@ -0,0 +1,106 @@
+"""
+时间戳 → 比赛进度索引
+由lap_data建立领先者进度随时间的单调序列，只保留每圈的断点，事件时间戳通过向量化插值换算为 progress（单位：圈）
+"""
+
+import numpy as np
+
+# 每圈等分的段数：每段保留首尾和首次达到段内最大进度的时刻，段内线性插值
+SEGMENTS_PER_LAP = 10
+
+
+def _lap_breakpoints(timestamps, progress):
+    """
+    把单调的进度序列压缩为每圈的断点：每 1/SEGMENTS_PER_LAP 圈的首个和最后一个时刻、首次达到该段最大进度的时刻
+    （段末的停滞，如冲线后），以及序列末尾的两个时刻（下一块数据并入末尾时刻时仍能找到上一段的断点）
+
+    对压缩后的序列追加新数据再压缩，与对完整序列一次性压缩的结果相同
+    """
+    n = len(timestamps)
+    if n <= 2:
+        return timestamps, progress
+    segments = np.floor(progress * SEGMENTS_PER_LAP)
+    starts = np.flatnonzero(np.r_[True, segments[1:] != segments[:-1]])
+    ends = np.r_[starts[1:] - 1, n - 1]
+    keep = np.zeros(n, dtype=bool)
+    keep[starts] = keep[ends] = keep[[n - 2, n - 1]] = True
+    keep[np.searchsorted(progress, progress[ends], side='left')] = True
+    return timestamps[keep], progress[keep]
+
+
+class RaceProgressIndex:
+    """单个session的单调 时间戳 → 领先者进度 索引（只保留每圈的断点，大小随圈数增长，与采样频率无关）"""
+
+    def __init__(self, timestamps, progress):
+        self.timestamps = np.asarray(timestamps, dtype=float)
+        self.progress = np.asarray(progress, dtype=float)
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    @staticmethod
+    def _leader_progress(lap_data_df, track_length):
+        """每个采样时刻的领先者进度（未做累计最大值）"""
+        progress = lap_data_df['current_lap_num'].to_numpy(dtype=float) - 1
+        if track_length and 'lap_distance' in lap_data_df.columns:
+            fraction = lap_data_df['lap_distance'].to_numpy(dtype=float) / track_length
+            progress = progress + np.clip(np.nan_to_num(fraction), 0.0, 1.0)
+        progress = np.maximum(progress, 0.0)
+
+        timestamps = lap_data_df['timestamp'].to_numpy(dtype=float)
+        order = np.argsort(timestamps, kind='stable')
+        timestamps, progress = timestamps[order], progress[order]
+
+        # 同一时刻取领先者（最大进度）
+        unique_times, first = np.unique(timestamps, return_index=True)
+        return unique_times, np.maximum.reduceat(progress, first)
+
+    @classmethod
+    def from_lap_data(cls, lap_data_df, track_length=0):
+        """
+        从lap_data建立索引
+
+        每个采样时刻的进度 = max(current_lap_num - 1 + lap_distance / track_length)，
+        没有lap_distance或赛道长度时退化为已完成圈数；再取累计最大值保证单调，
+        只保留每圈的断点（见_lap_breakpoints），其余时刻线性插值
+        """
+        if lap_data_df is None or len(lap_data_df) == 0:
+            return None
+
+        unique_times, leader = cls._leader_progress(lap_data_df, track_length)
+        return cls(*_lap_breakpoints(unique_times, np.maximum.accumulate(leader)))
+
+    def extend(self, lap_data_df, track_length=0):
+        """
+        追加新增的lap_data行（时间戳不早于已有索引），只处理新数据
+
+        :return: 新的索引对象
+        """
+        if lap_data_df is None or len(lap_data_df) == 0:
+            return self
+
+        unique_times, leader = self._leader_progress(lap_data_df, track_length)
+        timestamps, progress = self.timestamps, self.progress
+
+        # 与已有最后一个时刻相同的采样并入该时刻
+        if len(timestamps) and unique_times[0] == timestamps[-1]:
+            progress = progress.copy()
+            progress[-1] = max(progress[-1], leader[0])
+            unique_times, leader = unique_times[1:], leader[1:]
+
+        floor = progress[-1] if len(progress) else 0.0
+        leader = np.maximum.accumulate(np.maximum(leader, floor))
+        # 已保留的断点与新数据一起重新压缩，此前的末尾时刻不再是末尾时会被丢弃
+        return RaceProgressIndex(*_lap_breakpoints(
+            np.concatenate([timestamps, unique_times]), np.concatenate([progress, leader])
+        ))
+
+    def to_progress(self, timestamps):
+        """时间戳（标量或数组）→ 领先者进度（圈，浮点）"""
+        return np.interp(np.asarray(timestamps, dtype=float), self.timestamps, self.progress)
+
+    def to_lap_fraction(self, timestamps):
+        """时间戳 → (领先者当前圈号, 圈内进度比例)"""
+        progress = self.to_progress(timestamps)
+        completed = np.floor(progress)
+        return completed.astype(int) + 1, progress - completed
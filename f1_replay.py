@@ -0,0 +1,78 @@
+"""
+回放：把抓包文件中的数据包按原始间隔（可加速）发送到采集端口；不指定抓包文件时发送合成数据包，
+用于在没有游戏的环境中驱动采集端
+"""
+
+import socket
+import time
+
+from f1_collect import DEFAULT_PORT, iter_capture
+
+
+def replay_capture(capture_file, address, speed=1.0):
+    """
+    按接收时刻的间隔发送抓包文件中的数据包
+
+    :param address: (host, port)
+    :param speed: 回放速度倍数，0表示不等待、尽快发送
+    :return: 发送的数据包数
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    start = time.perf_counter()
+    first_ns = None
+    sent = 0
+    try:
+        for recv_ns, data in iter_capture(capture_file):
+            if first_ns is None:
+                first_ns = recv_ns
+            if speed > 0:
+                delay = start + (recv_ns - first_ns) / 1e9 / speed - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            sock.sendto(data, address)
+            sent += 1
+    finally:
+        sock.close()
+    return sent
+
+
+def replay_synthetic(address, rate=60, duration=60.0, n_cars=20, seed=0):
+    """
+    以rate帧/秒发送合成数据包
+
+    :param rate: 每秒帧数，None表示不限速
+    :return: 发送的数据包数
+    """
+    # 合成与逐包记录依赖numpy/pandas，只在这条路径导入
+    from f1_ingest_bench import send_frames
+    from f1_packets import PacketSynthesizer
+
+    keys, _, _ = send_frames(PacketSynthesizer(n_cars, rate or 60, seed=seed), address, rate, duration)
+    return len(keys)
+
+
+def main(argv=None, prog=None):
+    """命令行入口"""
+    import argparse
+
+    parser = argparse.ArgumentParser(prog=prog, description="把抓包文件或合成数据包发送到采集端口")
+    parser.add_argument('capture', nargs='?', default=None, help="抓包文件（省略时发送合成数据包）")
+    parser.add_argument('--host', default='127.0.0.1', help="目标地址")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="目标端口")
+    parser.add_argument('--speed', type=float, default=1.0, help="抓包回放速度倍数，0表示尽快发送")
+    parser.add_argument('--rate', default='60', help="合成数据包的帧率（每秒帧数），max表示不限速")
+    parser.add_argument('--duration', type=float, default=60.0, help="合成数据包的发送时长（秒）")
+    parser.add_argument('--cars', type=int, default=20, help="合成数据包的车辆数")
+    args = parser.parse_args(argv)
+
+    address = (args.host, args.port)
+    if args.capture:
+        sent = replay_capture(args.capture, address, args.speed)
+    else:
+        rate = None if args.rate == 'max' else float(args.rate)
+        sent = replay_synthetic(address, rate, args.duration, args.cars)
+    print(f"✓ 已发送 {sent} 个数据包到 {args.host}:{args.port}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""
+分析阶段的依赖图调度
+每个阶段声明读取（inputs）和写入（outputs）的名称，依赖由这些声明推导；
+依赖都已完成的阶段在线程池中并发执行，各阶段的控制台输出写入传给它的流，按声明顺序回放，日志与串行执行一致；
+性能分析模式下串行执行，逐阶段记录耗时、CPU时间、内存分配峰值与行数
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# name: 阶段名（同时作为其返回值在results中的键）；func: 以输出流为唯一参数的可调用对象，阶段的控制台输出写入该流；
+# inputs: 需要先就绪的名称；outputs: 阶段写入的其他名称（如实例属性）
+Stage = namedtuple('Stage', ['name', 'func', 'inputs', 'outputs'], defaults=((), ()))
+
+
+def stage_order(stages, available=()):
+    """
+    检查依赖并返回执行顺序：每次取声明顺序中第一个依赖都已完成的阶段
+
+    :param available: 运行前已就绪的名称（如CSV表）
+    :return: (按执行顺序排列的阶段下标列表, {阶段下标: 依赖的阶段下标集合})
+    :raises ValueError: 名称重复、依赖缺失或成环
+    """
+    producers = {}
+    for index, stage in enumerate(stages):
+        for name in (stage.name,) + tuple(stage.outputs):
+            if name in producers or name in available:
+                raise ValueError(f"阶段输出重复: {name}")
+            producers[name] = index
+
+    depends = {}
+    for index, stage in enumerate(stages):
+        missing = [name for name in stage.inputs if name not in producers and name not in available]
+        if missing:
+            raise ValueError(f"阶段 {stage.name} 的输入未定义: {', '.join(missing)}")
+        depends[index] = {producers[name] for name in stage.inputs if name in producers}
+
+    order = []
+    done = set()
+    while len(order) < len(stages):
+        ready = next((index for index in range(len(stages)) if index not in done and depends[index] <= done), None)
+        if ready is None:
+            cycle = [stages[index].name for index in range(len(stages)) if index not in done]
+            raise ValueError(f"阶段依赖成环: {', '.join(cycle)}")
+        order.append(ready)
+        done.add(ready)
+
+    return order, depends
+
+
+def _run_stage(stage, results, timings, out):
+    """
+    执行单个阶段并记录耗时
+
+    :param out: 阶段输出写入的流
+    :return: 异常或None
+    """
+    start = time.perf_counter()
+    try:
+        results[stage.name] = stage.func(out)
+    except Exception as e:
+        return e
+    finally:
+        timings[stage.name] = time.perf_counter() - start
+    return None
+
+
+def run_stages(stages, available=(), results=None, max_workers=None):
+    """
+    按依赖图执行阶段
+
+    :param stages: Stage列表，声明顺序即串行执行和输出回放的顺序
+    :param available: 运行前已就绪的名称
+    :param results: 存放各阶段返回值的dict，阶段函数可从中读取已完成阶段（需声明为输入）的结果
+    :param max_workers: 线程数，1表示串行执行
+    :return: {阶段名: 耗时（秒）}
+    """
+    order, depends = stage_order(stages, available)
+    results = {} if results is None else results
+    timings = {}
+
+    if max_workers == 1 or len(stages) <= 1:
+        for index in order:
+            error = _run_stage(stages[index], results, timings, sys.stdout)
+            if error is not None:
+                raise error
+        return {stages[index].name: timings[stages[index].name] for index in order}
+
+    # 每个阶段写入自己的缓冲区，全部结束后按声明顺序回放
+    logs = {}
+    error = None
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        running = {}
+        done = set()
+        while len(done) < len(stages):
+            if error is None:
+                for index in order:
+                    if index not in done and index not in running.values() and depends[index] <= done:
+                        logs[index] = io.StringIO()
+                        future = executor.submit(_run_stage, stages[index], results, timings, logs[index])
+                        running[future] = index
+            if not running:
+                break
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                index = running.pop(future)
+                done.add(index)
+                # 出错后不再提交新阶段，等待已提交的阶段结束后抛出
+                error = error or future.result()
+
+    for index in range(len(stages)):
+        if index in logs:
+            sys.stdout.write(logs[index].getvalue())
+    if error is not None:
+        raise error
+
+    return {stages[index].name: timings[stages[index].name] for index in order if stages[index].name in timings}
+
+
+def _is_scalar(value):
+    return isinstance(value, (str, bytes)) or not hasattr(value, '__len__')
+
+
+def count_rows(value):
+    """
+    估算数据的行（记录）数
+
+    DataFrame/数组按长度；只含标量的dict/list/tuple视为一条记录；其余容器为各元素（忽略None）行数之和
+    """
+    if _is_scalar(value):
+        return 0
+    if not isinstance(value, (dict, list, tuple)):
+        return len(value)
+    items = [item for item in (value.values() if isinstance(value, dict) else value) if item is not None]
+    if items and all(_is_scalar(item) for item in items):
+        return 1
+    return sum(count_rows(item) for item in items)
+
+
+def _cpu_time():
+    """本进程与已结束子进程（如策略优化的进程池）的CPU时间之和"""
+    times = os.times()
+    return time.process_time() + times.children_user + times.children_system
+
+
+class StageProfiler:
+    """逐阶段累计墙钟时间、CPU时间、tracemalloc分配峰值与输入/输出行数"""
+
+    def __init__(self):
+        self.records = {}
+        self._started_tracing = False
+        self._start = (time.perf_counter(), _cpu_time())
+
+    @contextlib.contextmanager
+    def measure(self, name, rows_in=0, cumulative=False):
+        """
+        测量一段代码，同名的多次测量累加（峰值取最大）
+
+        :param cumulative: 输出是跨多次调用累积的状态，rows_out取最后一次而不是求和
+        :return: 上下文中可写入 'rows_out' 的dict
+        """
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        wall, cpu = time.perf_counter(), _cpu_time()
+        counts = {'rows_out': 0}
+        try:
+            yield counts
+        finally:
+            peak = tracemalloc.get_traced_memory()[1] - base
+            record = self.records.setdefault(name, {
+                'calls': 0, 'wall_s': 0.0, 'cpu_s': 0.0, 'peak_alloc_mb': 0.0, 'rows_in': 0, 'rows_out': 0
+            })
+            record['calls'] += 1
+            record['wall_s'] += time.perf_counter() - wall
+            record['cpu_s'] += _cpu_time() - cpu
+            record['peak_alloc_mb'] = max(record['peak_alloc_mb'], peak / 1024 / 1024)
+            record['rows_in'] += int(rows_in)
+            record['rows_out'] = int(counts['rows_out']) + (0 if cumulative else record['rows_out'])
+
+    def run(self, stages, available=(), results=None, row_count=count_rows):
+        """
+        串行执行阶段并逐个测量（tracemalloc峰值是进程级的，并发时无法区分阶段）
+
+        :param row_count: 名称 → 行数 的函数，用于统计各阶段的输入与输出
+        :return: {阶段名: 耗时（秒）}，与run_stages()相同
+        """
+        order, _ = stage_order(stages, available)
+        results = {} if results is None else results
+        timings = {}
+        for index in order:
+            stage = stages[index]
+            start = time.perf_counter()
+            with self.measure(stage.name, sum(row_count(name) for name in stage.inputs), cumulative=True) as counts:
+                results[stage.name] = stage.func(sys.stdout)
+                # 有返回值时统计返回值，否则统计写入的公开属性（下划线开头的是内部累积状态）
+                outputs = (stage.name,) if results[stage.name] is not None else \
+                    [name for name in stage.outputs if not name.startswith('_')]
+                counts['rows_out'] = sum(row_count(name) for name in outputs)
+            timings[stage.name] = time.perf_counter() - start
+        return timings
+
+    def stop(self):
+        """停止由本对象启动的tracemalloc"""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def report(self, **meta):
+        """
+        机器可读的报告
+
+        :param meta: 附加的顶层字段（数据目录、模式等）
+        """
+        stages = [{'name': name, **{key: round(value, 4) if isinstance(value, float) else value
+                                     for key, value in record.items()}}
+                  for name, record in self.records.items()]
+        return {
+            **meta,
+            'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+            # 自创建记录器起的总耗时，包含未单独测量的部分（如输出打印）
+            'wall_s': round(time.perf_counter() - self._start[0], 4),
+            'cpu_s': round(_cpu_time() - self._start[1], 4),
+            'stages': stages
+        }
+
+    def save(self, file_path, **meta):
+        """写出JSON报告"""
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(**meta), f, indent=2, ensure_ascii=False)
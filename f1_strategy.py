@@ -0,0 +1,471 @@
+"""
+换胎策略优化
+基于轮胎降解模型的动态规划：对任意停站次数、任意进站圈精确求解最短比赛时间
+命令行在 (进站损失 × 降解倍率 × 总圈数) 网格上扫描INI中各车手的最优策略，输出策略切换点
+"""
+
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# 默认进站损失：inlap + 换胎 + outlap ≈ 22-25秒
+PIT_STOP_TIME_LOSS = 23.0
+
+# 没有拟合数据的轮胎使用的平均降解参数
+DEFAULT_COMPOUND_PARAMS = {'k_0': 0.2, 'k_1_lin': 0.08, 'k_1_quad': 0.08, 'k_2_quad': 0.0}
+
+
+def stint_cost(params, laps, model='lin'):
+    """
+    一个stint跑laps圈的累计时间损失（闭式求和）
+
+    线性模型每圈损失 k_0 + k_1_lin * age，二次模型 k_0 + k_1_quad * age + k_2_quad * age²，age从0开始
+    """
+    laps = np.asarray(laps, dtype=float)
+    k_0 = params.get('k_0', DEFAULT_COMPOUND_PARAMS['k_0'])
+    if model == 'quad':
+        k_1 = params.get('k_1_quad', DEFAULT_COMPOUND_PARAMS['k_1_quad'])
+        k_2 = params.get('k_2_quad', DEFAULT_COMPOUND_PARAMS['k_2_quad'])
+        return laps * k_0 + k_1 * laps * (laps - 1) / 2 + k_2 * (laps - 1) * laps * (2 * laps - 1) / 6
+    k_1 = params.get('k_1_lin', DEFAULT_COMPOUND_PARAMS['k_1_lin'])
+    return laps * k_0 + k_1 * laps * (laps - 1) / 2
+
+
+def stint_lengths(starts, total_laps):
+    """
+    由各stint的起始圈计算stint圈数
+
+    :param starts: 起始圈，(K,) 或 (N, K)；最后一个stint跑到total_laps
+    :return: 与starts形状相同的stint圈数
+    :raises ValueError: 第一个stint不从第0圈开始或起始圈递减（圈数为负），即stint圈数之和不等于总圈数
+    """
+    starts = np.asarray(starts, dtype=int)
+    ends = np.concatenate([starts[..., 1:], np.full(starts.shape[:-1] + (1,), total_laps)], axis=-1)
+    lengths = ends - starts
+    if (lengths < 0).any() or (starts[..., 0] != 0).any():
+        raise ValueError(f"stint圈数须非负且总和为 {total_laps} 圈: 起始圈 {starts.tolist()}")
+    return lengths
+
+
+def pit_stop_count(lengths):
+    """进站次数 = 圈数大于0的stint数 - 1（score()的填充位和重复的起始圈不算进站）"""
+    return (np.asarray(lengths) > 0).sum(axis=-1) - 1
+
+
+class StintCostTable:
+    """按 (轮胎, stint圈数) 预计算的累计时间损失表，任意策略只需O(stint数)次查表"""
+
+    def __init__(self, compound_params, compounds, total_laps, model='lin'):
+        self.compounds = list(compounds)
+        self.index = {compound: i for i, compound in enumerate(self.compounds)}
+        self.total_laps = int(total_laps)
+        self.model = model
+
+        laps = np.arange(self.total_laps + 1)
+        self.table = np.empty((len(self.compounds), self.total_laps + 1))
+        for i, compound in enumerate(self.compounds):
+            self.table[i] = stint_cost(compound_params.get(compound, DEFAULT_COMPOUND_PARAMS), laps, model)
+
+    def strategy_time(self, strategy, pit_stop_loss, total_laps=None):
+        """单个策略 [[进站圈, 轮胎, ...], ...] 的总时间损失"""
+        total_laps = self.total_laps if total_laps is None else int(total_laps)
+        lengths = stint_lengths([stint[0] for stint in strategy], total_laps)
+        stint_time = sum(self.table[self.index[stint[1]], length] for stint, length in zip(strategy, lengths))
+        return float(stint_time + pit_stop_count(lengths) * pit_stop_loss)
+
+    def encode(self, strategies):
+        """
+        把策略列表编码为矩阵
+
+        :return: (starts, compound_idx)，形状均为 (策略数, 最大stint数)；
+                 不足的stint以起始圈=总圈数填充，长度为0、不计损失
+        """
+        width = max(len(strategy) for strategy in strategies)
+        starts = np.full((len(strategies), width), self.total_laps, dtype=int)
+        compound_idx = np.zeros((len(strategies), width), dtype=int)
+        for row, strategy in enumerate(strategies):
+            starts[row, :len(strategy)] = [stint[0] for stint in strategy]
+            compound_idx[row, :len(strategy)] = [self.index[stint[1]] for stint in strategy]
+        return starts, compound_idx
+
+    def score(self, starts, compound_idx, pit_stop_loss):
+        """
+        向量化评估整个候选策略矩阵
+
+        :param starts: (N, K) 每个stint的起始圈，填充位为total_laps
+        :param compound_idx: (N, K) 每个stint的轮胎下标
+        :param pit_stop_loss: 每次进站损失，标量或(N,)数组
+        :return: (N,) 总时间损失
+        """
+        lengths = stint_lengths(starts, self.total_laps)
+        stint_time = self.table[np.asarray(compound_idx), lengths].sum(axis=1)
+        return stint_time + pit_stop_count(lengths) * np.asarray(pit_stop_loss)
+
+
+def _solve_dp(cost, total_laps, pit_stop_loss, rule):
+    """
+    后向动态规划，返回所有起始圈的最优值表
+
+    best[L, c, m]: 从第L圈开始以新胎c起跑一个stint，到终点的最小时间；m表示此前（含c）是否已混用两种轮胎
+    follow[E, c, m]: 在第E圈从轮胎c换到下一个最优新胎的最小剩余时间与对应轮胎
+    """
+    n_compounds = cost.shape[0]
+    best = np.full((total_laps + 1, n_compounds, 2), np.inf)
+    next_pit = np.zeros((total_laps + 1, n_compounds, 2), dtype=int)
+    next_compound = np.full((total_laps + 1, n_compounds, 2), -1, dtype=int)
+    follow = np.full((total_laps + 1, n_compounds, 2), np.inf)
+    follow_compound = np.full((total_laps + 1, n_compounds, 2), -1, dtype=int)
+    switched = ~np.eye(n_compounds, dtype=bool)
+
+    for start in range(total_laps - 1, -1, -1):
+        ends = np.arange(start + 1, total_laps + 1)
+        stint = cost[:, ends - start]
+
+        for m in (0, 1):
+            # 中途进站：stint成本 + 进站损失 + 之后的最优延续
+            candidates = stint[:, :-1] + pit_stop_loss + follow[ends[:-1], :, m].T
+            # 直接跑到终点
+            finish = stint[:, -1] if (m or not rule) else np.full(n_compounds, np.inf)
+            candidates = np.concatenate([candidates, finish[:, None]], axis=1)
+
+            choice = candidates.argmin(axis=1)
+            best[start, :, m] = candidates[np.arange(n_compounds), choice]
+            next_pit[start, :, m] = ends[choice]
+            for c in range(n_compounds):
+                if ends[choice[c]] < total_laps:
+                    next_compound[start, c, m] = follow_compound[ends[choice[c]], c, m]
+
+        # 更新在start圈进站时的延续表：换上c'后的混用状态为 m or (c' != c)
+        for c in range(n_compounds):
+            for m in (0, 1):
+                mixed_after = np.where(switched[c] | bool(m), 1, 0)
+                options = best[start, np.arange(n_compounds), mixed_after]
+                follow_compound[start, c, m] = options.argmin()
+                follow[start, c, m] = options.min()
+
+    return best, next_pit, next_compound
+
+
+def _follow_stints(next_pit, next_compound, compounds, total_laps, lap, current, mixed):
+    """沿DP决策表展开从第lap圈新胎current起的后续进站"""
+    stints = []
+    while True:
+        end = int(next_pit[lap, current, mixed])
+        if end >= total_laps:
+            return stints
+        following = int(next_compound[lap, current, mixed])
+        mixed = int(mixed or following != current)
+        stints.append([end, compounds[following], 0, 0.0])
+        lap, current = end, following
+
+
+def optimize_strategy(compound_params, compounds, total_laps, pit_stop_loss, require_two_compounds=True,
+                      model='lin'):
+    """
+    动态规划求解理论最优换胎策略
+
+    状态为 (stint起始圈, 当前轮胎, 是否已使用两种不同干胎)，后向递推，
+    复杂度 O(laps² × compounds)，覆盖任意停站次数和任意进站圈
+
+    :param compound_params: {轮胎: {'k_0', 'k_1_lin', 'k_1_quad', 'k_2_quad'}}，缺失的轮胎使用默认参数
+    :param compounds: 可选干胎列表
+    :param total_laps: 比赛总圈数
+    :param pit_stop_loss: 每次进站的时间损失（秒）
+    :param require_two_compounds: 是否强制使用至少两种不同干胎（只有一种可选时自动放宽）
+    :param model: 降解模型，'lin' 或 'quad'
+    :return: (总时间损失, [[进站圈, 轮胎, 0, 0.0], ...])
+    """
+    total_laps = int(total_laps)
+    n_compounds = len(compounds)
+    if n_compounds == 0 or total_laps <= 0:
+        return float('inf'), []
+
+    cost = StintCostTable(compound_params, compounds, total_laps, model).table
+    rule = require_two_compounds and n_compounds > 1
+    best, next_pit, next_compound = _solve_dp(cost, total_laps, pit_stop_loss, rule)
+
+    mixed = 0 if rule else 1
+    start_options = best[0, np.arange(n_compounds), mixed]
+    current = int(start_options.argmin())
+    total_time = float(start_options[current])
+    if not np.isfinite(total_time):
+        return total_time, []
+
+    strategy = [[0, compounds[current], 0, 0.0]]
+    strategy += _follow_stints(next_pit, next_compound, compounds, total_laps, 0, current, mixed)
+    return total_time, strategy
+
+
+class LiveStrategyPlanner:
+    """
+    比赛中逐圈重新规划剩余策略
+
+    stint成本表和DP值表按 (降解参数, 可用轮胎) 缓存，参数不变时每次查询只需 O(laps × compounds) 的数组运算；
+    比赛中降解参数几乎每圈都会更新，缓存只保留最近使用的MAX_SOLVED组
+    """
+
+    MAX_SOLVED = 32
+
+    def __init__(self, total_laps, pit_stop_loss, model='lin', require_two_compounds=True):
+        self.total_laps = int(total_laps)
+        self.pit_stop_loss = pit_stop_loss
+        self.model = model
+        self.require_two_compounds = require_two_compounds
+        self._solved = OrderedDict()
+
+    def _tables(self, compound_params, compounds):
+        """取出（必要时计算）某组参数下的新胎DP表"""
+        key = strategy_problem_key(compound_params, compounds, self.total_laps, self.pit_stop_loss, self.model)
+        if key in self._solved:
+            self._solved.move_to_end(key)
+            return self._solved[key]
+        cost = StintCostTable(compound_params, compounds, self.total_laps, self.model).table
+        rule = self.require_two_compounds and len(compounds) > 1
+        self._solved[key] = _solve_dp(cost, self.total_laps, self.pit_stop_loss, rule)
+        if len(self._solved) > self.MAX_SOLVED:
+            self._solved.popitem(last=False)
+        return self._solved[key]
+
+    def plan(self, current_lap, current_compound, tyre_age, available_compounds, compound_params,
+             used_compounds=()):
+        """
+        计算剩余比赛的最优策略
+
+        :param current_lap: 已完成的圈数
+        :param current_compound: 当前轮胎
+        :param tyre_age: 当前轮胎胎龄（圈）
+        :param available_compounds: 仍有新胎可换的干胎列表
+        :param compound_params: 实时降解参数 {轮胎: {'k_0', 'k_1_lin', ...}}
+        :param used_compounds: 此前已使用过的干胎，用于判断两种干胎规则是否已满足
+        :return: (剩余时间损失, [[current_lap, 当前轮胎, 胎龄, 0.0], [进站圈, 轮胎, 0, 0.0], ...])
+        """
+        compounds = list(available_compounds)
+        current_lap, tyre_age = int(current_lap), int(tyre_age)
+        remaining = self.total_laps - current_lap
+        params = compound_params.get(current_compound, DEFAULT_COMPOUND_PARAMS)
+        # 比赛已结束（或圈数超出总圈数），没有剩余损失，也不再进站
+        if remaining <= 0:
+            return 0.0, [[current_lap, current_compound, tyre_age, 0.0]]
+
+        # 当前轮胎继续跑n圈的损失（从当前胎龄起算）
+        extra = np.arange(1, remaining + 1)
+        keep_cost = stint_cost(params, tyre_age + extra, self.model) - stint_cost(params, tyre_age, self.model)
+
+        mixed = len(set(used_compounds) | {current_compound}) > 1
+        can_mix = any(compound != current_compound for compound in compounds)
+        mixed = int(mixed or not (self.require_two_compounds and can_mix))
+
+        options = np.full(remaining, np.inf)
+        options[-1] = keep_cost[-1] if mixed else np.inf
+        choice = np.full(remaining, -1)
+
+        if compounds and remaining > 1:
+            best, next_pit, next_compound = self._tables(compound_params, compounds)
+            pit_laps = np.arange(current_lap + 1, self.total_laps)
+            mixed_after = np.array([int(mixed or compound != current_compound) for compound in compounds])
+            follow = best[pit_laps][:, np.arange(len(compounds)), mixed_after]
+            choice[:-1] = follow.argmin(axis=1)
+            options[:-1] = keep_cost[:-1] + self.pit_stop_loss + follow.min(axis=1)
+
+        stay = int(options.argmin())
+        total_time = float(options[stay])
+        strategy = [[current_lap, current_compound, tyre_age, 0.0]]
+        if not np.isfinite(total_time) or stay == remaining - 1:
+            return total_time, strategy
+
+        pit_lap = current_lap + 1 + stay
+        following = int(choice[stay])
+        strategy.append([pit_lap, compounds[following], 0, 0.0])
+        strategy += _follow_stints(
+            next_pit, next_compound, compounds, self.total_laps, pit_lap, following, int(mixed_after[following])
+        )
+        return total_time, strategy
+
+
+def strategy_problem_key(compound_params, compounds, total_laps, pit_stop_loss, model='lin'):
+    """规范化的优化问题键：降解参数、可选轮胎、总圈数和进站损失相同的车手共享同一个解"""
+    params = tuple(sorted(
+        (compound, tuple(sorted((name, float(value)) for name, value in values.items())))
+        for compound, values in compound_params.items()
+    ))
+    return tuple(compounds), params, int(total_laps), float(pit_stop_loss), model
+
+
+def _solve_problem(key):
+    """在工作进程中求解单个规范化问题"""
+    compounds, params, total_laps, pit_stop_loss, model = key
+    compound_params = {compound: dict(values) for compound, values in params}
+    return optimize_strategy(compound_params, list(compounds), total_laps, pit_stop_loss, model=model)
+
+
+def solve_strategy_problems(keys, memo=None, max_workers=None):
+    """
+    去重后求解一批策略问题，多个未缓存问题时分发到进程池
+
+    :param keys: strategy_problem_key() 生成的问题键列表
+    :param memo: 跨调用复用的缓存 {键: (总时间, 策略)}，就地更新
+    :param max_workers: 进程数，1表示串行
+    :return: memo
+    """
+    memo = {} if memo is None else memo
+    pending = [key for key in dict.fromkeys(keys) if key not in memo]
+
+    if len(pending) > 1 and max_workers != 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            for key, result in zip(pending, pool.map(_solve_problem, pending)):
+                memo[key] = result
+    else:
+        for key in pending:
+            memo[key] = _solve_problem(key)
+
+    return memo
+
+
+def driver_compound_params(driver_tyre_pars, compounds, deg_multiplier=1.0):
+    """从tireset_pars条目中取出干胎降解参数，降解率按倍率缩放（k_0不变）"""
+    compound_params = {}
+    for compound in compounds:
+        if compound in driver_tyre_pars:
+            params = driver_tyre_pars[compound]
+            compound_params[compound] = {
+                'k_0': params.get('k_0', 0.0),
+                'k_1_lin': params.get('k_1_lin', 0.08) * deg_multiplier,
+                'k_1_quad': params.get('k_1_quad', params.get('k_1_lin', 0.08)) * deg_multiplier,
+                'k_2_quad': params.get('k_2_quad', 0.0) * deg_multiplier
+            }
+    return compound_params
+
+
+def sweep_strategies(tireset_pars, compounds, pit_losses, deg_multipliers=(1.0,), total_laps_values=(50,),
+                     max_workers=None, memo=None):
+    """
+    在 (进站损失 × 降解倍率 × 总圈数) 网格上为每位车手重新求解最优策略
+
+    所有网格点先规范化为问题键并去重，再交给进程池批量求解，无需重新读取CSV
+
+    :param tireset_pars: INI中的tireset_pars
+    :param compounds: 可选干胎列表
+    :return: 每个 (车手, 网格点) 一行的结果列表
+    """
+    grid = [(laps, loss, mult) for laps in total_laps_values for loss in pit_losses for mult in deg_multipliers]
+    jobs = []
+    for initials, driver_tyre_pars in tireset_pars.items():
+        model = driver_tyre_pars.get('tire_deg_model', 'lin')
+        for total_laps, pit_loss, deg_mult in grid:
+            compound_params = driver_compound_params(driver_tyre_pars, compounds, deg_mult)
+            if not compound_params:
+                continue
+            key = strategy_problem_key(compound_params, compounds, total_laps, pit_loss, model)
+            jobs.append((initials, total_laps, pit_loss, deg_mult, key))
+
+    memo = solve_strategy_problems([key for *_, key in jobs], memo=memo, max_workers=max_workers)
+
+    rows = []
+    for initials, total_laps, pit_loss, deg_mult, key in jobs:
+        total_time, strategy = memo[key]
+        rows.append({
+            'driver': initials,
+            'total_laps': int(total_laps),
+            'pit_loss': float(pit_loss),
+            'deg_multiplier': float(deg_mult),
+            'stops': len(strategy) - 1,
+            'compounds': '-'.join(stint[1] for stint in strategy),
+            'pit_laps': [stint[0] for stint in strategy[1:]],
+            'total_time': round(total_time, 3)
+        })
+    return rows
+
+
+def strategy_switch_points(rows, axis='pit_loss'):
+    """
+    把扫描结果压缩为策略切换点：固定其余维度，沿axis递增时停站数或轮胎序列发生变化的位置
+
+    :return: [{'driver', 其余维度..., axis: 切换处的值, 'from', 'to'}, ...]
+    """
+    others = [dim for dim in ('total_laps', 'pit_loss', 'deg_multiplier') if dim != axis]
+    series = defaultdict(list)
+    for row in rows:
+        series[(row['driver'],) + tuple(row[dim] for dim in others)].append(row)
+
+    switches = []
+    for key, points in series.items():
+        points.sort(key=lambda row: row[axis])
+        for previous, current in zip(points, points[1:]):
+            before = f"{previous['stops']}停 {previous['compounds']}"
+            after = f"{current['stops']}停 {current['compounds']}"
+            if before != after:
+                switch = {'driver': key[0], **dict(zip(others, key[1:]))}
+                switch[axis] = current[axis]
+                switch['from'] = before
+                switch['to'] = after
+                switches.append(switch)
+    return switches
+
+
+def _grid_values(text):
+    """命令行网格取值：单个数值，或 起始:结束:步长（含结束值）"""
+    if ':' not in text:
+        return [float(text)]
+    start, stop, step = (float(part) for part in text.split(':'))
+    return [round(float(value), 6) for value in np.arange(start, stop + step / 2, step)]
+
+
+def main(argv=None, prog=None):
+    """命令行入口"""
+    import argparse
+    import json
+
+    from ini_tools import read_ini_pars
+
+    parser = argparse.ArgumentParser(
+        prog=prog, description="在 (进站损失 × 降解倍率 × 总圈数) 网格上重新求解INI中各车手的最优策略，输出策略切换点"
+    )
+    parser.add_argument('ini', help="转换器生成的INI文件")
+    parser.add_argument('--pit-loss', nargs='+', type=_grid_values, default=None, metavar='VALUE',
+                        help=f"进站损失（秒），数值或 起始:结束:步长（默认 {PIT_STOP_TIME_LOSS}）")
+    parser.add_argument('--deg-mult', nargs='+', type=_grid_values, default=None, metavar='VALUE',
+                        help="降解倍率（k_1/k_2的缩放），数值或 起始:结束:步长（默认 1.0）")
+    parser.add_argument('--laps', nargs='+', type=_grid_values, default=None, metavar='VALUE',
+                        help="总圈数，数值或 起始:结束:步长（默认INI中的tot_no_laps）")
+    parser.add_argument('--axis', default=None, choices=['pit_loss', 'deg_multiplier', 'total_laps'],
+                        help="沿哪个维度找切换点（默认取第一个有多个取值的维度）")
+    parser.add_argument('--drivers', nargs='+', default=None, help="只扫描这些车手（缩写）")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="并行工作进程数")
+    parser.add_argument('-o', '--output', default=None, help="把完整网格结果与切换点写入JSON文件")
+    args = parser.parse_args(argv)
+
+    ini_pars = read_ini_pars(args.ini)
+    tireset_pars = ini_pars['tireset_pars']
+    if args.drivers:
+        tireset_pars = {initials: pars for initials, pars in tireset_pars.items() if initials in args.drivers}
+    compounds = ini_pars.get('vse_pars', {}).get('param_dry_compounds') or sorted(
+        {key for pars in tireset_pars.values() for key in pars if key.startswith('A')})
+
+    grid = {
+        'pit_loss': sorted({v for values in args.pit_loss or [[PIT_STOP_TIME_LOSS]] for v in values}),
+        'deg_multiplier': sorted({v for values in args.deg_mult or [[1.0]] for v in values}),
+        'total_laps': sorted({int(v) for values in args.laps or [[ini_pars['race_pars']['tot_no_laps']]]
+                              for v in values})
+    }
+    axis = args.axis or next((dim for dim, values in grid.items() if len(values) > 1), 'pit_loss')
+
+    rows = sweep_strategies(tireset_pars, compounds, grid['pit_loss'], grid['deg_multiplier'], grid['total_laps'],
+                            max_workers=args.workers)
+    switches = strategy_switch_points(rows, axis)
+    print(f"{len(tireset_pars)} 位车手 × {len(rows) // max(len(tireset_pars), 1)} 个网格点，沿 {axis} 的策略切换点:")
+    for switch in switches:
+        fixed = '  '.join(f"{dim}={switch[dim]:g}" for dim in grid if dim != axis)
+        print(f"  {switch['driver']:<4} {fixed}  {axis}={switch[axis]:g}: {switch['from']} → {switch['to']}")
+    if not switches:
+        print("  （网格内最优策略没有变化）")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'axis': axis, 'grid': grid, 'switches': switches, 'rows': rows}, f, indent=2,
+                      ensure_ascii=False)
+        print(f"✓ 结果已写入: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
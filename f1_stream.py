@@ -0,0 +1,150 @@
+"""
+流式分块读取
+按内存上限把lap_data、car_status等表切成按帧对齐的数据块，逐块交给分析器累积状态，
+峰值内存由块大小决定，与session时长无关
+"""
+
+import pandas as pd
+
+from f1_checkpoint import INCREMENTAL_TABLES, find_table_file
+
+# 数值单元格在DataFrame中约占8字节；连接、排序、游程编码等中间结果约为原始块的数倍
+# （合成session上实测峰值约为上限的55%~65%）
+BYTES_PER_CELL = 8
+WORKING_SET_FACTOR = 3
+
+# 每块至少包含的行数（需大于单帧的车辆数，同一帧的行才不会被切开）
+MIN_CHUNK_ROWS = 1000
+
+
+def chunk_rows_for(memory_limit_mb, n_columns):
+    """
+    由内存上限估算每块读取的行数
+
+    每块都要执行一遍分析阶段图，块太小时固定开销占主导：合成session上5 MB约比一次性读取慢5倍，
+    64 MB以上与一次性读取相差不到30%
+
+    :param memory_limit_mb: 内存上限（MB）
+    :param n_columns: 同时在内存中的各表列数之和
+    """
+    row_bytes = BYTES_PER_CELL * WORKING_SET_FACTOR * max(n_columns, 1)
+    return max(MIN_CHUNK_ROWS, int(memory_limit_mb * 1024 * 1024 // row_bytes))
+
+
+class _TableReader:
+    """单张CSV的分块读取器，按列值上界取行，多读的行留在缓冲区供下一次使用"""
+
+    def __init__(self, file_path, chunk_rows):
+        self._chunks = pd.read_csv(file_path, index_col=False, chunksize=chunk_rows)
+        self._buffer = None
+
+    def _fill(self):
+        """缓冲区为空时读入下一块，文件已读完返回False"""
+        if self._buffer is not None and len(self._buffer) > 0:
+            return True
+        self._buffer = next(self._chunks, None)
+        return self._buffer is not None
+
+    def next_chunk(self):
+        """下一块原始行，读完时为None"""
+        if not self._fill():
+            return None
+        chunk, self._buffer = self._buffer, None
+        return chunk
+
+    def take_until(self, column, bound, inclusive=True):
+        """
+        取出column不超过bound的行（表按该列非递减写入）
+
+        :return: DataFrame，没有符合的行时为None
+        """
+        parts = []
+        while self._fill():
+            values = self._buffer[column]
+            beyond = (values > bound) if inclusive else (values >= bound)
+            if beyond.any():
+                first = int(beyond.to_numpy().argmax())
+                parts.append(self._buffer.iloc[:first])
+                self._buffer = self._buffer.iloc[first:]
+                break
+            parts.append(self._buffer)
+            self._buffer = None
+
+        parts = [part for part in parts if len(part) > 0]
+        if not parts:
+            return None
+        return parts[0] if len(parts) == 1 else pd.concat(parts, ignore_index=True)
+
+    def next_block(self, column):
+        """下一块，在column值变化处截断，同一帧的行不会分到两块"""
+        if not self._fill():
+            return None
+        if column not in self._buffer.columns:
+            return self.next_chunk()
+
+        last = self._buffer[column].iloc[-1]
+        block = self.take_until(column, last, inclusive=False)
+        if block is None:
+            # 缓冲区内只有一帧：读到该帧结束为止
+            block = self.take_until(column, last)
+        return block
+
+
+def iter_session_batches(data_dir, memory_limit_mb):
+    """
+    按帧对齐分块读取分析所需的表（INCREMENTAL_TABLES）
+
+    telemetry、car_damage、car_setups、final_classification不参与INI的计算，流式模式下不读取，
+    与增量模式相同；以后若有分析用到这些表，需加入INCREMENTAL_TABLES并按帧号随主表取行
+
+    以lap_data为主表：每块在帧号变化处截断，car_status取到同一帧为止，session/participants取到同一时刻为止；
+    没有帧号的旧版CSV按时间戳对齐
+    :param memory_limit_mb: 内存上限（MB），决定每块的行数
+    :return: 生成器，每项为与load_csv_files()相同键的dict（未读到的表为None）
+    """
+    paths = {key: find_table_file(data_dir, key) for key in INCREMENTAL_TABLES}
+    paths = {key: path for key, path in paths.items() if path is not None}
+    if not paths:
+        return
+
+    headers = {key: pd.read_csv(path, index_col=False, nrows=0).columns for key, path in paths.items()}
+    chunk_rows = chunk_rows_for(memory_limit_mb, sum(len(columns) for columns in headers.values()))
+    readers = {key: _TableReader(path, chunk_rows) for key, path in paths.items()}
+
+    lap_reader = readers.pop('lap_data', None)
+    status_reader = readers.pop('car_status', None)
+    key = 'frame' if all('frame' in headers[table] for table in ('lap_data', 'car_status') if table in headers) \
+        else 'timestamp'
+
+    first = True
+    while lap_reader is not None:
+        lap_block = lap_reader.next_block(key)
+        if lap_block is None:
+            break
+
+        batch = dict.fromkeys(INCREMENTAL_TABLES)
+        batch['lap_data'] = lap_block
+        if status_reader is not None:
+            batch['car_status'] = status_reader.take_until(key, lap_block[key].max())
+
+        time_bound = lap_block['timestamp'].max()
+        for table, reader in readers.items():
+            batch[table] = reader.take_until('timestamp', time_bound)
+            # 赛道长度等session信息在第一块就需要
+            if first and table == 'session' and batch[table] is None:
+                batch[table] = reader.next_chunk()
+
+        first = False
+        yield batch
+
+    # 主表读完后，其余表剩余的行
+    if status_reader is not None:
+        readers['car_status'] = status_reader
+    for table, reader in readers.items():
+        while True:
+            chunk = reader.next_chunk()
+            if chunk is None:
+                break
+            batch = dict.fromkeys(INCREMENTAL_TABLES)
+            batch[table] = chunk
+            yield batch
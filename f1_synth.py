@@ -0,0 +1,472 @@
+"""
+合成session生成器
+按f1_telemetry_data_Shanghai/的表结构写出合成session的CSV（lap_data、car_status的列取自数据包结构），
+车辆数、圈数、采样率、进站、FCY和退赛均可设置，轮胎降解等参数已知并写入ground_truth.json；
+用于在没有游戏的环境中按不同数据规模对转换器做基准测试，并验证优化后的代码路径得到相同的拟合结果
+"""
+
+import json
+import os
+import time
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from f1_packets import MAX_CARS
+
+# 与样例数据相同的列（lap_data、car_status的字段名按数据包结构转为小写下划线形式）
+SESSION_COLUMNS = [
+    'timestamp', 'session_uid', 'frame', 'weather', 'track_temperature', 'air_temperature', 'total_laps',
+    'track_length', 'session_type', 'track_id', 'formula', 'session_time_left', 'session_duration',
+    'pit_speed_limit', 'safety_car_status', 'network_game'
+]
+PARTICIPANTS_COLUMNS = [
+    'timestamp', 'session_uid', 'frame', 'car_index', 'ai_controlled', 'driver_id', 'network_id', 'team_id',
+    'my_team', 'race_number', 'nationality', 'name', 'your_telemetry', 'show_online_names', 'tech_level',
+    'platform'
+]
+FINAL_CLASSIFICATION_COLUMNS = [
+    'timestamp', 'session_uid', 'frame', 'car_index', 'position', 'num_laps', 'grid_position', 'points',
+    'num_pit_stops', 'result_status', 'result_reason', 'best_lap_time_ms', 'total_race_time', 'penalties_time',
+    'num_penalties', 'num_tyre_stints'
+]
+LAP_DATA_COLUMNS = [
+    'timestamp', 'session_uid', 'frame', 'car_index', 'last_lap_time_ms', 'current_lap_time_ms',
+    'lap_distance', 'total_distance', 'car_position', 'current_lap_num', 'pit_status', 'num_pit_stops',
+    'sector', 'current_lap_invalid', 'penalties', 'grid_position', 'driver_status', 'result_status',
+    'pit_lane_timer_active', 'pit_lane_time_in_lane_ms', 'pit_stop_timer_ms'
+]
+CAR_STATUS_COLUMNS = [
+    'timestamp', 'session_uid', 'frame', 'car_index', 'fuel_mix', 'front_brake_bias', 'pit_limiter_status',
+    'fuel_in_tank', 'fuel_capacity', 'fuel_remaining_laps', 'drs_allowed', 'actual_tyre_compound',
+    'visual_tyre_compound', 'tyres_age_laps', 'vehicle_fia_flags', 'ers_store_energy', 'ers_deploy_mode'
+]
+
+# 样例session（上海）的参赛者：(driver_id, team_id, race_number, nationality, name)
+ROSTER = [
+    (3, 4, 14, 77, '阿隆索'), (19, 4, 18, 13, '斯特罗尔'), (58, 1, 16, 53, '勒克莱尔'), (113, 6, 30, 54, '劳森'),
+    (62, 3, 23, 80, '阿尔本'), (54, 8, 4, 10, '诺里斯'), (161, 9, 5, 9, '博托莱托'), (136, 5, 7, 3, '杜汉'),
+    (94, 2, 22, 43, '角田'), (149, 6, 6, 28, '哈加'), (0, 3, 55, 77, '赛恩斯'), (147, 7, 87, 10, '比尔曼'),
+    (50, 0, 63, 10, '拉塞尔'), (165, 0, 12, 41, '安东内利'), (112, 8, 81, 3, '皮亚斯特里'), (9, 2, 33, 22, '维斯塔潘'),
+    (7, 1, 44, 10, '汉密尔顿'), (59, 5, 10, 28, '加斯利'), (17, 7, 31, 28, '奥康'), (10, 9, 27, 29, '霍肯伯格')
+]
+
+# 干胎：(actual_tyre_compound, visual_tyre_compound, 相对软胎的圈速差k_0（秒）, 每圈降解k_1_lin（秒/圈）)
+DRY_COMPOUNDS = [
+    (17, 16, 0.0, 0.080),   # C4 / 软胎
+    (18, 17, 0.4, 0.050),   # C3 / 中性胎
+    (19, 18, 0.8, 0.030)    # C2 / 硬胎
+]
+
+# FCY期间的圈速倍数，安全车状态 1=全场安全车 2=虚拟安全车
+FCY_TYPES = {'SC': (1, 1.4), 'VSC': (2, 1.3)}
+
+# 1倍规模的采样率（Hz），与采集器默认的COLLECTION_INTERVAL = 1.0相同
+BASE_SAMPLE_RATE = 1.0
+
+# 进站：进站圈/出站圈在维修区内的比例和额外耗时（秒）
+PIT_LANE_FRACTION = 0.05
+PIT_IN_LOSS = 8.0
+PIT_OUT_LOSS = 12.0
+
+# 每多少个采样写一次participants（样例中约每5秒一次）；退赛后继续写入的秒数
+PARTICIPANTS_EVERY = 5
+RETIRED_TAIL_S = 5.0
+
+# 每次写出的采样数（× 车辆数为行数）
+CHUNK_SAMPLES = 10000
+
+
+def _pit_laps(rng, n_laps, n_stops):
+    """把比赛大致均分为n_stops + 1段，返回各次进站的进站圈（严格递增）"""
+    laps = []
+    for k in range(1, n_stops + 1):
+        lap = int(round(n_laps * k / (n_stops + 1))) + int(rng.integers(-2, 3))
+        lap = max(lap, laps[-1] + 2 if laps else 2)
+        if lap >= n_laps - 1:
+            break
+        laps.append(lap)
+    return laps
+
+
+def _compound_sequence(rng, n_stints):
+    """各stint的轮胎（DRY_COMPOUNDS下标），相邻stint不同，比赛中至少使用两种干胎"""
+    sequence = [int(rng.integers(0, 2))]
+    for _ in range(n_stints - 1):
+        others = [i for i in range(len(DRY_COMPOUNDS)) if i != sequence[-1]]
+        sequence.append(int(rng.choice(others)))
+    return sequence
+
+
+def _race_plan(rng, n_cars, n_laps, base_lap_time, pit_stops, fcy_phases, retirements, noise, invalid_rate):
+    """
+    逐车逐圈生成圈速、轮胎与事件，返回 (每圈数组的dict, ground truth)
+
+    圈速 = 基础圈速 + 车手差 + 轮胎k_0 + k_1_lin × 胎龄 + 噪声，进站圈/出站圈加进站损失，FCY期间乘以倍数
+    """
+    stops = [pit_stops] * n_cars if np.isscalar(pit_stops) else [pit_stops[c % len(pit_stops)] for c in range(n_cars)]
+    driver_offset = rng.normal(0, 0.4, n_cars)
+    deg_scale = 1 + rng.normal(0, 0.1, (n_cars, len(DRY_COMPOUNDS)))
+
+    # FCY阶段按参考圈速换算为时间窗口（相对session开始的秒数）
+    phases = []
+    for fcy_type, start_lap, n_fcy_laps in fcy_phases:
+        status, factor = FCY_TYPES[fcy_type]
+        start = (start_lap - 1) * base_lap_time
+        phases.append((fcy_type, status, factor, start, start + n_fcy_laps * base_lap_time * factor))
+
+    retiring = rng.choice(n_cars, size=min(retirements, n_cars), replace=False) if retirements else []
+    retire_lap = {int(c): int(rng.integers(int(n_laps * 0.25), int(n_laps * 0.75) + 1)) for c in retiring}
+
+    shape = (n_cars, n_laps)
+    lap_time = np.zeros(shape)
+    age = np.zeros(shape, dtype=int)
+    stint = np.zeros(shape, dtype=int)
+    compound = np.zeros(shape, dtype=int)
+    pit_in = np.zeros(shape, dtype=bool)
+    pit_out = np.zeros(shape, dtype=bool)
+    invalid = rng.random(shape) < invalid_rate
+    lap_noise = rng.normal(0, noise, shape)
+
+    truth_drivers = []
+    truth_degradation = {}
+    # 各 (车辆, 轮胎) 不含进站圈、出站圈和FCY的圈数，短stint的拟合受异常圈影响较大
+    clean_laps = defaultdict(int)
+    for c in range(n_cars):
+        pits = _pit_laps(rng, n_laps, stops[c])
+        sequence = _compound_sequence(rng, len(pits) + 1)
+        t, tyre_age, current = 0.0, 0, 0
+        for lap in range(n_laps):
+            index = sequence[current]
+            _, _, k_0, k_1 = DRY_COMPOUNDS[index]
+            k_1 *= deg_scale[c, index]
+            lt = base_lap_time + driver_offset[c] + k_0 + k_1 * tyre_age + lap_noise[c, lap]
+            pit_in[c, lap] = (lap + 1) in pits
+            pit_out[c, lap] = lap > 0 and pit_in[c, lap - 1]
+            lt += PIT_IN_LOSS * pit_in[c, lap] + PIT_OUT_LOSS * pit_out[c, lap]
+            green = not (pit_in[c, lap] or pit_out[c, lap])
+            for _, _, factor, start, end in phases:
+                if start <= t < end:
+                    lt *= factor
+                    green = False
+
+            lap_time[c, lap], age[c, lap], stint[c, lap], compound[c, lap] = lt, tyre_age, current, index
+            # 退赛之后的圈不出现在数据中
+            if c not in retire_lap or lap < retire_lap[c]:
+                truth_degradation[(c, index)] = k_1
+                clean_laps[(c, index)] += green and lap + 1 < retire_lap.get(c, n_laps + 1)
+            t += lt
+            tyre_age += 1
+            if pit_in[c, lap]:
+                current += 1
+                tyre_age = 0
+
+        retired = retire_lap.get(c)
+        truth_drivers.append({
+            'car_index': c,
+            'driver_id': ROSTER[c][0],
+            'pace_offset': round(float(driver_offset[c]), 6),
+            'pit_laps': [lap for lap in pits if retired is None or lap < retired],
+            'compounds': [DRY_COMPOUNDS[i][1] for i in sequence[:len(pits) + 1 if retired is None else
+                                                                 sum(lap < retired for lap in pits) + 1]],
+            'retired_lap': retired
+        })
+
+    starts = np.concatenate([np.zeros((n_cars, 1)), np.cumsum(lap_time, axis=1)], axis=1)
+    end = starts[:, -1].copy()
+    retire_time = np.full(n_cars, np.inf)
+    for c, lap in retire_lap.items():
+        retire_time[c] = starts[c, lap - 1] + 0.5 * lap_time[c, lap - 1]
+        end[c] = retire_time[c] + RETIRED_TAIL_S
+
+    plan = {
+        'lap_time': lap_time, 'starts': starts[:, :-1], 'end': end, 'retire_time': retire_time,
+        'age': age, 'stint': stint, 'compound': compound, 'pit_in': pit_in, 'pit_out': pit_out,
+        'invalid': invalid, 'phases': phases
+    }
+    truth = {
+        'drivers': truth_drivers,
+        'degradation': [
+            {'car_index': c, 'actual_tyre_compound': DRY_COMPOUNDS[i][0], 'visual_tyre_compound': DRY_COMPOUNDS[i][1],
+             'k_0': DRY_COMPOUNDS[i][2], 'k_1_lin': round(float(k_1), 6), 'clean_laps': clean_laps[(c, i)]}
+            for (c, i), k_1 in sorted(truth_degradation.items())
+        ],
+        'fcy_phases': [{'type': fcy_type, 'start': start, 'end': end_time}
+                       for fcy_type, _, _, start, end_time in phases],
+        'retirements': [{'car_index': c, 'lap_num': lap, 'time': float(retire_time[c])}
+                        for c, lap in sorted(retire_lap.items())]
+    }
+    return plan, truth
+
+
+def _sample_tables(plan, t, frames, t0, uid, track_length, n_laps):
+    """一组采样时刻的lap_data与car_status行（按帧、车辆排序）"""
+    n_cars = len(plan['end'])
+    cars = np.arange(n_cars)
+    lap_index = np.stack([np.searchsorted(plan['starts'][c], t, side='right') - 1 for c in cars], axis=1)
+    lap_index = np.clip(lap_index, 0, n_laps - 1)
+
+    def per_lap(name):
+        return plan[name][cars[None, :], lap_index]
+
+    lap_time = per_lap('lap_time')
+    current = t[:, None] - per_lap('starts')
+    frac = np.clip(current / lap_time, 0, 1)
+    progress = lap_index + frac
+
+    active = t[:, None] < plan['end'][None, :]
+    retired = t[:, None] >= plan['retire_time'][None, :]
+
+    # 名次：进度越大越靠前，退赛车辆排在最后
+    ranking = np.where(retired, -1.0, progress)
+    order = np.argsort(-ranking, axis=1, kind='stable')
+    position = np.empty_like(order)
+    np.put_along_axis(position, order, np.arange(1, n_cars + 1)[None, :], axis=1)
+
+    previous = np.maximum(lap_index - 1, 0)
+    last_lap_ms = np.where(lap_index > 0, plan['lap_time'][cars[None, :], previous] * 1000, 0).astype(int)
+
+    in_lane_in = per_lap('pit_in') & (frac >= 1 - PIT_LANE_FRACTION)
+    in_lane_out = per_lap('pit_out') & (frac < PIT_LANE_FRACTION)
+    pit_status = np.where(in_lane_in, 1, np.where(in_lane_out, 2, 0))
+    lane_entry = np.where(in_lane_in, per_lap('starts') + lap_time * (1 - PIT_LANE_FRACTION),
+                          per_lap('starts') - plan['lap_time'][cars[None, :], previous] * PIT_LANE_FRACTION)
+    lane_ms = np.where(pit_status > 0, (t[:, None] - lane_entry) * 1000, 0).astype(int)
+
+    fcy = np.zeros(len(t), dtype=bool)
+    for _, _, _, start, end in plan['phases']:
+        fcy |= (t >= start) & (t < end)
+
+    compound = per_lap('compound')
+    fuel = 100.0 * (1 - progress / n_laps) + 1.0
+
+    rows = active.ravel()
+    common = {
+        'session_uid': uid,
+        'frame': np.repeat(frames, n_cars)[rows],
+        'car_index': np.tile(cars, len(t))[rows]
+    }
+    lap_df = pd.DataFrame({
+        'timestamp': np.repeat(t0 + t, n_cars)[rows],
+        **common,
+        'last_lap_time_ms': last_lap_ms.ravel()[rows],
+        'current_lap_time_ms': (current * 1000).astype(int).ravel()[rows],
+        'lap_distance': (frac * track_length).ravel()[rows],
+        'total_distance': (progress * track_length).ravel()[rows],
+        'car_position': position.ravel()[rows],
+        'current_lap_num': (lap_index + 1).ravel()[rows],
+        'pit_status': pit_status.ravel()[rows],
+        'num_pit_stops': per_lap('stint').ravel()[rows],
+        'sector': np.minimum(frac * 3, 2).astype(int).ravel()[rows],
+        'current_lap_invalid': per_lap('invalid').astype(int).ravel()[rows],
+        'penalties': 0,
+        'grid_position': np.tile(cars + 1, len(t))[rows],
+        'driver_status': np.where(retired, 0, 4).ravel()[rows],
+        'result_status': np.where(retired, 7, 2).ravel()[rows],
+        'pit_lane_timer_active': (pit_status > 0).astype(int).ravel()[rows],
+        'pit_lane_time_in_lane_ms': lane_ms.ravel()[rows],
+        'pit_stop_timer_ms': 0
+    }, columns=LAP_DATA_COLUMNS)
+
+    status_df = pd.DataFrame({
+        # car_status数据包在lap_data之后几毫秒到达
+        'timestamp': np.repeat(t0 + t + 0.004, n_cars)[rows],
+        **common,
+        'fuel_mix': 1,
+        'front_brake_bias': 55,
+        'pit_limiter_status': (pit_status > 0).astype(int).ravel()[rows],
+        'fuel_in_tank': fuel.ravel()[rows],
+        'fuel_capacity': 110.0,
+        'fuel_remaining_laps': (fuel / (100.0 / n_laps) - (n_laps - progress)).ravel()[rows],
+        'drs_allowed': 0,
+        'actual_tyre_compound': np.array([spec[0] for spec in DRY_COMPOUNDS])[compound].ravel()[rows],
+        'visual_tyre_compound': np.array([spec[1] for spec in DRY_COMPOUNDS])[compound].ravel()[rows],
+        'tyres_age_laps': per_lap('age').ravel()[rows],
+        'vehicle_fia_flags': np.repeat(np.where(fcy, 3, 0), n_cars)[rows],
+        'ers_store_energy': 2.0e6,
+        'ers_deploy_mode': 1
+    }, columns=CAR_STATUS_COLUMNS)
+
+    safety_car = np.zeros(len(t), dtype=int)
+    for _, status, _, start, end in plan['phases']:
+        safety_car[(t >= start) & (t < end)] = status
+    return lap_df, status_df, safety_car
+
+
+def _participants_rows(t, frames, t0, uid, n_cars):
+    """各采样时刻的participants快照（MAX_CARS个槽位，未使用的填255）"""
+    slots = []
+    for c in range(MAX_CARS):
+        if c < n_cars:
+            driver_id, team_id, race_number, nationality, name = ROSTER[c]
+            slots.append((1, driver_id, 255, team_id, 0, race_number, nationality, name, 1, 0, 0, 255))
+        else:
+            slots.append((0, 255, 255, 255, 0, 0, 255, None, 0, 0, 0, 0))
+    snapshot = pd.DataFrame(slots, columns=PARTICIPANTS_COLUMNS[4:])
+    df = pd.concat([snapshot] * len(t), ignore_index=True)
+    df.insert(0, 'car_index', np.tile(np.arange(MAX_CARS), len(t)))
+    df.insert(0, 'frame', np.repeat(frames, MAX_CARS))
+    df.insert(0, 'session_uid', uid)
+    df.insert(0, 'timestamp', np.repeat(t0 + t + 0.002, MAX_CARS))
+    return df[PARTICIPANTS_COLUMNS]
+
+
+def _final_classification(plan, truth, t0, uid, n_laps):
+    """比赛结束时的最终排名（完赛车辆按总用时，退赛车辆按完成圈数排在后面）"""
+    n_cars = len(plan['end'])
+    points = [25, 18, 15, 12, 10, 8, 6, 4, 2, 1]
+    retired = {r['car_index']: r['lap_num'] for r in truth['retirements']}
+
+    laps_done = np.array([retired.get(c, n_laps + 1) - 1 for c in range(n_cars)])
+    total_time = np.array([plan['lap_time'][c, :laps_done[c]].sum() for c in range(n_cars)])
+    order = sorted(range(n_cars), key=lambda c: (c in retired, -laps_done[c], total_time[c]))
+
+    rows = []
+    for position, c in enumerate(order, start=1):
+        clean = plan['lap_time'][c, :laps_done[c]][~(plan['pit_in'][c, :laps_done[c]] | plan['pit_out'][c, :laps_done[c]])]
+        n_stops = int(plan['stint'][c, max(laps_done[c] - 1, 0)])
+        rows.append((c, position, int(laps_done[c]), c + 1, points[position - 1] if position <= 10 and c not in retired else 0,
+                     n_stops, 4 if c in retired else 3, 3 if c in retired else 2,
+                     int(clean.min() * 1000) if len(clean) else 0, float(total_time[c]), 0, 0, n_stops + 1))
+    rows += [(c, 0, 0, 0, 0, 0, 0, 0, 0, 0.0, 0, 0, 0) for c in range(n_cars, MAX_CARS)]
+
+    df = pd.DataFrame(rows, columns=FINAL_CLASSIFICATION_COLUMNS[3:])
+    df.insert(0, 'frame', 0)
+    df.insert(0, 'session_uid', uid)
+    df.insert(0, 'timestamp', t0 + plan['end'].max() + 1.0)
+    return df.sort_values('car_index', kind='stable')[FINAL_CLASSIFICATION_COLUMNS]
+
+
+def generate_session(output_dir, n_cars=20, n_laps=56, sample_rate=BASE_SAMPLE_RATE, pit_stops=(1, 2),
+                     fcy_phases=(('SC', 12, 3), ('VSC', 34, 1)), retirements=1, track_length=5441, track_id=2,
+                     base_lap_time=96.0, noise=0.15, invalid_rate=0.03, seed=0, t0=1760951634.0):
+    """
+    生成一个合成session，写出CSV与ground_truth.json
+
+    :param n_cars: 车辆数（不超过ROSTER的20人）
+    :param sample_rate: lap_data/car_status/session的采样率（Hz）；数据量与之成正比，1Hz约为样例session的规模
+    :param pit_stops: 每车进站次数，序列时按车辆循环取值
+    :param fcy_phases: [(类型 'SC'/'VSC', 开始圈, 持续圈数), ...]
+    :param retirements: 退赛车辆数
+    :param noise: 圈速噪声的标准差（秒）
+    :param invalid_rate: 每圈被判无效的概率
+    :return: ground truth dict（同时写入output_dir/ground_truth.json）
+    """
+    if n_cars > len(ROSTER):
+        raise ValueError(f"最多 {len(ROSTER)} 辆车: {n_cars}")
+
+    rng = np.random.default_rng(seed)
+    uid = int(rng.integers(1, 2**63 - 1))
+    plan, truth = _race_plan(rng, n_cars, n_laps, base_lap_time, pit_stops, fcy_phases, retirements,
+                             noise, invalid_rate)
+
+    os.makedirs(output_dir, exist_ok=True)
+    stamp = time.strftime('%Y%m%d_%H%M%S', time.gmtime(t0))
+    paths = {table: os.path.join(output_dir, f"{table}_{stamp}.csv")
+             for table in ('session', 'participants', 'lap_data', 'car_status', 'final_classification')}
+
+    duration = float(plan['end'].max())
+    n_samples = int(duration * sample_rate) + 1
+    # 帧号按游戏的60Hz计数，采样率超过60Hz时每个采样占一帧
+    frame_step = max(1, int(round(60 / sample_rate)))
+    rows = dict.fromkeys(paths, 0)
+
+    for first in range(0, n_samples, CHUNK_SAMPLES):
+        index = np.arange(first, min(first + CHUNK_SAMPLES, n_samples))
+        t = index / sample_rate
+        frames = index * frame_step
+        lap_df, status_df, safety_car = _sample_tables(plan, t, frames, t0, uid, track_length, n_laps)
+
+        session_df = pd.DataFrame({
+            'timestamp': t0 + t + 0.001, 'session_uid': uid, 'frame': frames, 'weather': 0,
+            'track_temperature': 31, 'air_temperature': 21, 'total_laps': n_laps, 'track_length': track_length,
+            'session_type': 15, 'track_id': track_id, 'formula': 0,
+            'session_time_left': np.maximum(7200 - t, 0).astype(int), 'session_duration': 7200,
+            'pit_speed_limit': 80, 'safety_car_status': safety_car, 'network_game': 0
+        }, columns=SESSION_COLUMNS)
+        every = index % PARTICIPANTS_EVERY == 0
+        participants_df = _participants_rows(t[every], frames[every], t0, uid, n_cars)
+
+        for table, df in (('session', session_df), ('participants', participants_df),
+                          ('lap_data', lap_df), ('car_status', status_df)):
+            df.to_csv(paths[table], mode='w' if first == 0 else 'a', header=first == 0, index=False)
+            rows[table] += len(df)
+
+    final_df = _final_classification(plan, truth, t0, uid, n_laps)
+    final_df.to_csv(paths['final_classification'], index=False)
+    rows['final_classification'] = len(final_df)
+
+    truth = {
+        'seed': seed, 'session_uid': uid, 'n_cars': n_cars, 'n_laps': n_laps, 'sample_rate': sample_rate,
+        'track_id': track_id, 'track_length': track_length, 'base_lap_time': base_lap_time, 't0': t0,
+        **truth,
+        'rows': rows
+    }
+    # FCY与退赛时间换算为与CSV相同的时间戳
+    for phase in truth['fcy_phases']:
+        phase['start'], phase['end'] = t0 + phase['start'], t0 + phase['end']
+    for retirement in truth['retirements']:
+        retirement['time'] = t0 + retirement['time']
+
+    with open(os.path.join(output_dir, 'ground_truth.json'), 'w', encoding='utf-8') as f:
+        json.dump(truth, f, indent=2, ensure_ascii=False)
+    return truth
+
+
+def load_ground_truth(data_dir):
+    """读取generate_session()写出的ground_truth.json"""
+    with open(os.path.join(data_dir, 'ground_truth.json'), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def degradation_errors(tyre_fits, truth, compound_names, compound_col='actual_tyre_compound'):
+    """
+    拟合的k_1_lin与真值的偏差
+
+    :param tyre_fits: {车辆: {轮胎名: fit_tyre_degradation()的结果}}
+    :param compound_names: 轮胎编号 → 名称（转换器的TYRE_COMPOUND_MAP或VISUAL_TYRE_COMPOUND_MAP）
+    :param compound_col: 转换器使用的轮胎字段
+    :return: [{'car_index', 'compound', 'k_1_lin', 'clean_laps', 'fit', 'error'}]，没有拟合结果的组合fit为None
+    """
+    errors = []
+    for entry in truth['degradation']:
+        car_idx, name = entry['car_index'], compound_names.get(entry[compound_col])
+        fit = tyre_fits.get(car_idx, {}).get(name)
+        errors.append({
+            'car_index': car_idx,
+            'compound': name,
+            'k_1_lin': entry['k_1_lin'],
+            'clean_laps': entry['clean_laps'],
+            'fit': None if fit is None else fit['k_1_lin'],
+            'error': None if fit is None else fit['k_1_lin'] - entry['k_1_lin']
+        })
+    return errors
+
+
+def main(argv=None, prog=None):
+    """命令行入口"""
+    import argparse
+
+    parser = argparse.ArgumentParser(prog=prog, description="生成合成session（CSV + ground_truth.json）")
+    parser.add_argument('output_dir', help="输出目录")
+    parser.add_argument('--scale', type=float, default=1.0, help="数据规模倍数（按采样率放大，1为样例session的规模）")
+    parser.add_argument('--cars', type=int, default=20, help="车辆数")
+    parser.add_argument('--laps', type=int, default=56, help="圈数")
+    parser.add_argument('--pit-stops', type=int, nargs='+', default=[1, 2], help="每车进站次数（按车辆循环）")
+    parser.add_argument('--retirements', type=int, default=1, help="退赛车辆数")
+    parser.add_argument('--no-fcy', action='store_true', help="不生成FCY阶段")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    truth = generate_session(
+        args.output_dir, n_cars=args.cars, n_laps=args.laps, sample_rate=BASE_SAMPLE_RATE * args.scale,
+        pit_stops=args.pit_stops, fcy_phases=() if args.no_fcy else (('SC', 12, 3), ('VSC', 34, 1)),
+        retirements=args.retirements, seed=args.seed
+    )
+    for table, n in truth['rows'].items():
+        print(f"  ✓ {table}: {n} 行")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+状态转换提取引擎（游程编码）
+对任意列按车辆分组、一次向量化遍历完成游程编码，输出紧凑的区间表 (car, start, end, value)
+供进站、退赛、FCY阶段和轮胎stint检测共用；区间表可跨数据批次合并，用于增量转换
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def _ordered_runs(df, values, group_col, order_col, reset_col):
+    """按(分组, 排序列)稳定排序后标记每个游程的起点"""
+    if isinstance(values, str):
+        values = df[values]
+
+    sort_keys = [col for col in (group_col, order_col) if col is not None]
+    if sort_keys:
+        order = np.lexsort([df[col].to_numpy() for col in reversed(sort_keys)])
+    else:
+        order = np.arange(len(df))
+
+    ordered = df.iloc[order]
+    value_arr = np.asarray(values)[order]
+
+    new_run = np.ones(len(ordered), dtype=bool)
+    if len(ordered) > 1:
+        changed = value_arr[1:] != value_arr[:-1]
+        if group_col is not None:
+            groups = ordered[group_col].to_numpy()
+            changed |= groups[1:] != groups[:-1]
+        if reset_col is not None:
+            # 计数器回落（如胎龄归零）同样视为新游程
+            resets = ordered[reset_col].to_numpy()
+            changed |= resets[1:] < resets[:-1]
+        new_run[1:] = changed
+
+    return ordered, value_arr, new_run
+
+
+def label_runs(df, values, group_col='car_index', order_col=None, reset_col=None):
+    """
+    为每一行标注所属游程编号
+
+    :return: 以df索引对齐、按(分组, 排序列)排列的游程编号Series
+    """
+    ordered, _, new_run = _ordered_runs(df, values, group_col, order_col, reset_col)
+    return pd.Series(np.cumsum(new_run) - 1, index=ordered.index, name='run_id')
+
+
+def run_length_encode(df, values, group_col='car_index', order_col=None, reset_col=None, carry=(), carry_end=()):
+    """
+    对所有车辆一次性做游程编码
+
+    :param df: 输入数据（如lap_data、session）
+    :param values: 要编码的列名，或与df索引对齐的派生Series（如 pit_status > 0）
+    :param group_col: 分组列，None表示整表视为一组
+    :param order_col: 组内排序列，None表示保持原有行序
+    :param reset_col: 计数器列，数值回落时强制开启新游程
+    :param carry: 额外携带的列，取游程首行的值
+    :param carry_end: 额外携带的列，取游程末行的值，列名加 _end 后缀
+    :return: 区间表，列为 group_col, value, start, end, length, start_index, end_index, is_first 及carry列
+    """
+    ordered, value_arr, new_run = _ordered_runs(df, values, group_col, order_col, reset_col)
+
+    starts = np.flatnonzero(new_run)
+    ends = np.append(starts[1:] - 1, len(ordered) - 1) if len(starts) else starts
+
+    position = ordered[order_col].to_numpy() if order_col is not None else ordered.index.to_numpy()
+
+    table = {}
+    if group_col is not None:
+        groups = ordered[group_col].to_numpy()
+        table[group_col] = groups[starts]
+        # 每组第一个游程之前没有状态，不构成转换
+        is_first = np.ones(len(starts), dtype=bool)
+        is_first[1:] = groups[starts[1:]] != groups[starts[:-1]]
+    else:
+        is_first = np.arange(len(starts)) == 0
+
+    table['value'] = value_arr[starts]
+    table['start'] = position[starts]
+    table['end'] = position[ends]
+    table['length'] = ends - starts + 1
+    table['start_index'] = ordered.index.to_numpy()[starts]
+    table['end_index'] = ordered.index.to_numpy()[ends]
+    table['is_first'] = is_first
+
+    for col in carry:
+        table[col] = ordered[col].to_numpy()[starts]
+    for col in carry_end:
+        table[f'{col}_end'] = ordered[col].to_numpy()[ends]
+
+    return pd.DataFrame(table)
+
+
+def merge_runs(previous, new, group_col='car_index', reset_col=None):
+    """
+    把后续数据批次的区间表接到已有区间表之后
+
+    每组新批次的第一个游程与已有的最后一个游程取值相同（且reset_col未回落）时视为同一游程延续，
+    合并后的区间表与对完整数据直接做run_length_encode()的结果一致（start_index/end_index为各批次内的索引）
+    :param previous: 已有区间表，None表示没有
+    :param new: 新批次的区间表
+    :param reset_col: 与run_length_encode()相同的计数器列，需要在两个区间表中分别以carry和carry_end携带
+    :return: 合并后的区间表
+    """
+    if previous is None or len(previous) == 0:
+        return new.reset_index(drop=True)
+    if len(new) == 0:
+        return previous.reset_index(drop=True)
+
+    previous = previous.reset_index(drop=True)
+    new = new.reset_index(drop=True)
+
+    if group_col is not None:
+        last = previous.drop_duplicates(group_col, keep='last')
+        first = new[new['is_first']]
+        pairs = first.reset_index().merge(last.reset_index(), on=group_col, suffixes=('_new', '_prev'))
+        known_groups = new[group_col].isin(last[group_col]).to_numpy()
+    else:
+        pairs = pd.DataFrame({'index_new': [0], 'index_prev': [len(previous) - 1]})
+        known_groups = np.ones(len(new), dtype=bool)
+
+    new_rows = pairs['index_new'].to_numpy()
+    prev_rows = pairs['index_prev'].to_numpy()
+    joined = new['value'].to_numpy()[new_rows] == previous['value'].to_numpy()[prev_rows]
+    if reset_col is not None:
+        joined &= (new[reset_col].to_numpy()[new_rows] >= previous[f'{reset_col}_end'].to_numpy()[prev_rows])
+    new_rows, prev_rows = new_rows[joined], prev_rows[joined]
+
+    # 延续的游程：起点与起点携带列沿用已有游程，终点与末行携带列取新批次
+    end_cols = ['end', 'end_index'] + [col for col in new.columns if col.endswith('_end')]
+    previous = previous.copy()
+    for col in end_cols:
+        previous.loc[prev_rows, col] = new.loc[new_rows, col].to_numpy()
+    previous.loc[prev_rows, 'length'] += new.loc[new_rows, 'length'].to_numpy()
+
+    new = new.assign(is_first=new['is_first'].to_numpy() & ~known_groups).drop(index=new_rows)
+    merged = pd.concat([previous, new], ignore_index=True)
+    if group_col is not None:
+        merged = merged.sort_values(group_col, kind='stable', ignore_index=True)
+    return merged
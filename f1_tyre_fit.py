@@ -0,0 +1,511 @@
+"""
+轮胎降解参数批量拟合
+线性/二次降解模型对参数是线性的，所有 (车手, 轮胎) 组合的最小二乘在一次NumPy向量化计算中闭式求解
+同时提供可合并的充分统计量，多个session的拟合只需累加各自的统计量，无需重新加载lap_data
+命令行合并多个 .degstats.json，输出整个赛季的tireset_pars
+"""
+
+import json
+
+import numpy as np
+
+# 充分统计量字段：样本数、胎龄的0~4阶矩、圈速与胎龄的交叉矩、圈速平方和、最小圈速和最大胎龄
+STAT_FIELDS = ('n', 'sx', 'sx2', 'sx3', 'sx4', 'sy', 'sxy', 'sx2y', 'sy2', 'y_min', 'x_max')
+
+# tireset_pars中每位车手除各轮胎拟合参数以外的固定项
+TIRESET_DEFAULTS = {'tire_deg_model': 'lin', 'mult_tiredeg_sc': 0.25, 'mult_tiredeg_fcy': 0.5, 't_add_coldtires': 1.0}
+
+# tireset_pars中每种轮胎保存的拟合参数
+TIRESET_FIT_PARAMS = ('k_0', 'k_1_lin', 'k_1_quad', 'k_2_quad')
+
+# bootstrap置信区间输出的参数
+BOOTSTRAP_PARAMS = ('k_0', 'k_1_lin', 'k_1_quad', 'k_2_quad')
+
+# 单次向量化bootstrap的 (组 × 重采样 × 样本) 元素上限，超出时按组分块
+MAX_BOOTSTRAP_ELEMENTS = 4_000_000
+
+
+def degradation_samples(tyre_data):
+    """
+    将 [{'tyre_age', 'lap_time_s', ...}] 记录转换为 (胎龄, 圈速, 权重, 圈号) 数组
+
+    权重为记录代表的原始采样行数（'samples'，缺省为1），连续重复的采样合并为一条记录；
+    圈号（'lap_num'）标明记录所属的圈，bootstrap按圈重采样，缺省时每条记录视为单独的一圈
+    """
+    ages = np.array([d['tyre_age'] for d in tyre_data], dtype=float)
+    lap_times = np.array([d['lap_time_s'] for d in tyre_data], dtype=float)
+    weights = np.array([d.get('samples', 1) for d in tyre_data], dtype=float)
+    laps = np.array([d.get('lap_num', -1 - i) for i, d in enumerate(tyre_data)], dtype=float)
+    return ages, lap_times, weights, laps
+
+
+def _sample_weights(sample):
+    """(胎龄, 圈速[, 权重[, 圈号]]) → 权重数组"""
+    if len(sample) > 2:
+        return np.asarray(sample[2], dtype=float)
+    return np.ones(len(sample[0]))
+
+
+def _sample_laps(sample):
+    """(胎龄, 圈速[, 权重[, 圈号]]) → 圈号数组，缺省时每个样本各为一圈"""
+    if len(sample) > 3:
+        return np.asarray(sample[3], dtype=float)
+    return -1.0 - np.arange(len(sample[0]))
+
+
+def _pad_groups(samples):
+    """把长度不一的各组样本填充为二维矩阵，胎龄/圈速/圈号空位为NaN，权重空位为0"""
+    lengths = np.array([len(sample[0]) for sample in samples], dtype=int)
+    width = lengths.max()
+    rows = np.repeat(np.arange(len(samples)), lengths)
+    cols = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+
+    ages = np.full((len(samples), width), np.nan)
+    lap_times = np.full((len(samples), width), np.nan)
+    weights = np.zeros((len(samples), width))
+    laps = np.full((len(samples), width), np.nan)
+    ages[rows, cols] = np.concatenate([np.asarray(sample[0], dtype=float) for sample in samples])
+    lap_times[rows, cols] = np.concatenate([np.asarray(sample[1], dtype=float) for sample in samples])
+    weights[rows, cols] = np.concatenate([_sample_weights(sample) for sample in samples])
+    laps[rows, cols] = np.concatenate([_sample_laps(sample) for sample in samples])
+    return ages, lap_times, weights, laps
+
+
+def _lerp(a, b, t):
+    """与NumPy百分位数相同的线性插值（t >= 0.5时从b端计算）"""
+    diff = b - a
+    return np.where(t >= 0.5, b - diff * (1 - t), a + diff * t)
+
+
+def weighted_percentile(values, weights, q):
+    """
+    按行计算加权百分位数，等价于把每个值重复weights次后的np.nanpercentile（linear插值）
+
+    :param values: (组数, 宽度) 数值矩阵
+    :param weights: (组数, 宽度) 非负整数权重，0表示不参与
+    :param q: 百分位数列表
+    :return: (len(q), 组数) 数组，全部权重为0的行为NaN
+    """
+    order = np.argsort(np.where(weights > 0, values, np.inf), axis=1, kind='stable')
+    values = np.take_along_axis(values, order, axis=1)
+    cumulative = np.cumsum(np.take_along_axis(weights, order, axis=1), axis=1)
+    total = cumulative[:, -1]
+    last = np.maximum(total - 1, 0)
+
+    def value_at(rank):
+        index = np.minimum((cumulative <= rank[:, None]).sum(axis=1), values.shape[1] - 1)
+        return np.take_along_axis(values, index[:, None], axis=1)[:, 0]
+
+    results = []
+    for quantile in np.true_divide(q, 100):
+        position = quantile * last
+        previous = np.floor(position)
+        result = _lerp(value_at(previous), value_at(np.minimum(previous + 1, last)), position - previous)
+        results.append(np.where(total > 0, result, np.nan))
+    return np.array(results)
+
+
+def iqr_mask(lap_times, weights=None):
+    """按组（行）计算IQR异常值掩码（可加权），NaN填充位置为False"""
+    if weights is None:
+        weights = np.isfinite(lap_times).astype(float)
+    q1, q3 = weighted_percentile(lap_times, weights, [25, 75])
+    iqr = q3 - q1
+    lower_bound = (q1 - 1.5 * iqr)[:, None]
+    upper_bound = (q3 + 1.5 * iqr)[:, None]
+    return (lap_times >= lower_bound) & (lap_times <= upper_bound) & (weights > 0)
+
+
+def solve_degradation(ages, lap_times, mask, weights=None):
+    """
+    对掩码选中的样本逐行求解（加权）线性与二次最小二乘
+
+    :param ages: (组数, 宽度) 胎龄矩阵
+    :param lap_times: (组数, 宽度) 圈速矩阵
+    :param mask: (组数, 宽度) 参与拟合的样本
+    :param weights: (组数, 宽度) 样本权重（代表的采样行数），None表示全部为1
+    :return: 各参数数组的dict，线性拟合不可解的组ok为False
+    """
+    w = mask.astype(float) if weights is None else np.where(mask, weights, 0.0)
+    n = w.sum(axis=1)
+    ok = n >= 3
+    n_safe = np.where(ok, n, 1.0)
+
+    x = np.where(mask, ages, 0.0)
+    y = np.where(mask, lap_times, 0.0)
+    x_mean = (x * w).sum(axis=1) / n_safe
+    y_mean = (y * w).sum(axis=1) / n_safe
+
+    # 线性回归（与scipy.stats.linregress相同的中心化公式），按sqrt(权重)缩放后平方即为加权平方和
+    sqrt_w = np.sqrt(w)
+    dx = (x - x_mean[:, None]) * sqrt_w
+    dy = (y - y_mean[:, None]) * sqrt_w
+    ssxm = (dx * dx).sum(axis=1)
+    ssym = (dy * dy).sum(axis=1)
+    ssxym = (dx * dy).sum(axis=1)
+
+    # 胎龄全部相同时无法做线性回归
+    ok &= ssxm > 0
+    slope = np.divide(ssxym, ssxm, out=np.zeros_like(ssxm), where=ssxm > 0)
+    intercept = y_mean - slope * x_mean
+    denom = np.sqrt(ssxm * ssym)
+    r_value = np.clip(np.divide(ssxym, denom, out=np.zeros_like(denom), where=denom > 0), -1.0, 1.0)
+
+    selected = w > 0
+    baseline = np.where(selected, lap_times, np.inf).min(axis=1)
+    baseline = np.where(np.isfinite(baseline), baseline, 0.0)
+    k_0 = intercept - baseline
+
+    # 二次模型 lap_time = baseline + k0 + k1*x + k2*x^2，在中心化缩放后的u上解3x3正规方程
+    centered = np.where(selected, x - x_mean[:, None], 0.0)
+    scale = np.abs(centered).max(axis=1)
+    scale = np.where(scale > 0, scale, 1.0)
+    u = centered / scale[:, None]
+    powers = np.stack([sqrt_w, u * sqrt_w, u * u * sqrt_w], axis=1)
+    gram = np.einsum('gkn,gln->gkl', powers, powers)
+    rhs = np.einsum('gkn,gn->gk', powers, (y - baseline[:, None]) * sqrt_w)
+
+    # 不同胎龄少于3个时二次项不可辨识，沿用线性结果
+    k_0_quad, k_1_quad, k_2_quad = k_0.copy(), slope.copy(), np.full_like(slope, 0.0001)
+    solvable = ok & (np.linalg.matrix_rank(gram) == 3)
+    if solvable.any():
+        a = np.linalg.solve(gram[solvable], rhs[solvable][..., None])[..., 0]
+        s, xm = scale[solvable], x_mean[solvable]
+        k_2_quad[solvable] = a[:, 2] / s**2
+        k_1_quad[solvable] = a[:, 1] / s - 2 * a[:, 2] * xm / s**2
+        k_0_quad[solvable] = a[:, 0] - a[:, 1] * xm / s + a[:, 2] * xm**2 / s**2
+
+    return {
+        'ok': ok,
+        'k_0': k_0,
+        'k_1_lin': slope,
+        'k_0_quad': k_0_quad,
+        'k_1_quad': k_1_quad,
+        'k_2_quad': k_2_quad,
+        'r_squared': r_value**2,
+        'n_samples': n.astype(int)
+    }
+
+
+def _format_fit(fit, row):
+    """把第row组的拟合数组整理为tireset_pars使用的dict"""
+    return {
+        'k_0': round(max(0, float(fit['k_0'][row])), 4),
+        'k_1_lin': round(abs(float(fit['k_1_lin'][row])), 4),
+        'k_1_quad': round(abs(float(fit['k_1_quad'][row])), 4),
+        'k_2_quad': round(abs(float(fit['k_2_quad'][row])), 6),
+        'r_squared': round(float(fit['r_squared'][row]), 4),
+        'n_samples': int(fit['n_samples'][row])
+    }
+
+
+def fit_degradation_batch(samples, n_bootstrap=0, seed=0, level=0.95):
+    """
+    批量拟合轮胎降解曲线（线性 + 二次模型）
+
+    :param samples: [(胎龄数组, 圈速数组[, 权重数组[, 圈号数组]]), ...]，每个元素对应一个车手/轮胎组合
+    :param n_bootstrap: bootstrap重采样次数，0表示不计算置信区间
+    :return: 与samples等长的列表，每项为拟合结果dict（含可选的'ci'），样本不足或无法拟合时为None
+    """
+    results = [None] * len(samples)
+    candidates = [i for i, sample in enumerate(samples) if _sample_weights(sample).sum() >= 3]
+    if not candidates:
+        return results
+
+    ages, lap_times, weights, laps = _pad_groups([samples[i] for i in candidates])
+    fit = solve_degradation(ages, lap_times, iqr_mask(lap_times, weights), weights)
+
+    intervals = (
+        bootstrap_degradation(ages, lap_times, n_bootstrap, seed, level, weights, laps) if n_bootstrap else None
+    )
+
+    for row, i in enumerate(candidates):
+        if fit['ok'][row]:
+            results[i] = _format_fit(fit, row)
+            if intervals is not None:
+                results[i]['ci'] = {
+                    param: [round(float(bound), 6) for bound in intervals[param][row]]
+                    for param in BOOTSTRAP_PARAMS
+                }
+
+    return results
+
+
+def _lap_units(laps, weights):
+    """一组样本中各位置所属的重采样单位（同一圈号为同一单位，编号从0连续），权重为0的位置为-1"""
+    valid = weights > 0
+    units = np.full(len(laps), -1)
+    _, units[valid] = np.unique(laps[valid], return_inverse=True)
+    return units
+
+
+def bootstrap_degradation(ages, lap_times, n_bootstrap=1000, seed=0, level=0.95, weights=None, laps=None):
+    """
+    向量化bootstrap置信区间
+
+    以圈为重采样单位：IQR过滤后的每组有放回地抽取与圈数相同个数的圈，被抽中的圈带着它的全部记录与采样行（权重）
+    参与拟合，区间反映的是圈数而不是采样行数；圈按圈号区分，不同stint中胎龄和圈速相同的两圈仍是两个单位；
+    各样本被抽中的次数一次生成，每个重采样只累加充分统计量，再与solve_degradation_stats()一起批量求解，不逐次调用拟合
+    :param ages: _pad_groups() 得到的 (组数, 宽度) 胎龄矩阵
+    :param lap_times: (组数, 宽度) 圈速矩阵
+    :param weights: (组数, 宽度) 样本权重，None表示非NaN位置全部为1
+    :param laps: (组数, 宽度) 样本所属的圈号，None表示每个样本各为一圈
+    :return: {参数: (组数, 2) 的[下限, 上限]数组}，不可解的组为NaN
+    """
+    rng = np.random.default_rng(seed)
+    if weights is None:
+        weights = np.isfinite(lap_times).astype(float)
+    weights = np.where(iqr_mask(lap_times, weights), weights, 0.0)
+    if laps is None:
+        laps = np.broadcast_to(np.arange(ages.shape[1], dtype=float), ages.shape)
+    n_valid = weights.sum(axis=1)
+    ages = np.where(weights > 0, ages, 0.0)
+    lap_times = np.where(weights > 0, lap_times, 0.0)
+
+    n_groups, width = ages.shape
+    tail = (1 - level) / 2 * 100
+    intervals = {param: np.full((n_groups, 2), np.nan) for param in BOOTSTRAP_PARAMS}
+    block = max(1, MAX_BOOTSTRAP_ELEMENTS // (n_bootstrap * width))
+
+    # 每个样本的各阶幂次，重采样的统计量 = 抽样次数矩阵 @ 幂次矩阵
+    powers = np.stack([
+        np.ones_like(ages), ages, ages**2, ages**3, ages**4,
+        lap_times, ages * lap_times, ages**2 * lap_times, lap_times**2
+    ], axis=2)
+    moment_fields = ('n', 'sx', 'sx2', 'sx3', 'sx4', 'sy', 'sxy', 'sx2y', 'sy2')
+
+    for first in range(0, n_groups, block):
+        rows = np.arange(first, min(first + block, n_groups))
+        # 每个重采样中各样本的权重 = 所在圈被抽中的次数 × 样本权重
+        counts = np.zeros((len(rows), n_bootstrap, width))
+        for k, row in enumerate(rows):
+            if n_valid[row] > 0:
+                units = _lap_units(laps[row], weights[row])
+                n_units = units.max() + 1
+                draws = rng.multinomial(n_units, np.full(n_units, 1 / n_units), size=n_bootstrap)
+                counts[k] = np.where(units >= 0, draws[:, np.maximum(units, 0)], 0) * weights[row]
+
+        moments = counts @ powers[rows]
+        columns = {field: moments[:, :, k] for k, field in enumerate(moment_fields)}
+        drawn = counts > 0
+        columns['y_min'] = np.where(drawn, lap_times[rows][:, None, :], np.inf).min(axis=2)
+        columns['x_max'] = np.where(drawn, ages[rows][:, None, :], 0.0).max(axis=2)
+        fit = _solve_stat_columns({field: values.ravel() for field, values in columns.items()})
+
+        ok = fit['ok'].reshape(len(rows), n_bootstrap)
+        for param in BOOTSTRAP_PARAMS:
+            values = np.where(ok, fit[param].reshape(len(rows), n_bootstrap), np.nan)
+            solved = ok.any(axis=1)
+            if solved.any():
+                bounds = np.nanpercentile(values[solved], [tail, 100 - tail], axis=1).T
+                intervals[param][rows[solved]] = bounds
+
+    return intervals
+
+
+def degradation_stats(samples):
+    """
+    计算每组样本（IQR过滤后）的充分统计量
+
+    :param samples: [(胎龄数组, 圈速数组[, 权重数组]), ...]
+    :return: 与samples等长的列表，每项为STAT_FIELDS的dict，样本不足3个时为None
+    """
+    stats = [None] * len(samples)
+    candidates = [i for i, sample in enumerate(samples) if _sample_weights(sample).sum() >= 3]
+    if not candidates:
+        return stats
+
+    ages, lap_times, weights, _ = _pad_groups([samples[i] for i in candidates])
+    mask = iqr_mask(lap_times, weights)
+    w = np.where(mask, weights, 0.0)
+    x = np.where(mask, ages, 0.0)
+    y = np.where(mask, lap_times, 0.0)
+
+    columns = {
+        'n': w.sum(axis=1),
+        'sx': (w * x).sum(axis=1),
+        'sx2': (w * x**2).sum(axis=1),
+        'sx3': (w * x**3).sum(axis=1),
+        'sx4': (w * x**4).sum(axis=1),
+        'sy': (w * y).sum(axis=1),
+        'sxy': (w * x * y).sum(axis=1),
+        'sx2y': (w * x * x * y).sum(axis=1),
+        'sy2': (w * y**2).sum(axis=1),
+        'y_min': np.where(mask, lap_times, np.inf).min(axis=1),
+        'x_max': np.where(mask, ages, 0.0).max(axis=1)
+    }
+
+    for row, i in enumerate(candidates):
+        if columns['n'][row] >= 3:
+            stats[i] = {field: float(columns[field][row]) for field in STAT_FIELDS}
+
+    return stats
+
+
+def merge_degradation_stats(stats_list):
+    """合并多个session的充分统计量：各阶矩求和，最小圈速/最大胎龄取极值"""
+    stats_list = [stats for stats in stats_list if stats]
+    if not stats_list:
+        return None
+
+    merged = {field: sum(stats[field] for stats in stats_list) for field in STAT_FIELDS}
+    merged['y_min'] = min(stats['y_min'] for stats in stats_list)
+    merged['x_max'] = max(stats['x_max'] for stats in stats_list)
+    return merged
+
+
+def solve_degradation_stats(stats_list):
+    """
+    由充分统计量批量求解线性与二次最小二乘（与solve_degradation的模型相同）
+
+    :param stats_list: [STAT_FIELDS dict, ...]
+    :return: 各参数数组的dict，不可解的组ok为False
+    """
+    return _solve_stat_columns(
+        {field: np.array([stats[field] for stats in stats_list], dtype=float) for field in STAT_FIELDS}
+    )
+
+
+def _solve_stat_columns(columns):
+    """solve_degradation_stats()的按列实现，每个字段为一维数组"""
+    n = columns['n']
+    n_safe = np.where(n > 0, n, 1.0)
+
+    ssxm = columns['sx2'] - columns['sx']**2 / n_safe
+    ssym = columns['sy2'] - columns['sy']**2 / n_safe
+    ssxym = columns['sxy'] - columns['sx'] * columns['sy'] / n_safe
+
+    ok = (n >= 3) & (ssxm > 0)
+    slope = np.divide(ssxym, ssxm, out=np.zeros_like(ssxm), where=ssxm > 0)
+    intercept = (columns['sy'] - slope * columns['sx']) / n_safe
+    denom = np.sqrt(np.maximum(ssxm * ssym, 0.0))
+    r_value = np.clip(np.divide(ssxym, denom, out=np.zeros_like(denom), where=denom > 0), -1.0, 1.0)
+
+    baseline = columns['y_min']
+    k_0 = intercept - baseline
+
+    # 二次模型在u = x / x_max上解3x3正规方程，改善条件数
+    scale = np.where(columns['x_max'] > 0, columns['x_max'], 1.0)
+    m = [n, columns['sx'] / scale, columns['sx2'] / scale**2, columns['sx3'] / scale**3, columns['sx4'] / scale**4]
+    gram = np.stack([np.stack(m[k:k + 3], axis=-1) for k in range(3)], axis=1)
+    rhs = np.stack([
+        columns['sy'] - baseline * m[0],
+        columns['sxy'] / scale - baseline * m[1],
+        columns['sx2y'] / scale**2 - baseline * m[2]
+    ], axis=-1)
+
+    k_0_quad, k_1_quad, k_2_quad = k_0.copy(), slope.copy(), np.full_like(slope, 0.0001)
+    solvable = ok & (np.linalg.matrix_rank(gram) == 3)
+    if solvable.any():
+        a = np.linalg.solve(gram[solvable], rhs[solvable][..., None])[..., 0]
+        s = scale[solvable]
+        k_0_quad[solvable] = a[:, 0]
+        k_1_quad[solvable] = a[:, 1] / s
+        k_2_quad[solvable] = a[:, 2] / s**2
+
+    return {
+        'ok': ok,
+        'k_0': k_0,
+        'k_1_lin': slope,
+        'k_0_quad': k_0_quad,
+        'k_1_quad': k_1_quad,
+        'k_2_quad': k_2_quad,
+        'r_squared': r_value**2,
+        'n_samples': n.astype(int)
+    }
+
+
+def save_degradation_stats(file_path, records):
+    """
+    保存充分统计量
+
+    :param records: [{'session': ..., 'driver': ..., 'compound': ..., 'stats': {...}}, ...]
+    """
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump({'fields': list(STAT_FIELDS), 'records': records}, f, indent=2, ensure_ascii=False)
+
+
+def load_degradation_stats(file_path):
+    """读取save_degradation_stats()写出的统计量记录"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)['records']
+
+
+def pooled_degradation_fit(records):
+    """
+    合并多个session的统计量后按 (车手, 轮胎) 拟合
+
+    同一 (session, 车手, 轮胎) 出现多次时只保留最后一条，重复导入同一session不会重复计数
+    :param records: load_degradation_stats() 返回的记录（可来自多个文件）
+    :return: {车手: {轮胎: 拟合结果dict}}
+    """
+    latest = {}
+    for record in records:
+        latest[(record['session'], record['driver'], record['compound'])] = record['stats']
+
+    pooled = {}
+    for (_, driver, compound), stats in latest.items():
+        pooled.setdefault((driver, compound), []).append(stats)
+
+    keys = list(pooled)
+    merged = [merge_degradation_stats(pooled[key]) for key in keys]
+    valid = [i for i, stats in enumerate(merged) if stats]
+
+    results = {}
+    if not valid:
+        return results
+
+    fit = solve_degradation_stats([merged[i] for i in valid])
+    for row, i in enumerate(valid):
+        if fit['ok'][row]:
+            driver, compound = keys[i]
+            results.setdefault(driver, {})[compound] = _format_fit(fit, row)
+
+    return results
+
+
+def pooled_tireset_pars(fits):
+    """把pooled_degradation_fit()的结果整理为INI中的tireset_pars"""
+    return {
+        driver: {**TIRESET_DEFAULTS, **{
+            compound: {param: fit[param] for param in TIRESET_FIT_PARAMS} for compound, fit in compounds.items()
+        }}
+        for driver, compounds in fits.items()
+    }
+
+
+def main(argv=None, prog=None):
+    """命令行入口"""
+    import argparse
+
+    parser = argparse.ArgumentParser(prog=prog, description="合并多个session的 .degstats.json，拟合整个赛季的tireset_pars")
+    parser.add_argument('stats_files', nargs='+', help="转换器与INI并列写出的 .degstats.json 文件")
+    parser.add_argument('-o', '--output', default=None, help="把tireset_pars写入JSON文件（默认只打印）")
+    args = parser.parse_args(argv)
+
+    records = []
+    for file_path in args.stats_files:
+        file_records = load_degradation_stats(file_path)
+        records += file_records
+        print(f"  ✓ {file_path}: {len(file_records)} 组")
+
+    fits = pooled_degradation_fit(records)
+    sessions = {}
+    for record in records:
+        sessions.setdefault((record['driver'], record['compound']), set()).add(record['session'])
+    for driver, compounds in fits.items():
+        for compound, fit in compounds.items():
+            print(f"  {driver} - {compound}: k_1_lin={fit['k_1_lin']:.4f}, R²={fit['r_squared']:.3f}, "
+                  f"n={fit['n_samples']}, {len(sessions[(driver, compound)])} 个session")
+
+    tireset_pars = pooled_tireset_pars(fits)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(tireset_pars, f, indent=4, ensure_ascii=False)
+        print(f"✓ tireset_pars已写入: {args.output}")
+    else:
+        print(f"tireset_pars = {json.dumps(tireset_pars, indent=4, ensure_ascii=False)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+监视模式：持续监视数据目录，session结束（出现final_classification CSV）后自动转换该session
+文件系统事件优先使用watchdog（Linux下为inotify），未安装时退回定时轮询；
+转换在工作进程池中执行，不阻塞监视循环
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from f1_batch import convert_session, discover_sessions, session_name
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+
+# 表示session已结束的CSV前缀
+SESSION_COMPLETE_MARKER = 'final_classification'
+
+
+class _WakeHandler(FileSystemEventHandler):
+    """任何CSV变化都唤醒监视循环立即扫描"""
+
+    def __init__(self, wake):
+        super().__init__()
+        self.wake = wake
+
+    def on_any_event(self, event):
+        if str(event.src_path).endswith('.csv'):
+            self.wake.set()
+
+
+class SessionWatcher:
+    """监视根目录下的session目录，数据写完且稳定后提交转换"""
+
+    def __init__(self, root, output_dir=None, max_workers=None, debounce=5.0, poll_interval=2.0,
+                 module='f1_csv_to_ini', n_bootstrap=1000):
+        """
+        :param root: 数据根目录（本身或其子目录为session目录）
+        :param output_dir: INI输出目录，默认为root
+        :param debounce: session内所有CSV在该秒数内没有变化才视为写完
+        :param poll_interval: 轮询间隔（秒），使用文件系统事件时为最长等待时间
+        :param n_bootstrap: 轮胎衰减置信区间的bootstrap重采样次数，0表示不计算
+        """
+        self.root = root
+        self.output_dir = output_dir or root
+        self.max_workers = max_workers
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.module = module
+        self.n_bootstrap = n_bootstrap
+
+        self._snapshots = {}
+        self._running = {}
+        # 转换失败或没有生成INI的session → 提交时的CSV快照，CSV变化前不再重试
+        self._failed = {}
+        self._wake = threading.Event()
+
+    def _output_filename(self, data_dir):
+        return os.path.join(self.output_dir, f"race_pars_{session_name(data_dir, self.root)}.ini")
+
+    @staticmethod
+    def _csv_snapshot(data_dir):
+        """session目录内CSV的 (文件名, 大小, 修改时间)"""
+        snapshot = []
+        for filename in sorted(os.listdir(data_dir)):
+            if filename.endswith('.csv'):
+                stat = os.stat(os.path.join(data_dir, filename))
+                snapshot.append((filename, stat.st_size, stat.st_mtime))
+        return tuple(snapshot)
+
+    def is_up_to_date(self, data_dir, snapshot):
+        """输出INI比session内所有CSV都新时无需转换"""
+        output_filename = self._output_filename(data_dir)
+        if not os.path.exists(output_filename):
+            return False
+        newest = max((mtime for _, _, mtime in snapshot), default=0.0)
+        return os.path.getmtime(output_filename) >= newest
+
+    def ready_sessions(self, now=None):
+        """
+        扫描一次，返回已结束、写入稳定且输出过期的session目录
+
+        文件大小或修改时间变化时重新开始计时（防止读取未写完的文件）
+        """
+        now = time.monotonic() if now is None else now
+        ready = []
+
+        for data_dir in discover_sessions(self.root):
+            if data_dir in self._running:
+                continue
+            snapshot = self._csv_snapshot(data_dir)
+            if not any(name.startswith(SESSION_COMPLETE_MARKER) for name, _, _ in snapshot):
+                continue
+
+            previous = self._snapshots.get(data_dir)
+            if previous is None or previous[0] != snapshot:
+                self._snapshots[data_dir] = (snapshot, now)
+                continue
+            if now - previous[1] < self.debounce:
+                continue
+            if self._failed.get(data_dir) == snapshot or self.is_up_to_date(data_dir, snapshot):
+                continue
+            ready.append(data_dir)
+
+        return ready
+
+    def _collect(self):
+        """收集已完成的转换结果"""
+        for data_dir, future in list(self._running.items()):
+            if not future.done():
+                continue
+            del self._running[data_dir]
+            try:
+                entry = future.result()
+            except Exception as e:
+                entry = {'status': 'failed', 'error': f"{type(e).__name__}: {e}"}
+
+            # 提交后该session的快照不再更新，即为转换时读取的CSV
+            if entry['status'] == 'ok':
+                self._failed.pop(data_dir, None)
+            else:
+                self._failed[data_dir] = self._snapshots[data_dir][0]
+            mark = '✓' if entry['status'] == 'ok' else '✗'
+            print(f"  {mark} {session_name(data_dir, self.root)}: {entry['status']}"
+                  + (f" ({entry['error']})" if entry.get('error') else "")
+                  + ("" if entry['status'] == 'ok' else "，CSV变化后重试"))
+
+    def run(self, max_cycles=None):
+        """
+        运行监视循环，Ctrl+C退出
+
+        :param max_cycles: 最多扫描次数，None表示一直运行
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        observer = None
+        if Observer is not None:
+            observer = Observer()
+            observer.schedule(_WakeHandler(self._wake), self.root, recursive=True)
+            observer.start()
+            print(f"监视 {self.root}（文件系统事件）")
+        else:
+            print(f"监视 {self.root}（每 {self.poll_interval}s 轮询）")
+
+        cycles = 0
+        try:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                while max_cycles is None or cycles < max_cycles:
+                    self._collect()
+                    for data_dir in self.ready_sessions():
+                        print(f"  → 转换 {session_name(data_dir, self.root)}")
+                        self._running[data_dir] = executor.submit(
+                            convert_session, data_dir, self._output_filename(data_dir), self.module, self.n_bootstrap
+                        )
+                    cycles += 1
+
+                    # 文件系统事件立即唤醒；防抖计时依靠轮询间隔复查
+                    self._wake.wait(self.poll_interval)
+                    self._wake.clear()
+
+                for future in list(self._running.values()):
+                    future.result()
+                self._collect()
+        except KeyboardInterrupt:
+            print("\n停止监视")
+        finally:
+            if observer is not None:
+                observer.stop()
+                observer.join()
+
+
+def main(argv=None, prog=None):
+    """命令行入口"""
+    import argparse
+
+    parser = argparse.ArgumentParser(prog=prog, description="监视数据目录，session结束后自动转换为INI")
+    parser.add_argument('root', nargs='?', default='.', help="数据根目录")
+    parser.add_argument('-o', '--output-dir', default=None, help="输出目录（默认为根目录）")
+    parser.add_argument('-j', '--workers', type=int, default=None, help="并行工作进程数")
+    parser.add_argument('--debounce', type=float, default=5.0, help="CSV停止变化多少秒后开始转换")
+    parser.add_argument('--poll-interval', type=float, default=2.0, help="轮询间隔（秒）")
+    parser.add_argument('--module', default='f1_csv_to_ini', choices=['f1_csv_to_ini', 'f1_telemetry_collector'])
+    parser.add_argument('--bootstrap', type=int, default=1000, metavar='N',
+                        help="轮胎衰减置信区间的bootstrap重采样次数，0表示不计算")
+    args = parser.parse_args(argv)
+
+    SessionWatcher(
+        args.root, args.output_dir, args.workers, args.debounce, args.poll_interval, args.module, args.bootstrap
+    ).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,7 @@
+import json
+import re
+
+
 def indent_closing_braces(file_path, indent='    '):
     """
     给 .ini 文件中所有顶格的 '}' 前面加上缩进。
@@ -27,5 +31,35 @@ def indent_closing_braces(file_path, indent='    '):
 
     print(f"✅ 已处理完成: {file_path}")
 
+
+def read_ini_pars(file_path):
+    """
+    读取转换器生成的 .ini 文件，返回 {参数名: 解析后的JSON值}
+    例如 read_ini_pars("race_pars_Shanghai.ini")["tireset_pars"]
+    顶格或缩进的 '}' 均可解析，注释行和节标题被忽略
+
+    :param file_path: ini 文件路径
+    """
+    pars = {}
+    name, value_lines = None, []
+
+    with open(file_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            stripped = line.strip()
+            match = re.match(r'^(\w+)\s*=\s*(.*)$', line.rstrip('\n'))
+            section = re.match(r'^\[\w+\]\s*$', line)
+            if match or section:
+                if name is not None:
+                    pars[name] = json.loads('\n'.join(value_lines))
+                name, value_lines = (match.group(1), [match.group(2)]) if match else (None, [])
+            elif name is not None and stripped and not stripped.startswith('#'):
+                value_lines.append(line.rstrip('\n'))
+
+    if name is not None:
+        pars[name] = json.loads('\n'.join(value_lines))
+
+    return pars
+
+
 if __name__ == "__main__":
-    indent_closing_braces("race_pars_Shanghai.ini")
\ No newline at end of file
+    indent_closing_braces("race_pars_Shanghai.ini")
@@ -0,0 +1,43 @@
+"""测试共用的设置：被测模块位于仓库根目录；小规模合成session每次测试运行只生成一次"""
+
+import contextlib
+import io
+import os
+import sys
+
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(scope='session')
+def session_dir(tmp_path_factory):
+    """6辆车、15圈的合成session（含SC/VSC与进站）"""
+    from f1_synth import generate_session
+
+    data_dir = str(tmp_path_factory.mktemp('synthetic'))
+    generate_session(data_dir, n_cars=6, n_laps=15, fcy_phases=(('SC', 5, 2), ('VSC', 10, 1)), seed=4)
+    return data_dir
+
+
+@pytest.fixture
+def convert():
+    """
+    转换一个数据目录，返回INI中除生成时间以外的各行
+
+    car_pars含随机项，每次转换前固定numpy的随机种子
+    """
+    import f1_converter
+
+    def run(data_dir, output_filename, n_bootstrap=0, **kwargs):
+        np.random.seed(0)
+        converter = f1_converter.F1DataConverter(data_dir=data_dir, max_workers=1, n_bootstrap=n_bootstrap)
+        with contextlib.redirect_stdout(io.StringIO()):
+            converter.convert(output_filename=str(output_filename), **kwargs)
+        with open(output_filename, encoding='utf-8') as f:
+            return [line for line in f if not line.startswith('# Generated')]
+
+    return run
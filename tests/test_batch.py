@@ -0,0 +1,97 @@
+import json
+import os
+import shutil
+from concurrent.futures import Future
+
+import pytest
+
+from f1_batch import MANIFEST_FILENAME, convert_tree, discover_sessions
+from f1_watch import SESSION_COMPLETE_MARKER, SessionWatcher
+
+
+def _csv(data_dir, prefix):
+    return os.path.join(data_dir, next(name for name in os.listdir(data_dir) if name.startswith(prefix)))
+
+
+@pytest.fixture
+def root(session_dir, tmp_path):
+    """两个完整的session和一个lap_data损坏的session"""
+    root = tmp_path / 'root'
+    for track in ('Monza', 'Spa', 'Broken'):
+        shutil.copytree(session_dir, root / f'f1_telemetry_data_{track}')
+    with open(_csv(root / 'f1_telemetry_data_Broken', 'lap_data'), 'w') as f:
+        f.write('garbage\n')
+    return str(root)
+
+
+def test_batch_manifest_records_every_session(root, tmp_path):
+    output_dir = str(tmp_path / 'out')
+    manifest = convert_tree(root, output_dir, max_workers=2, n_bootstrap=0)
+
+    with open(os.path.join(output_dir, MANIFEST_FILENAME), encoding='utf-8') as f:
+        assert json.load(f) == manifest
+
+    entries = {entry['session']: entry for entry in manifest['sessions']}
+    assert list(entries) == ['Broken', 'Monza', 'Spa']
+    assert [entries[name]['status'] for name in ('Monza', 'Spa')] == ['ok', 'ok']
+    assert entries['Broken']['status'] in ('failed', 'empty')
+    for name in ('Monza', 'Spa'):
+        assert entries[name]['output'] == os.path.join(output_dir, f'race_pars_{name}.ini')
+        assert os.path.exists(entries[name]['output']) and os.path.exists(entries[name]['log'])
+
+
+def test_ready_sessions_waits_for_the_debounce_window(root, tmp_path):
+    watcher = SessionWatcher(root, str(tmp_path / 'out'), debounce=5.0)
+    sessions = discover_sessions(root)
+
+    assert watcher.ready_sessions(now=0.0) == []
+    assert watcher.ready_sessions(now=4.9) == []
+    assert watcher.ready_sessions(now=5.0) == sessions
+
+    # 写入仍在继续时重新计时
+    with open(_csv(sessions[0], 'lap_data'), 'a') as f:
+        f.write('\n')
+    assert watcher.ready_sessions(now=6.0) == sessions[1:]
+    assert watcher.ready_sessions(now=10.9) == sessions[1:]
+    assert watcher.ready_sessions(now=11.0) == sessions
+
+
+def test_ready_sessions_needs_the_final_classification(root, tmp_path):
+    data_dir = discover_sessions(root)[0]
+    os.remove(_csv(data_dir, SESSION_COMPLETE_MARKER))
+    watcher = SessionWatcher(root, str(tmp_path / 'out'), debounce=0.0)
+    watcher.ready_sessions(now=0.0)
+    assert data_dir not in watcher.ready_sessions(now=1.0)
+
+
+def test_failed_session_is_retried_only_after_its_csvs_change(root, tmp_path, capsys):
+    watcher = SessionWatcher(root, str(tmp_path / 'out'), debounce=1.0)
+    data_dir = discover_sessions(root)[0]
+    watcher.ready_sessions(now=0.0)
+    assert data_dir in watcher.ready_sessions(now=1.0)
+
+    # 提交后转换失败
+    future = Future()
+    future.set_result({'status': 'failed', 'error': 'ValueError: boom'})
+    watcher._running[data_dir] = future
+    assert data_dir not in watcher.ready_sessions(now=2.0)
+    watcher._collect()
+    assert 'CSV变化后重试' in capsys.readouterr().out
+    assert data_dir not in watcher.ready_sessions(now=10.0)
+
+    with open(_csv(data_dir, 'lap_data'), 'a') as f:
+        f.write('\n')
+    assert data_dir not in watcher.ready_sessions(now=11.0)
+    assert data_dir in watcher.ready_sessions(now=12.0)
+
+
+def test_up_to_date_output_is_not_converted_again(root, tmp_path):
+    output_dir = tmp_path / 'out'
+    watcher = SessionWatcher(root, str(output_dir), debounce=0.0)
+    data_dir = discover_sessions(root)[0]
+    output_dir.mkdir()
+    with open(watcher._output_filename(data_dir), 'w') as f:
+        f.write('[TRACK_PARS]\n')
+
+    watcher.ready_sessions(now=0.0)
+    assert data_dir not in watcher.ready_sessions(now=1.0)
@@ -0,0 +1,55 @@
+import os
+
+import numpy as np
+import pytest
+
+
+def grow_session(src_dir, dst_dir, steps=6, seed=0):
+    """
+    把src_dir的CSV分steps次写入dst_dir，模拟采集中不断追加的session，每次写入后yield步号
+
+    各表在任意字节处截断、按随机比例独立增长，约三分之一的步骤中某张表不增长；
+    倒数第二步写完全部数据行，最后一步只新写final_classification（session结束）
+    """
+    files = sorted(name for name in os.listdir(src_dir) if name.endswith('.csv'))
+    data = {}
+    for name in files:
+        with open(os.path.join(src_dir, name), 'rb') as f:
+            data[name] = f.read()
+
+    rng = np.random.default_rng(seed)
+    sizes = dict.fromkeys(files, 0)
+    os.makedirs(dst_dir, exist_ok=True)
+    for step in range(steps):
+        for name in files:
+            if name.startswith('final_classification'):
+                size = len(data[name]) if step == steps - 1 else 0
+            elif step >= steps - 2:
+                size = len(data[name])
+            elif rng.random() < 1 / 3:
+                size = sizes[name]
+            else:
+                size = max(sizes[name], int(len(data[name]) * (step + rng.random()) / (steps - 1)))
+            if size > 0:
+                with open(os.path.join(dst_dir, name), 'wb') as f:
+                    f.write(data[name][:size])
+            sizes[name] = size
+        yield step
+
+
+@pytest.mark.parametrize('seed', [1, 2, 3])
+def test_checkpoint_resume_matches_full_conversion(session_dir, convert, tmp_path, seed):
+    # 每步都以检查点增量转换，最后一步的INI应与一次性完整转换相同
+    grow_dir, checkpoint_file = tmp_path / 'session', tmp_path / 'session.ckpt'
+    incremental = None
+    for _ in grow_session(session_dir, grow_dir, seed=seed):
+        incremental = convert(grow_dir, tmp_path / 'incremental.ini', checkpoint_file=str(checkpoint_file))
+
+    assert checkpoint_file.exists()
+    assert incremental == convert(session_dir, tmp_path / 'full.ini')
+
+
+def test_unchanged_session_resumes_from_checkpoint(session_dir, convert, tmp_path):
+    checkpoint_file = str(tmp_path / 'session.ckpt')
+    first = convert(session_dir, tmp_path / 'first.ini', checkpoint_file=checkpoint_file)
+    assert convert(session_dir, tmp_path / 'second.ini', checkpoint_file=checkpoint_file) == first
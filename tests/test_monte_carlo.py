@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from f1_monte_carlo import GREEN, SC, VSC, evaluate_strategies, pit_losses, simulate_race_times
+from f1_strategy import StintCostTable
+
+TOTAL_LAPS = 20
+TYRE_PARS = {
+    'tire_deg_model': 'lin', 'mult_tiredeg_sc': 0.25, 'mult_tiredeg_fcy': 0.5, 't_add_coldtires': 0.0,
+    'A3': {'k_0': 0.0, 'k_1_lin': 0.08}, 'A4': {'k_0': 0.5, 'k_1_lin': 0.03}
+}
+TRACK_PARS = {
+    't_q': 90.0, 't_gap_racepace': 0.5, 't_pit_tirechange_min': 2.0,
+    't_pitdrive_inlap': 5.0, 't_pitdrive_outlap': 15.0,
+    't_pitdrive_inlap_fcy': 3.0, 't_pitdrive_outlap_fcy': 10.0,
+    't_pitdrive_inlap_sc': 1.0, 't_pitdrive_outlap_sc': 7.0,
+    'mult_t_lap_sc': 1.6, 'mult_t_lap_fcy': 1.4
+}
+STRATEGIES = [
+    [[0, 'A3', 0, 0.0], [10, 'A4', 0, 0.0]],
+    [[0, 'A4', 0, 0.0], [6, 'A3', 0, 0.0], [14, 'A3', 0, 0.0]],
+    [[0, 'A3', 0, 0.0]]
+]
+
+
+def test_green_races_match_strategy_time():
+    results = evaluate_strategies(STRATEGIES, TYRE_PARS, TRACK_PARS, TOTAL_LAPS, n_races=50, seed=1,
+                                  p_sc=0.0, p_vsc=0.0)
+    table = StintCostTable(TYRE_PARS, ['A3', 'A4'], TOTAL_LAPS)
+    base = TOTAL_LAPS * (TRACK_PARS['t_q'] + TRACK_PARS['t_gap_racepace'])
+    for result in results:
+        expected = base + table.strategy_time(result['strategy'], pit_losses(TRACK_PARS)['green'])
+        assert result['std'] == 0.0
+        assert result['mean'] == pytest.approx(expected, abs=1e-3)
+        assert result['p95'] == pytest.approx(expected, abs=1e-3)
+
+
+@pytest.mark.parametrize('inlap, outlap, expected', [
+    (GREEN, GREEN, 5.0 + 15.0 + 2.0),
+    (SC, GREEN, 1.0 + 15.0 + 2.0),
+    (VSC, GREEN, 3.0 + 15.0 + 2.0),
+    (GREEN, SC, 5.0 + 7.0 + 2.0),
+    (VSC, VSC, 3.0 + 10.0 + 2.0),
+    (SC, SC, 1.0 + 7.0 + 2.0)
+])
+def test_pit_loss_follows_in_and_out_lap_status(inlap, outlap, expected):
+    strategy = [[0, 'A3', 0, 0.0], [10, 'A3', 0, 0.0]]
+    status = [GREEN] * TOTAL_LAPS
+    # 第10圈（下标9）进站，第11圈（下标10）出站
+    status[9], status[10] = inlap, outlap
+    green = [GREEN] * TOTAL_LAPS
+    # 只比较进站损失：FCY圈速与降解倍率设为1
+    pars = {**TYRE_PARS, 'mult_tiredeg_sc': 1.0, 'mult_tiredeg_fcy': 1.0}
+    flat = {**TRACK_PARS, 'mult_t_lap_sc': 1.0, 'mult_t_lap_fcy': 1.0}
+    with_stop = simulate_race_times([strategy], pars, flat, TOTAL_LAPS, np.array([status], dtype=np.int8))
+    green_stop = simulate_race_times([strategy], pars, flat, TOTAL_LAPS, np.array([green], dtype=np.int8))
+    green_loss = pit_losses(TRACK_PARS)['green']
+    assert with_stop[0, 0] - green_stop[0, 0] + green_loss == pytest.approx(expected)
+
+
+def test_sort_by_p95():
+    results = evaluate_strategies(STRATEGIES, TYRE_PARS, TRACK_PARS, TOTAL_LAPS, n_races=500, seed=3, sort_by='p95')
+    assert [result['p95'] for result in results] == sorted(result['p95'] for result in results)
@@ -0,0 +1,79 @@
+import contextlib
+import io
+import sys
+import threading
+import time
+
+import numpy as np
+import pytest
+
+import f1_converter
+from f1_stages import Stage, run_stages
+
+
+def _stages(log):
+    def stage(name, delay, inputs=()):
+        def func(out):
+            time.sleep(delay)
+            log.append((name, sys.stdout))
+            print(f"{name} 完成", file=out)
+            return name
+        return Stage(name, func, inputs)
+
+    # 后声明的阶段先完成，回放仍按声明顺序
+    return [stage('a', 0.05), stage('b', 0.0), stage('c', 0.02, ('a', 'b')), stage('d', 0.0, ('b',))]
+
+
+@pytest.mark.parametrize('max_workers', [1, 4])
+def test_stage_output_replays_in_declaration_order(max_workers):
+    log = []
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer):
+        results = {}
+        run_stages(_stages(log), results=results, max_workers=max_workers)
+
+    assert buffer.getvalue() == "a 完成\nb 完成\nc 完成\nd 完成\n"
+    assert results == {name: name for name in 'abcd'}
+    # 阶段运行期间sys.stdout没有被替换
+    assert all(stdout is buffer for _, stdout in log)
+
+
+def test_other_threads_keep_writing_to_stdout_while_stages_run():
+    def stage(out):
+        print("阶段输出", file=out)
+        thread = threading.Thread(target=print, args=("其他线程",))
+        thread.start()
+        thread.join()
+
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer):
+        run_stages([Stage('x', stage), Stage('y', lambda out: None)], max_workers=2)
+    assert buffer.getvalue() == "其他线程\n阶段输出\n"
+
+
+def test_stage_error_is_raised_after_running_stages_finish():
+    def fail(out):
+        raise KeyError('x')
+
+    with pytest.raises(KeyError), contextlib.redirect_stdout(io.StringIO()):
+        run_stages([Stage('x', fail), Stage('y', lambda out: time.sleep(0.02))], max_workers=2)
+
+
+def test_strategy_pool_starts_without_other_stage_threads(session_dir, tmp_path, monkeypatch):
+    solve = f1_converter.solve_strategy_problems
+    calls = []
+
+    def record(*args, **kwargs):
+        calls.append((threading.current_thread() is threading.main_thread(), threading.active_count()))
+        return solve(*args, **kwargs)
+
+    monkeypatch.setattr(f1_converter, 'solve_strategy_problems', record)
+    np.random.seed(0)
+    converter = f1_converter.F1DataConverter(data_dir=session_dir, max_workers=1, n_bootstrap=0,
+                                             compound_sources=['actual', 'visual'])
+    with contextlib.redirect_stdout(io.StringIO()):
+        converter.convert(output_filename=str(tmp_path / 'race.ini'))
+
+    baseline = threading.active_count()
+    assert len(calls) == 2
+    assert all(main and count == baseline for main, count in calls)
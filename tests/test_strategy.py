@@ -0,0 +1,181 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from f1_strategy import (
+    LiveStrategyPlanner, StintCostTable, optimize_strategy, pit_stop_count, stint_cost, stint_lengths,
+    strategy_switch_points, sweep_strategies
+)
+
+PARAMS = {'A3': {'k_0': 0.0, 'k_1_lin': 0.06}, 'A4': {'k_0': 0.4, 'k_1_lin': 0.03}}
+
+
+def test_score_matches_strategy_time():
+    table = StintCostTable(PARAMS, ['A3', 'A4'], 30)
+    strategies = [
+        [[0, 'A3', 0, 0.0]],
+        [[0, 'A3', 0, 0.0], [12, 'A4', 0, 0.0]],
+        [[0, 'A4', 0, 0.0], [10, 'A3', 0, 0.0], [20, 'A4', 0, 0.0]],
+        # 长度为0的stint不算进站
+        [[0, 'A3', 0, 0.0], [15, 'A4', 0, 0.0], [15, 'A3', 0, 0.0]]
+    ]
+    scores = table.score(*table.encode(strategies), 22.0)
+    expected = [table.strategy_time(strategy, 22.0) for strategy in strategies]
+    np.testing.assert_allclose(scores, expected)
+    assert scores[3] == pytest.approx(table.strategy_time([[0, 'A3', 0, 0.0], [15, 'A3', 0, 0.0]], 22.0))
+
+
+def test_pit_stop_count_ignores_padding():
+    lengths = stint_lengths([[0, 10, 30, 30], [0, 30, 30, 30]], 30)
+    assert pit_stop_count(lengths).tolist() == [1, 0]
+
+
+@pytest.mark.parametrize('starts', [[0, 20, 10], [5, 10], [0, 40]])
+def test_stint_lengths_rejects_invalid_strategies(starts):
+    with pytest.raises(ValueError):
+        stint_lengths(starts, 30)
+
+
+def _brute_force_optimum(compound_params, compounds, total_laps, pit_stop_loss, model, require_two_compounds):
+    """穷举整场比赛所有进站圈组合与轮胎序列的最小时间损失"""
+    cost = {compound: stint_cost(compound_params[compound], np.arange(total_laps + 1), model).tolist()
+            for compound in compounds}
+    needs_mix = require_two_compounds and len(compounds) > 1
+    best = np.inf
+    for n_stops in range(total_laps):
+        for pit_laps in itertools.combinations(range(1, total_laps), n_stops):
+            bounds = (0,) + pit_laps + (total_laps,)
+            for sequence in itertools.product(compounds, repeat=n_stops + 1):
+                if needs_mix and len(set(sequence)) < 2:
+                    continue
+                total = sum(cost[compound][end - start] for compound, start, end in zip(sequence, bounds, bounds[1:]))
+                best = min(best, total + n_stops * pit_stop_loss)
+    return best
+
+
+@pytest.mark.parametrize('model', ['lin', 'quad'])
+@pytest.mark.parametrize('require_two_compounds', [True, False])
+def test_optimize_strategy_matches_exhaustive_search(model, require_two_compounds):
+    rng = np.random.default_rng(3)
+    total_laps = 7
+    for _ in range(25):
+        compounds = ['A3', 'A4', 'A5'][:rng.integers(1, 4)]
+        compound_params = {compound: {'k_0': rng.uniform(0, 1), 'k_1_lin': rng.uniform(0.05, 1.5),
+                                      'k_1_quad': rng.uniform(0.0, 1.0), 'k_2_quad': rng.uniform(0.0, 0.2)}
+                           for compound in compounds}
+        pit_stop_loss = rng.uniform(0.5, 6)
+
+        total_time, strategy = optimize_strategy(compound_params, compounds, total_laps, pit_stop_loss,
+                                                 require_two_compounds, model)
+        expected = _brute_force_optimum(compound_params, compounds, total_laps, pit_stop_loss, model,
+                                        require_two_compounds)
+        assert total_time == pytest.approx(expected)
+
+        # 返回的策略本身达到该时间，并遵守至少两种干胎的规则（只有一种可选时放宽）
+        table = StintCostTable(compound_params, compounds, total_laps, model)
+        assert table.strategy_time(strategy, pit_stop_loss) == pytest.approx(total_time)
+        if require_two_compounds and len(compounds) > 1:
+            assert len({stint[1] for stint in strategy}) >= 2
+
+
+def test_two_compound_rule_forces_a_stop():
+    # 软胎一直更快，不强制两种干胎时不进站
+    params = {'A3': {'k_0': 0.0, 'k_1_lin': 0.01}, 'A4': {'k_0': 1.0, 'k_1_lin': 0.01}}
+    free_time, free = optimize_strategy(params, ['A3', 'A4'], 20, 25.0, require_two_compounds=False)
+    ruled_time, ruled = optimize_strategy(params, ['A3', 'A4'], 20, 25.0)
+    assert [stint[1] for stint in free] == ['A3']
+    assert len(ruled) == 2 and {stint[1] for stint in ruled} == {'A3', 'A4'}
+    assert ruled_time > free_time
+
+
+def _remaining_time(strategy, total_laps, params, tyre_age, pit_stop_loss):
+    """逐stint求和的剩余时间损失：第一个stint从当前胎龄继续"""
+    total = 0.0
+    for i, (start, compound, *_) in enumerate(strategy):
+        end = strategy[i + 1][0] if i < len(strategy) - 1 else total_laps
+        age = tyre_age if i == 0 else 0
+        total += stint_cost(params[compound], age + end - start) - stint_cost(params[compound], age)
+    return total + (len(strategy) - 1) * pit_stop_loss
+
+
+def _brute_force_plan(total_laps, current_lap, current, tyre_age, compounds, params, used, pit_stop_loss):
+    """穷举剩余圈的所有进站圈组合与轮胎序列"""
+    needs_mix = any(compound != current for compound in compounds) and len(set(used) | {current}) < 2
+    best = np.inf
+    laps = range(current_lap + 1, total_laps)
+    for n_stops in range(len(laps) + 1):
+        for pit_laps in itertools.combinations(laps, n_stops):
+            for sequence in itertools.product(compounds, repeat=n_stops):
+                if needs_mix and set(sequence) <= {current}:
+                    continue
+                strategy = [[current_lap, current]] + [[lap, compound] for lap, compound in zip(pit_laps, sequence)]
+                best = min(best, _remaining_time(strategy, total_laps, params, tyre_age, pit_stop_loss))
+    return best
+
+
+def test_live_plan_matches_brute_force():
+    rng = np.random.default_rng(7)
+    total_laps = 7
+    for _ in range(150):
+        compounds = ['A3', 'A4', 'A5'][:rng.integers(1, 4)]
+        params = {compound: {'k_0': rng.uniform(0, 1), 'k_1_lin': rng.uniform(0.05, 1.5)} for compound in compounds}
+        current = str(rng.choice(compounds))
+        current_lap, tyre_age = int(rng.integers(0, total_laps)), int(rng.integers(0, 12))
+        used = [str(rng.choice(compounds))] if rng.random() < 0.5 else []
+        pit_stop_loss = rng.uniform(0.5, 6)
+
+        planner = LiveStrategyPlanner(total_laps, pit_stop_loss)
+        total_time, strategy = planner.plan(current_lap, current, tyre_age, compounds, params, used)
+        expected = _brute_force_plan(total_laps, current_lap, current, tyre_age, compounds, params, used,
+                                     pit_stop_loss)
+        assert total_time == pytest.approx(expected)
+        # 剩余圈数不足以换用第二种干胎时无解，只返回当前stint
+        if np.isfinite(expected):
+            assert _remaining_time(strategy, total_laps, params, tyre_age, pit_stop_loss) == pytest.approx(expected)
+
+
+def test_live_plan_after_the_flag():
+    planner = LiveStrategyPlanner(10, 20.0)
+    assert planner.plan(10, 'A3', 4, ['A3', 'A4'], PARAMS) == (0.0, [[10, 'A3', 4, 0.0]])
+
+
+def test_live_planner_cache_is_bounded():
+    planner = LiveStrategyPlanner(10, 20.0)
+    for k_1 in np.linspace(0.01, 0.5, LiveStrategyPlanner.MAX_SOLVED + 10):
+        planner.plan(3, 'A3', 2, ['A3', 'A4'], {'A3': {'k_0': 0.0, 'k_1_lin': k_1}, 'A4': PARAMS['A4']})
+    assert len(planner._solved) == LiveStrategyPlanner.MAX_SOLVED
+
+
+def _row(driver, pit_loss, stops, compounds, deg_multiplier=1.0, total_laps=50):
+    return {'driver': driver, 'total_laps': total_laps, 'pit_loss': pit_loss, 'deg_multiplier': deg_multiplier,
+            'stops': stops, 'compounds': compounds, 'pit_laps': [], 'total_time': 0.0}
+
+
+def test_switch_points_on_known_grid():
+    plan = {10.0: (2, 'A3-A4-A4'), 15.0: (2, 'A3-A4-A4'), 20.0: (1, 'A3-A4'), 25.0: (1, 'A3-A4'),
+            30.0: (1, 'A4-A3')}
+    rows = [_row('ALO', loss, *plan[loss]) for loss in (30.0, 10.0, 25.0, 20.0, 15.0)]
+    rows += [_row('ALO', loss, 1, 'A3-A4', deg_multiplier=2.0) for loss in plan]
+    rows += [_row('LEC', loss, 2 if loss < 25 else 1, 'A3-A5-A5' if loss < 25 else 'A3-A5') for loss in plan]
+
+    switches = strategy_switch_points(rows, axis='pit_loss')
+    assert switches == [
+        {'driver': 'ALO', 'total_laps': 50, 'deg_multiplier': 1.0, 'pit_loss': 20.0,
+         'from': '2停 A3-A4-A4', 'to': '1停 A3-A4'},
+        {'driver': 'ALO', 'total_laps': 50, 'deg_multiplier': 1.0, 'pit_loss': 30.0,
+         'from': '1停 A3-A4', 'to': '1停 A4-A3'},
+        {'driver': 'LEC', 'total_laps': 50, 'deg_multiplier': 1.0, 'pit_loss': 25.0,
+         'from': '2停 A3-A5-A5', 'to': '1停 A3-A5'}
+    ]
+
+
+def test_sweep_switches_where_the_optimum_changes():
+    tireset_pars = {'ALO': {'tire_deg_model': 'lin', **PARAMS}}
+    losses = list(np.arange(2.0, 40.0, 2.0))
+    rows = sweep_strategies(tireset_pars, ['A3', 'A4'], losses, total_laps_values=(30,), max_workers=1)
+    stops = [len(optimize_strategy(PARAMS, ['A3', 'A4'], 30, loss)[1]) - 1 for loss in losses]
+    expected = [losses[i] for i in range(1, len(losses)) if stops[i] != stops[i - 1]]
+    switches = strategy_switch_points(rows)
+    switched = [switch['pit_loss'] for switch in switches if switch['from'].split()[0] != switch['to'].split()[0]]
+    assert expected and switched == expected
@@ -0,0 +1,35 @@
+import pandas as pd
+import pytest
+
+import f1_stream
+from f1_checkpoint import find_table_file
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    """每块只有几十帧，让各表在流式读取中被切成许多块"""
+    monkeypatch.setattr(f1_stream, 'MIN_CHUNK_ROWS', 300)
+
+
+def test_batches_are_frame_aligned_and_cover_every_row(session_dir, small_chunks):
+    batches = list(f1_stream.iter_session_batches(session_dir, memory_limit_mb=0.001))
+    lap_blocks = [batch['lap_data'] for batch in batches if batch['lap_data'] is not None]
+    assert len(lap_blocks) > 10
+
+    # 同一帧的行不会分到两块，car_status不超过同一块lap_data的帧
+    for block, later in zip(lap_blocks, lap_blocks[1:]):
+        assert block['frame'].max() < later['frame'].min()
+    for batch in batches:
+        if batch['lap_data'] is not None and batch['car_status'] is not None:
+            assert batch['car_status']['frame'].max() <= batch['lap_data']['frame'].max()
+
+    for table in f1_stream.INCREMENTAL_TABLES:
+        streamed = pd.concat([batch[table] for batch in batches if batch[table] is not None], ignore_index=True)
+        full = pd.read_csv(find_table_file(session_dir, table), index_col=False)
+        pd.testing.assert_frame_equal(streamed, full)
+
+
+@pytest.mark.parametrize('memory_limit_mb', [0.001, 64])
+def test_stream_conversion_matches_full_conversion(session_dir, convert, tmp_path, small_chunks, memory_limit_mb):
+    full = convert(session_dir, tmp_path / 'full.ini')
+    assert convert(session_dir, tmp_path / 'stream.ini', memory_limit_mb=memory_limit_mb) == full
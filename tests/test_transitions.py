@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from f1_converter import F1DataConverter
+from f1_transitions import label_runs, merge_runs, run_length_encode
+
+
+def _laps(seed, n_frames=60, n_cars=4):
+    """按帧写入的各车状态：取值成段变化，胎龄在换胎时归零"""
+    rng = np.random.default_rng(seed)
+    frames = np.repeat(np.arange(n_frames), n_cars)
+    cars = np.tile(np.arange(n_cars), n_frames)
+    compound = np.empty(len(frames), dtype=int)
+    age = np.empty(len(frames), dtype=int)
+    for car in range(n_cars):
+        rows = cars == car
+        # 同一轮胎再次换上（如M-H-M中的M→M）只能由胎龄归零区分
+        changes = rng.random(n_frames) < 0.12
+        stint = np.cumsum(changes)
+        compound[rows] = rng.integers(16, 18, stint.max() + 1)[stint]
+        age[rows] = np.arange(n_frames) - np.flatnonzero(np.r_[True, changes[1:]])[stint - stint[0]]
+    return pd.DataFrame({'frame': frames, 'car_index': cars, 'compound': compound, 'tyres_age_laps': age})
+
+
+def _encode(df):
+    return run_length_encode(df, 'compound', order_col='frame', reset_col='tyres_age_laps',
+                             carry=('tyres_age_laps',), carry_end=('tyres_age_laps',))
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_merged_batches_match_whole_input(seed):
+    df = _laps(seed)
+    rng = np.random.default_rng(seed)
+    # 在任意帧处切分，包括只有一帧的批次
+    cuts = np.sort(rng.choice(np.arange(1, df['frame'].max() + 1), size=6, replace=False))
+    merged = None
+    for frames in np.split(np.arange(df['frame'].max() + 1), cuts):
+        batch = df[df['frame'].isin(frames)]
+        merged = merge_runs(merged, _encode(batch), reset_col='tyres_age_laps')
+
+    pd.testing.assert_frame_equal(merged, _encode(df), check_dtype=False)
+
+
+def test_reset_column_splits_runs_with_the_same_value():
+    df = pd.DataFrame({'car_index': 0, 'frame': range(6), 'compound': 17, 'tyres_age_laps': [3, 4, 5, 0, 1, 2]})
+    runs = _encode(df)
+    assert runs['length'].tolist() == [3, 3]
+    assert label_runs(df, 'compound', order_col='frame', reset_col='tyres_age_laps').tolist() == [0, 0, 0, 1, 1, 1]
+
+    # 跨批次时同样以胎龄回落为界
+    merged = merge_runs(_encode(df.iloc[:4]), _encode(df.iloc[4:]), reset_col='tyres_age_laps')
+    pd.testing.assert_frame_equal(merged, runs, check_dtype=False)
+
+
+def test_frame_join_pairs_rows_from_the_same_frame(tmp_path):
+    # car_status的时间戳与lap_data错开近一帧，按时间就近对齐会取到相邻帧；同一帧重复写入时取最后一行
+    lap_data = pd.DataFrame({
+        'session_uid': 1, 'frame': [10, 10, 11, 11, 12, 12], 'car_index': [0, 1] * 3,
+        'timestamp': [1.0, 1.0, 1.1, 1.1, 1.2, 1.2]
+    })
+    car_status = pd.DataFrame({
+        'session_uid': 1, 'frame': [10, 10, 11, 11, 11, 12, 12], 'car_index': [0, 1, 0, 1, 1, 0, 1],
+        'timestamp': [1.09, 1.09, 1.19, 1.19, 1.19, 1.29, 1.29],
+        'actual_tyre_compound': [16, 17, 16, 17, 18, 16, 18], 'tyres_age_laps': [1, 2, 1, 2, 0, 1, 0]
+    })
+
+    converter = F1DataConverter(data_dir=str(tmp_path), n_bootstrap=0)
+    merged = converter._merge_lap_tyre_data(lap_data, car_status)
+    assert merged[['frame', 'car_index']].values.tolist() == lap_data[['frame', 'car_index']].values.tolist()
+    assert merged['actual_tyre_compound'].tolist() == [16, 17, 16, 18, 16, 18]
+    assert merged['tyres_age_laps'].tolist() == [1, 2, 1, 0, 1, 0]
@@ -0,0 +1,66 @@
+import json
+
+import numpy as np
+
+from f1_tyre_fit import (
+    _lap_units, _pad_groups, bootstrap_degradation, degradation_samples, load_degradation_stats, main,
+    pooled_degradation_fit, pooled_tireset_pars
+)
+from ini_tools import read_ini_pars
+
+
+def _converted(session_dir, convert, tmp_path):
+    ini = tmp_path / 'race.ini'
+    convert(session_dir, ini)
+    return read_ini_pars(ini)['tireset_pars'], load_degradation_stats(tmp_path / 'race.degstats.json')
+
+
+def test_single_session_pool_reproduces_session_fit(session_dir, convert, tmp_path):
+    tireset_pars, records = _converted(session_dir, convert, tmp_path)
+    pooled = pooled_tireset_pars(pooled_degradation_fit(records))
+
+    fitted = {driver: pars for driver, pars in tireset_pars.items() if any(key.startswith('A') for key in pars)}
+    assert pooled and pooled == fitted
+
+
+def test_reimported_session_replaces_its_records(session_dir, convert, tmp_path):
+    _, records = _converted(session_dir, convert, tmp_path)
+    once = pooled_degradation_fit(records)
+    assert pooled_degradation_fit(records + records) == once
+
+    # 重新转换同一session后的统计量覆盖旧的记录，而不是叠加
+    reconverted = json.loads(json.dumps(records))
+    first = reconverted[0]
+    first['stats'] = {field: value * 2 if field not in ('y_min', 'x_max') else value
+                      for field, value in first['stats'].items()}
+    assert pooled_degradation_fit(records + reconverted) == pooled_degradation_fit(reconverted)
+    assert pooled_degradation_fit(reconverted)[first['driver']][first['compound']]['n_samples'] == \
+        2 * once[first['driver']][first['compound']]['n_samples']
+
+
+def test_pool_command_writes_tireset_pars(session_dir, convert, tmp_path):
+    _, records = _converted(session_dir, convert, tmp_path)
+    output = tmp_path / 'pooled.json'
+    main([str(tmp_path / 'race.degstats.json'), str(tmp_path / 'race.degstats.json'), '-o', str(output)])
+    with open(output, encoding='utf-8') as f:
+        assert json.load(f) == pooled_tireset_pars(pooled_degradation_fit(records))
+
+
+def test_lap_units_follow_lap_numbers():
+    laps = np.array([3.0, 3.0, 4.0, 9.0, 9.0, np.nan])
+    weights = np.array([2.0, 1.0, 1.0, 1.0, 1.0, 0.0])
+    assert _lap_units(laps, weights).tolist() == [0, 0, 1, 2, 2, -1]
+
+
+def test_bootstrap_keeps_identical_laps_from_different_stints_apart():
+    # M-H-M：两个中性胎stint的胎龄与圈速完全相同，但圈号不同
+    lap_times = [90.0, 90.1, 90.3, 90.4, 90.6]
+    records = [{'tyre_age': age, 'lap_time_s': lap_time, 'lap_num': first + age, 'samples': 3}
+               for first in (0, 20) for age, lap_time in enumerate(lap_times, start=1)]
+    ages, times, weights, laps = _pad_groups([degradation_samples(records)])
+
+    assert len(np.unique(laps[0])) == 10
+    by_lap = bootstrap_degradation(ages, times, 200, 0, 0.95, weights, laps)
+    per_record = bootstrap_degradation(ages, times, 200, 0, 0.95, weights)
+    for param, bounds in by_lap.items():
+        np.testing.assert_array_equal(bounds, per_record[param])